@@ -3,7 +3,7 @@ Konfigurasi Aplikasi Kasir
 """
 import os
 import sys
-import json
+from utils.store_config import create_service
 
 # Detect if running as PyInstaller bundle
 def get_base_path():
@@ -31,10 +31,14 @@ def get_assets_path():
 # Path aplikasi - persistent location for data
 APP_DIR = get_base_path()
 DATABASE_DIR = os.path.join(APP_DIR, "database")
+CACHE_DIR = os.path.join(DATABASE_DIR, "cache")
+LOGS_DIR = os.path.join(APP_DIR, "logs")
+PRINT_QUEUE_DIR = os.path.join(DATABASE_DIR, "print_queue")
 ASSETS_DIR = get_assets_path()
 
 # Pastikan folder ada (untuk data yang perlu ditulis)
 os.makedirs(DATABASE_DIR, exist_ok=True)
+os.makedirs(CACHE_DIR, exist_ok=True)
 # Create assets folder next to EXE if frozen
 if getattr(sys, 'frozen', False):
     os.makedirs(os.path.join(os.path.dirname(sys.executable), "assets"), exist_ok=True)
@@ -52,6 +56,10 @@ STORE_CONFIG = {
     "phone": "08123456789",
     "footer": "Terima kasih telah berbelanja!"
 }
+STORE_CONFIG_FILE = os.path.join(APP_DIR, "store_config.json")
+
+# Shared cached copy of store_config.json (read/write through this, not the file)
+store_config = create_service(STORE_CONFIG_FILE, STORE_CONFIG)
 
 # Available color themes
 THEMES = {
@@ -131,15 +139,7 @@ COLORS = {
 
 def load_theme():
     """Load saved theme from config file"""
-    config_file = os.path.join(APP_DIR, "store_config.json")
-    if os.path.exists(config_file):
-        try:
-            with open(config_file, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-                return config.get('theme', 'blue')
-        except:
-            pass
-    return 'blue'
+    return store_config.get('theme', 'blue')
 
 def apply_theme(theme_name='blue'):
     """Apply a color theme to the COLORS dictionary"""
@@ -4,10 +4,19 @@ Database Manager - CSV operations for products and transactions
 import csv
 import os
 import json
+import re
+import bisect
+from contextlib import contextmanager
 from datetime import datetime
 from config import PRODUCTS_FILE, TRANSACTIONS_FILE
 from utils.helpers import generate_id, generate_transaction_id, get_current_datetime, generate_barcode
+from utils.rollups import TransactionRollup, ProductDailyRollup, HourlyRollup, DailyRollup, KeyIndex, SearchIndex
+from utils.archive import write_archive, read_archive
+from utils.locks import write_lock
+from utils.tracer import trace_methods
+from utils.live_metrics import live_metrics, file_stat
 
+@trace_methods
 class ProductDatabase:
     """Manage products CSV database"""
     
@@ -107,9 +116,12 @@ class ProductDatabase:
             'updated_at': get_current_datetime()
         }
         
-        with open(self.file_path, 'a', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=self.HEADERS)
-            writer.writerow(product)
+        with write_lock:
+            before = file_stat(self.file_path)
+            with open(self.file_path, 'a', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=self.HEADERS)
+                writer.writerow(product)
+        live_metrics.products_changed(self.file_path, before, 1)
         
         return product
     
@@ -138,16 +150,21 @@ class ProductDatabase:
         new_products = [p for p in products if p['id'] != product_id]
         
         if len(new_products) < len(products):
+            before = file_stat(self.file_path)
             self._write_all(new_products)
+            live_metrics.products_changed(self.file_path, before, len(new_products) - len(products))
             return True
         return False
     
     def _write_all(self, products):
-        """Write all products to CSV"""
-        with open(self.file_path, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=self.HEADERS)
-            writer.writeheader()
-            writer.writerows(products)
+        """Replace the products CSV atomically"""
+        tmp_path = self.file_path + '.tmp'
+        with write_lock:
+            with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=self.HEADERS)
+                writer.writeheader()
+                writer.writerows(products)
+            os.replace(tmp_path, self.file_path)
     
     def get_categories(self):
         """Get all unique categories"""
@@ -159,10 +176,12 @@ class ProductDatabase:
         return sorted(list(categories))
 
 
+@trace_methods
 class TransactionDatabase:
     """Manage transactions CSV database"""
     
-    HEADERS = ['id', 'date', 'time', 'items', 'subtotal', 'discount', 'total', 'payment', 'change', 'cashier']
+    # ref_id links a refund (RFD-...) to the transaction it reverses
+    HEADERS = ['id', 'date', 'time', 'items', 'subtotal', 'discount', 'total', 'payment', 'change', 'cashier', 'ref_id']
     
     def __init__(self):
         self.file_path = TRANSACTIONS_FILE
@@ -174,10 +193,22 @@ class TransactionDatabase:
             with open(self.file_path, 'w', newline='', encoding='utf-8') as f:
                 writer = csv.writer(f)
                 writer.writerow(self.HEADERS)
+        else:
+            self._migrate_headers()
     
-    def get_all(self):
-        """Get all transactions"""
-        transactions = []
+    def _migrate_headers(self):
+        """Rewrite files created before newer columns (e.g. ref_id) existed"""
+        try:
+            with open(self.file_path, 'r', newline='', encoding='utf-8') as f:
+                fieldnames = next(csv.reader(f), None) or []
+        except OSError:
+            return
+        if fieldnames != self.HEADERS:
+            # One-time full rewrite; missing columns are written empty
+            self._write_all(list(self.iter_csv()))
+    
+    def iter_csv(self):
+        """Iterate transactions of open months (the CSV file) one at a time"""
         try:
             with open(self.file_path, 'r', newline='', encoding='utf-8') as f:
                 reader = csv.DictReader(f)
@@ -187,32 +218,462 @@ class TransactionDatabase:
                         row['items_list'] = json.loads(row['items'])
                     except:
                         row['items_list'] = []
-                    transactions.append(row)
+                    yield row
         except Exception as e:
             print(f"Error reading transactions: {e}")
+    
+    def iter_all(self):
+        """Iterate all transactions one at a time, closed months first"""
+        for row in self.iter_archived_rows():
+            try:
+                row['items_list'] = json.loads(row['items'])
+            except:
+                row['items_list'] = []
+            yield row
+        yield from self.iter_csv()
+    
+    def get_all(self):
+        """Get all transactions"""
+        return list(self.iter_all())
+    
+    def iter_by_date_range(self, start_date, end_date, on_progress=None):
+        """Iterate transactions within date range
+        
+        Only archived months overlapping the range are read, and items JSON
+        is only decoded for rows inside the range. on_progress, if given, is
+        called as on_progress(bytes_done, bytes_total).
+        """
+        months = [m for m in self.archived_months() if start_date[:7] <= m <= end_date[:7]]
+        archive_sizes = [os.path.getsize(self.archive_path(m)) for m in months]
+        csv_size = self.file_size()
+        total = sum(archive_sizes) + csv_size
+        done = 0
+        
+        for month, archive_size in zip(months, archive_sizes):
+            for row in read_archive(self.archive_path(month)):
+                if start_date <= row['date'] <= end_date:
+                    try:
+                        row['items_list'] = json.loads(row['items'])
+                    except:
+                        row['items_list'] = []
+                    yield row
+            done += archive_size
+            if on_progress:
+                on_progress(done, total)
+        
+        for count, (start, stop, row) in enumerate(self.iter_records(0, csv_size)):
+            if on_progress and count % 1000 == 0:
+                on_progress(done + stop, total)
+            if start_date <= row['date'] <= end_date:
+                try:
+                    row['items_list'] = json.loads(row['items'])
+                except:
+                    row['items_list'] = []
+                yield row
+        if on_progress:
+            on_progress(total, total)
+    
+    @property
+    def archive_dir(self):
+        """Folder holding compressed archives of closed months"""
+        return os.path.join(os.path.dirname(self.file_path), 'archive')
+    
+    def archive_path(self, year_month):
+        """Get archive file path of a closed month (YYYY-MM)"""
+        base = os.path.splitext(os.path.basename(self.file_path))[0]
+        return os.path.join(self.archive_dir, f"{base}_{year_month}.trxa")
+    
+    def archived_months(self):
+        """Get sorted list of closed months (YYYY-MM) that have an archive"""
+        base = os.path.splitext(os.path.basename(self.file_path))[0]
+        pattern = re.compile(re.escape(base) + r'_(\d{4}-\d{2})\.trxa$')
+        try:
+            names = os.listdir(self.archive_dir)
+        except OSError:
+            return []
+        return sorted(m.group(1) for m in map(pattern.match, names) if m)
+    
+    def iter_archived_rows(self, months=None):
+        """Iterate raw rows of closed months (all months if months is None)"""
+        for month in (self.archived_months() if months is None else months):
+            try:
+                rows = read_archive(self.archive_path(month))
+            except (OSError, ValueError) as e:
+                print(f"Error reading archive {month}: {e}")
+                continue
+            yield from rows
+    
+    def archive_size(self):
+        """Get total size of all archives in bytes"""
+        return sum(os.path.getsize(self.archive_path(m)) for m in self.archived_months())
+    
+    def close_month(self, year_month, codec='lzma'):
+        """Move all transactions of a past month into its compressed archive
+        
+        Archived months are read-only: they still show up in history and
+        reports, but cannot be edited or deleted.
+        
+        Returns:
+            dict with 'count', 'csv_bytes' (freed from the CSV) and
+            'archive_bytes' (size of the month's archive)
+        """
+        if not re.fullmatch(r'\d{4}-\d{2}', year_month):
+            raise ValueError("Format bulan harus YYYY-MM")
+        if year_month >= datetime.now().strftime("%Y-%m"):
+            raise ValueError("Hanya bulan yang sudah lewat yang bisa ditutup")
+        
+        with self._rollups_held() as rollups:
+            size_before = self.file_size()
+            closing = [row for start, stop, row in self.iter_records(0, size_before)
+                       if row.get('date', '')[:7] == year_month]
+            if not closing:
+                return {'count': 0, 'csv_bytes': 0, 'archive_bytes': 0}
+            
+            # Merge with rows archived earlier for the same month (replacing
+            # copies left behind by an interrupted earlier close)
+            path = self.archive_path(year_month)
+            closing_ids = {t['id'] for t in closing}
+            previous = read_archive(path) if os.path.exists(path) else []
+            rows = [t for t in previous if t['id'] not in closing_ids]
+            rows += [{k: t.get(k, '') for k in self.HEADERS} for t in closing]
+            rows.sort(key=lambda t: (t['date'], t['time']))
+            
+            # Archive first: a crash in between leaves duplicates, never losses
+            os.makedirs(self.archive_dir, exist_ok=True)
+            tmp_path = path + '.tmp'
+            archive_bytes = write_archive(tmp_path, year_month, self.HEADERS, rows, codec)
+            # One step for backups: no snapshot holds the month in both files
+            with write_lock:
+                os.replace(tmp_path, path)
+                moved, relocate = self._rewrite_csv(lambda row: row['id'] in closing_ids)
+            
+            # Rows only moved between files: rollup totals are unchanged
+            for rollup in rollups:
+                rollup.relocate(relocate)
+                rollup.rebase(self)
+        
+        return {
+            'count': len(closing),
+            'csv_bytes': size_before - self.file_size(),
+            'archive_bytes': archive_bytes
+        }
+    
+    @contextmanager
+    def _rollups_held(self):
+        """Hold every rollup (synced) while the CSV file is rewritten"""
+        rollups = [cls.for_database(self) for cls in TransactionRollup._registry]
+        for rollup in rollups:
+            rollup.lock.acquire()
+        try:
+            for rollup in rollups:
+                rollup.sync(self)
+            yield rollups
+        finally:
+            for rollup in rollups:
+                rollup.lock.release()
+    
+    def _rewrite_csv(self, drop):
+        """Rewrite the CSV in one pass without the rows for which drop(row) is true
+        
+        Kept records are copied byte for byte, so their relative order and
+        content are unchanged and only their offsets shift. Appends wait
+        until the new file is in place, so none are lost.
+        
+        Returns:
+            (dropped rows, relocate) - relocate maps the old byte offset of a
+            record to its new offset, or -1 if the record was dropped
+        """
+        with write_lock:
+            return self._rewrite_csv_locked(drop)
+    
+    def _rewrite_csv_locked(self, drop):
+        dropped = []
+        spans = []
+        for start, stop, row in self.iter_records(0, self.file_size()):
+            if drop(row):
+                dropped.append(row)
+                spans.append((start, stop))
+        if not dropped:
+            return [], (lambda offset: offset)
+        
+        tmp_path = self.file_path + '.tmp'
+        with open(self.file_path, 'rb') as src, open(tmp_path, 'wb') as dst:
+            position = 0
+            for start, stop in spans + [(None, None)]:
+                # Copy up to the next dropped record (or to the end of file)
+                remaining = None if start is None else start - position
+                while remaining is None or remaining > 0:
+                    chunk = src.read(1 << 20 if remaining is None else min(1 << 20, remaining))
+                    if not chunk:
+                        break
+                    dst.write(chunk)
+                    if remaining is not None:
+                        remaining -= len(chunk)
+                if stop is not None:
+                    src.seek(stop)
+                    position = stop
+        os.replace(tmp_path, self.file_path)
+        
+        starts = [start for start, stop in spans]
+        removed_before = [0]
+        for start, stop in spans:
+            removed_before.append(removed_before[-1] + stop - start)
+        
+        def relocate(offset):
+            i = bisect.bisect_right(starts, offset)
+            if i and offset < spans[i - 1][1]:
+                return -1
+            return offset - removed_before[i]
+        
+        return dropped, relocate
+    
+    def file_size(self):
+        """Get size of the transactions file in bytes"""
+        try:
+            return os.path.getsize(self.file_path)
+        except OSError:
+            return 0
+    
+    def fingerprint(self, offset, length=32):
+        """Get hex of the bytes just before offset (detects rewritten files)"""
+        start = max(0, offset - length)
+        try:
+            with open(self.file_path, 'rb') as f:
+                f.seek(start)
+                return f.read(offset - start).hex()
+        except OSError:
+            return ''
+    
+    def iter_records(self, start=0, end=None):
+        """Iterate raw rows as (start_offset, end_offset, row) between byte offsets
+        
+        Only complete records (terminated by a newline) are returned, so a
+        row that is still being appended is picked up by the next call.
+        """
+        try:
+            f = open(self.file_path, 'rb')
+        except OSError:
+            return
+        
+        with f:
+            header = f.readline()
+            fieldnames = next(csv.reader([header.decode('utf-8-sig')]), None) or self.HEADERS
+            position = max(start, f.tell())
+            f.seek(position)
+            
+            record = b''
+            record_start = position
+            while end is None or position < end:
+                line = f.readline()
+                if not line:
+                    break
+                if end is not None and position + len(line) > end:
+                    break
+                position += len(line)
+                record += line
+                
+                # A newline inside a quoted field leaves an odd number of quotes
+                if record.count(b'"') % 2 or not record.endswith(b'\n'):
+                    continue
+                
+                values = next(csv.reader([record.decode('utf-8')]), [])
+                if values:
+                    row = dict(zip(fieldnames, values))
+                    for key in fieldnames[len(values):]:
+                        row[key] = ''
+                    yield record_start, position, row
+                record = b''
+                record_start = position
+    
+    def get_records_at(self, offsets):
+        """Read raw rows starting at the given byte offsets of the CSV file"""
+        rows = []
+        try:
+            f = open(self.file_path, 'rb')
+        except OSError:
+            return rows
+        
+        with f:
+            header = f.readline()
+            fieldnames = next(csv.reader([header.decode('utf-8-sig')]), None) or self.HEADERS
+            for offset in offsets:
+                f.seek(offset)
+                record = b''
+                while True:
+                    line = f.readline()
+                    record += line
+                    if not line or (not record.count(b'"') % 2 and record.endswith(b'\n')):
+                        break
+                values = next(csv.reader([record.decode('utf-8')]), [])
+                row = dict(zip(fieldnames, values))
+                for key in fieldnames[len(values):]:
+                    row[key] = ''
+                rows.append(row)
+        return rows
+    
+    def get_page(self, start_date, end_date, before=None, limit=100, query=None):
+        """Get one page of transactions ordered by (date, time, id), newest first
+        
+        Args:
+            before: Cursor returned by the previous page, or None for the first page
+            query: Optional search text (product name/ID/barcode or transaction ID)
+        
+        Returns:
+            (transactions, cursor) - cursor is None when there are no more rows
+        """
+        if query:
+            keys = [k[:3] for k in self.search(query, start_date, end_date)
+                    if before is None or k[:3] < tuple(before)][:limit]
+            offsets = KeyIndex.for_database(self).locate(self, keys)
+            keys = [k + (offset,) for k, offset in zip(keys, offsets)]
+        else:
+            keys = KeyIndex.for_database(self).page(self, start_date, end_date, before, limit)
+        
+        cursor = keys[-1][:3] if len(keys) >= limit else None
+        return self._rows_for_keys(keys), cursor
+    
+    def _rows_for_keys(self, keys):
+        """Load transactions for (date, time, id, offset) keys, keeping their order"""
+        # Rows still in the CSV are read by offset, archived rows by month
+        by_id = {}
+        csv_keys = [k for k in keys if k[3] is not None and k[3] >= 0]
+        for (date, time, transaction_id, offset), row in zip(
+                csv_keys, self.get_records_at(k[3] for k in csv_keys)):
+            if row.get('id') == transaction_id:
+                by_id[transaction_id] = row
+        
+        archived = {}
+        for date, time, transaction_id, offset in keys:
+            if offset is not None and offset < 0:
+                archived.setdefault(date[:7], set()).add(transaction_id)
+        for month, ids in archived.items():
+            try:
+                rows = read_archive(self.archive_path(month), copy=False)
+            except (OSError, ValueError):
+                continue
+            for row in rows:
+                if row['id'] in ids:
+                    by_id[row['id']] = dict(row)
+        
+        transactions = []
+        for date, time, transaction_id, offset in keys:
+            row = by_id.get(transaction_id)
+            if row is None:
+                # Index is behind the file; fall back to a lookup
+                row = self.get_by_id(transaction_id)
+                if row is None:
+                    continue
+            try:
+                row['items_list'] = json.loads(row['items'])
+            except:
+                row['items_list'] = []
+            transactions.append(row)
         return transactions
     
+    def search(self, query, start_date, end_date):
+        """Find transactions by line item (name, product ID, barcode) or transaction ID
+        
+        Every word must match a prefix of an item token or of the ID.
+        
+        Returns:
+            List of (date, time, id, total), newest first
+        """
+        return SearchIndex.for_database(self).search(self, query, start_date, end_date)
+    
+    def get_range_totals(self, start_date, end_date, query=None):
+        """Get (transaction count, total sales) within date range (from rollups)"""
+        if query:
+            keys = self.search(query, start_date, end_date)
+            return len(keys), sum(k[3] for k in keys)
+        return DailyRollup.for_database(self).range_totals(self, start_date, end_date)
+    
+    def get_product_sales(self, start_date, end_date):
+        """Get units and revenue per product within date range (from rollup)"""
+        rollup = ProductDailyRollup.for_database(self)
+        return rollup.product_totals(self, start_date, end_date)
+    
+    def get_hourly_heatmap(self, start_date, end_date):
+        """Get (revenue, count) weekday x hour matrices within date range"""
+        rollup = HourlyRollup.for_database(self)
+        return rollup.weekday_hour_matrix(self, start_date, end_date)
+    
+    def invalidate_caches(self):
+        """Drop rollups after the transactions file was replaced externally"""
+        TransactionRollup.invalidate_all(self.file_path)
+    
     def get_by_id(self, transaction_id):
         """Get transaction by ID"""
-        transactions = self.get_all()
-        for t in transactions:
+        for t in self.iter_csv():
             if t['id'] == transaction_id:
                 return t
+        
+        # Closed months; the month encoded in the ID is the likely one
+        months = self.archived_months()
+        match = re.search(r'(\d{4})(\d{2})\d{2}', transaction_id)
+        if match:
+            guess = f"{match.group(1)}-{match.group(2)}"
+            if guess in months:
+                months.remove(guess)
+                months.insert(0, guess)
+        for t in self.iter_archived_rows(months):
+            if t['id'] == transaction_id:
+                try:
+                    t['items_list'] = json.loads(t['items'])
+                except:
+                    t['items_list'] = []
+                return t
         return None
     
+    def get_many(self, transaction_ids):
+        """Get several transactions by ID with one pass over the CSV
+        
+        Closed months are only read if some IDs were not found, the months
+        encoded in those IDs first.
+        
+        Returns:
+            dict of id -> transaction (IDs not found are left out)
+        """
+        wanted = set(transaction_ids)
+        found = {}
+        for start, stop, row in self.iter_records():
+            if row.get('id') in wanted:
+                found[row['id']] = row
+        
+        missing = wanted - set(found)
+        if missing:
+            months = self.archived_months()
+            guesses = set()
+            for transaction_id in missing:
+                match = re.search(r'(\d{4})(\d{2})\d{2}', transaction_id)
+                if match:
+                    guesses.add(f"{match.group(1)}-{match.group(2)}")
+            months.sort(key=lambda m: m not in guesses)
+            for month in months:
+                for t in self.iter_archived_rows([month]):
+                    if t['id'] in missing:
+                        found[t['id']] = dict(t)
+                        missing.discard(t['id'])
+                if not missing:
+                    break
+        
+        for t in found.values():
+            try:
+                t['items_list'] = json.loads(t['items'])
+            except:
+                t['items_list'] = []
+        return found
+    
+    def is_archived(self, transaction_id):
+        """Check whether a transaction lives in a closed month"""
+        return any(t['id'] == transaction_id for t in self.iter_archived_rows())
+    
     def get_by_date(self, date_str):
         """Get transactions by date (YYYY-MM-DD)"""
-        transactions = self.get_all()
-        return [t for t in transactions if t['date'] == date_str]
+        return list(self.iter_by_date_range(date_str, date_str))
     
     def get_by_date_range(self, start_date, end_date):
         """Get transactions within date range"""
-        transactions = self.get_all()
-        results = []
-        for t in transactions:
-            if start_date <= t['date'] <= end_date:
-                results.append(t)
-        return results
+        return list(self.iter_by_date_range(start_date, end_date))
     
     def add(self, items, subtotal, discount, total, payment, change, cashier="Kasir"):
         """Add new transaction"""
@@ -227,22 +688,111 @@ class TransactionDatabase:
             'total': str(total),
             'payment': str(payment),
             'change': str(change),
-            'cashier': cashier
+            'cashier': cashier,
+            'ref_id': ''
         }
         
-        with open(self.file_path, 'a', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=self.HEADERS)
-            writer.writerow(transaction)
+        with write_lock:
+            before = file_stat(self.file_path)
+            with open(self.file_path, 'a', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=self.HEADERS)
+                writer.writerow(transaction)
+        live_metrics.transaction_added(self.file_path, before, transaction)
         
         return transaction
     
+    def get_refunds(self, transaction_id):
+        """Get refunds that reverse a transaction (found through the search index)"""
+        keys = [k[:3] for k in self.search(transaction_id, '0000-00-00', '9999-99-99')]
+        offsets = KeyIndex.for_database(self).locate(self, keys)
+        rows = self._rows_for_keys([k + (offset,) for k, offset in zip(keys, offsets)])
+        return [t for t in rows if t.get('ref_id') == transaction_id]
+    
+    def get_refundable_quantities(self, transaction_id):
+        """Get {product_id: qty still refundable} of a sale"""
+        original = self.get_by_id(transaction_id)
+        if original is None:
+            return {}
+        remaining = {}
+        for item in original['items_list']:
+            remaining[item['product_id']] = remaining.get(item['product_id'], 0) + int(item['qty'])
+        for refund in self.get_refunds(transaction_id):
+            for item in refund['items_list']:
+                if item['product_id'] in remaining:
+                    remaining[item['product_id']] += int(item['qty'])  # refund qty is negative
+        return remaining
+    
+    def add_refund(self, transaction_id, quantities, cashier="Kasir"):
+        """Append a refund that reverses part of a sale
+        
+        The refund is a normal transaction with negative line items and
+        totals, so rollups and reports pick it up like any other append.
+        The original sale is never rewritten.
+        
+        Args:
+            quantities: {product_id: qty to return}
+        """
+        original = self.get_by_id(transaction_id)
+        if original is None:
+            raise ValueError("Transaksi tidak ditemukan")
+        if original.get('ref_id'):
+            raise ValueError("Refund tidak bisa direfund lagi")
+        
+        remaining = self.get_refundable_quantities(transaction_id)
+        items = []
+        for item in original['items_list']:
+            qty = int(quantities.get(item['product_id'], 0))
+            if qty <= 0:
+                continue
+            if qty > remaining.get(item['product_id'], 0):
+                raise ValueError(f"Jumlah refund {item['name']} melebihi sisa ({remaining.get(item['product_id'], 0)})")
+            price = float(item['price'])
+            items.append({
+                'product_id': item['product_id'],
+                'barcode': item['barcode'],
+                'name': item['name'],
+                'price': price,
+                'qty': -qty,
+                'subtotal': -price * qty
+            })
+        if not items:
+            raise ValueError("Tidak ada item yang direfund")
+        
+        # Apply the sale's discount proportionally
+        subtotal = sum(item['subtotal'] for item in items)
+        original_subtotal = float(original['subtotal'] or 0)
+        ratio = float(original['total'] or 0) / original_subtotal if original_subtotal else 1.0
+        total = subtotal * ratio
+        
+        now = datetime.now()
+        refund = {
+            'id': generate_transaction_id("RFD"),
+            'date': now.strftime("%Y-%m-%d"),
+            'time': now.strftime("%H:%M:%S"),
+            'items': json.dumps(items, ensure_ascii=False),
+            'subtotal': str(subtotal),
+            'discount': str(subtotal - total),
+            'total': str(total),
+            'payment': str(total),
+            'change': str(0.0),
+            'cashier': cashier,
+            'ref_id': transaction_id
+        }
+        
+        with write_lock:
+            before = file_stat(self.file_path)
+            with open(self.file_path, 'a', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=self.HEADERS)
+                writer.writerow(refund)
+        live_metrics.transaction_added(self.file_path, before, refund)
+        
+        refund['items_list'] = items
+        return refund
+    
     def get_today_summary(self):
         """Get today's sales summary"""
         today = datetime.now().strftime("%Y-%m-%d")
-        transactions = self.get_by_date(today)
-        
-        total_sales = sum(float(t['total']) for t in transactions)
-        total_transactions = len(transactions)
+        total_transactions, total_sales = self.get_range_totals(today, today)
         
         return {
             'date': today,
@@ -252,17 +802,41 @@ class TransactionDatabase:
     
     def delete(self, transaction_id):
         """Delete transaction by ID"""
-        transactions = self.get_all()
-        new_transactions = [t for t in transactions if t['id'] != transaction_id]
+        deleted, archived = self.delete_many([transaction_id])
+        return deleted > 0
+    
+    def delete_many(self, transaction_ids):
+        """Delete several transactions with a single rewrite of the CSV
         
-        if len(new_transactions) < len(transactions):
-            self._write_all(new_transactions)
-            return True
-        return False
+        Rollups subtract the removed rows and shift stored offsets instead of
+        being rebuilt.
+        
+        Returns:
+            (number deleted, IDs skipped because their month is closed)
+        """
+        ids = set(transaction_ids)
+        if not ids:
+            return 0, []
+        
+        with self._rollups_held() as rollups:
+            removed, relocate = self._rewrite_csv(lambda row: row.get('id') in ids)
+            for rollup in rollups:
+                for row in removed:
+                    rollup.apply(row, -1)
+                rollup.relocate(relocate)
+                rollup.rebase(self)
+        
+        archived = []
+        if len(removed) < len(ids):
+            missing = ids - {row.get('id') for row in removed}
+            archived = sorted({t['id'] for t in self.iter_archived_rows() if t['id'] in missing})
+            if archived and not removed:
+                raise ValueError("Transaksi berada di bulan yang sudah ditutup")
+        return len(removed), archived
     
     def update(self, transaction_id, **kwargs):
         """Update transaction by ID"""
-        transactions = self.get_all()
+        transactions = list(self.iter_csv())
         updated = False
         
         for i, t in enumerate(transactions):
@@ -275,15 +849,25 @@ class TransactionDatabase:
         
         if updated:
             self._write_all(transactions)
+        elif self.is_archived(transaction_id):
+            raise ValueError("Transaksi berada di bulan yang sudah ditutup")
         
         return updated
     
+    def _write_csv(self, transactions):
+        """Replace the CSV file atomically with the given transactions"""
+        tmp_path = self.file_path + '.tmp'
+        with write_lock:
+            with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=self.HEADERS)
+                writer.writeheader()
+                for t in transactions:
+                    # Remove parsed items_list before writing
+                    row = {k: v for k, v in t.items() if k in self.HEADERS}
+                    writer.writerow(row)
+            os.replace(tmp_path, self.file_path)
+    
     def _write_all(self, transactions):
         """Write all transactions to CSV"""
-        with open(self.file_path, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=self.HEADERS)
-            writer.writeheader()
-            for t in transactions:
-                # Remove parsed items_list before writing
-                row = {k: v for k, v in t.items() if k in self.HEADERS}
-                writer.writerow(row)
+        self._write_csv(transactions)
+        self.invalidate_caches()
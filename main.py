@@ -6,23 +6,32 @@ import tkinter as tk
 from tkinter import ttk
 import sys
 import os
+import queue
+import multiprocessing
 
 # Add app directory to path
 APP_DIR = os.path.dirname(os.path.abspath(__file__))
 if APP_DIR not in sys.path:
     sys.path.insert(0, APP_DIR)
 
-from config import COLORS, FONTS, WINDOW_MIN_WIDTH, WINDOW_MIN_HEIGHT, SIDEBAR_WIDTH
-from ui.sidebar import Sidebar
-from ui.dashboard import Dashboard
-from ui.sales import Sales
-from ui.products import Products
-from ui.history import History
-from ui.settings import Settings
-from ui.report import Report
-from ui.profit_loss import ProfitLoss
-from ui.developer import Developer
-from ui.receipt import show_receipt
+from utils import tracer
+
+with tracer.span('import.config'):
+    from config import COLORS, FONTS, WINDOW_MIN_WIDTH, WINDOW_MIN_HEIGHT, SIDEBAR_WIDTH, LOGS_DIR, store_config
+with tracer.span('import.ui.sidebar'):
+    from ui.sidebar import Sidebar
+with tracer.span('import.ui.receipt'):
+    from ui.receipt import show_receipt
+from utils.print_spooler import get_spooler, STATUS_FAILED
+from utils.backup_scheduler import get_backup_scheduler
+
+if multiprocessing.parent_process() is None:
+    # Not in a label-rendering worker (those re-import this module)
+    tracer.enable_log(LOGS_DIR)
+
+# Pages built in the background once the window is up, most used first
+PRELOAD_PAGES = ['sales', 'products', 'history']
+PRELOAD_DELAY_MS = 300
 
 
 class KasirApp(tk.Tk):
@@ -37,19 +46,37 @@ class KasirApp(tk.Tk):
         self.configure(bg=COLORS['background'])
         
         # Configure styles
-        self._setup_styles()
+        with tracer.span('init.setup_styles'):
+            self._setup_styles()
         
         # Create main layout
-        self._create_layout()
+        with tracer.span('init.create_layout'):
+            self._create_layout()
         
         # Initialize pages
-        self._init_pages()
+        with tracer.span('init.init_pages'):
+            self._init_pages()
         
         # Show dashboard by default
-        self._show_page("dashboard")
+        with tracer.span('init.show_dashboard'):
+            self._show_page("dashboard")
         
         # Center window
-        self._center_window()
+        with tracer.span('init.center_window'):
+            self._center_window()
+        
+        # First idle callback runs once the window has been drawn
+        self.after_idle(lambda: tracer.since_start('startup.first_window'))
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+        
+        # Build other pages in the background once the window is usable
+        self._start_preload()
+        
+        # Resume receipts left in the print queue and show its status
+        self.after(PRELOAD_DELAY_MS, self._start_print_status)
+        
+        # Scheduled backups (sleeps while automatic backup is off)
+        self.after(PRELOAD_DELAY_MS, get_backup_scheduler().start)
     
     def _setup_styles(self):
         """Setup ttk styles"""
@@ -109,37 +136,93 @@ class KasirApp(tk.Tk):
         self.content_frame.grid_columnconfigure(0, weight=1)
     
     def _init_pages(self):
-        """Initialize all page frames"""
+        """Register page factories; each page is built on first navigation"""
         self.pages = {}
-        
-        # Dashboard
-        self.pages['dashboard'] = Dashboard(self.content_frame)
-        
-        # Sales
-        self.pages['sales'] = Sales(self.content_frame, on_print_receipt=self._show_receipt)
-        
-        # Products
-        self.pages['products'] = Products(self.content_frame)
-        
-        # History
-        self.pages['history'] = History(self.content_frame, on_print_receipt=self._show_receipt)
-        
-        # Settings
-        self.pages['settings'] = Settings(self.content_frame)
-        
-        # Report
-        self.pages['report'] = Report(self.content_frame)
-        
-        # Profit Loss
-        self.pages['profit_loss'] = ProfitLoss(self.content_frame)
-        
-        # Developer
-        self.pages['developer'] = Developer(self.content_frame)
-        
-        # Grid all pages (hidden initially)
-        for page in self.pages.values():
+        self.current_page = None
+        self.page_factories = {
+            'dashboard': self._create_dashboard,
+            'sales': self._create_sales,
+            'products': self._create_products,
+            'history': self._create_history,
+            'settings': self._create_settings,
+            'report': self._create_report,
+            'profit_loss': self._create_profit_loss,
+            'top_products': self._create_top_products,
+            'heatmap': self._create_heatmap,
+            'developer': self._create_developer,
+        }
+        self._preload_queue = list(PRELOAD_PAGES)
+    
+    # Page factories: page modules are imported only when the page is first shown
+    
+    def _create_dashboard(self):
+        from ui.dashboard import Dashboard
+        return Dashboard(self.content_frame)
+    
+    def _create_sales(self):
+        from ui.sales import Sales
+        return Sales(self.content_frame, on_print_receipt=self._show_receipt)
+    
+    def _create_products(self):
+        from ui.products import Products
+        return Products(self.content_frame)
+    
+    def _create_history(self):
+        from ui.history import History
+        return History(self.content_frame, on_print_receipt=self._show_receipt)
+    
+    def _create_settings(self):
+        from ui.settings import Settings
+        return Settings(self.content_frame)
+    
+    def _create_report(self):
+        from ui.report import Report
+        return Report(self.content_frame)
+    
+    def _create_profit_loss(self):
+        from ui.profit_loss import ProfitLoss
+        return ProfitLoss(self.content_frame)
+    
+    def _create_top_products(self):
+        from ui.top_products import TopProducts
+        return TopProducts(self.content_frame)
+    
+    def _create_heatmap(self):
+        from ui.heatmap import SalesHeatmap
+        return SalesHeatmap(self.content_frame)
+    
+    def _create_developer(self):
+        from ui.developer import Developer
+        return Developer(self.content_frame)
+    
+    def _get_page(self, page_id):
+        """Get a page, building it on first use"""
+        page = self.pages.get(page_id)
+        if page is None and page_id in self.page_factories:
+            with tracer.span(f'page.build.{page_id}'):
+                page = self.page_factories[page_id]()
             page.grid(row=0, column=0, sticky='nsew')
             page.grid_remove()
+            self.pages[page_id] = page
+        return page
+    
+    def _start_preload(self):
+        """Build likely pages while the app is idle, after the window is shown"""
+        self.after(PRELOAD_DELAY_MS, lambda: self.after_idle(self._preload_next))
+    
+    def _preload_next(self):
+        """Build one queued page, then yield to the event loop before the next"""
+        while self._preload_queue:
+            page_id = self._preload_queue.pop(0)
+            if page_id in self.pages:
+                continue
+            try:
+                self._get_page(page_id)
+            except Exception as e:
+                print(f"Error preloading page {page_id}: {e}")
+            break
+        if self._preload_queue:
+            self.after(PRELOAD_DELAY_MS, lambda: self.after_idle(self._preload_next))
     
     def _on_menu_click(self, menu_id):
         """Handle sidebar menu click"""
@@ -147,17 +230,66 @@ class KasirApp(tk.Tk):
     
     def _show_page(self, page_id):
         """Show specified page"""
-        # Hide all pages
-        for page in self.pages.values():
-            page.grid_remove()
+        page = self._get_page(page_id)
+        if page is None:
+            return
+        
+        # Hide current page
+        if self.current_page is not None and self.current_page is not page:
+            self.current_page.grid_remove()
         
         # Show selected page
-        if page_id in self.pages:
-            self.pages[page_id].grid()
-            
-            # Refresh page data
-            if hasattr(self.pages[page_id], 'refresh'):
-                self.pages[page_id].refresh()
+        self.current_page = page
+        page.grid()
+        
+        # Refresh page data
+        if hasattr(page, 'refresh'):
+            with tracer.span(f'page.refresh.{page_id}'):
+                page.refresh()
+    
+    def _start_print_status(self):
+        """Start the print spooler and follow its jobs in the sidebar"""
+        self._print_events = queue.Queue()
+        try:
+            self.spooler = get_spooler()
+        except OSError as e:
+            print(f"Error starting print spooler: {e}")
+            return
+        self.spooler.add_listener(self._print_events.put)
+        self.sidebar.on_print_status_click = self.spooler.retry
+        self._update_print_status()
+        self._poll_print_events()
+    
+    def _poll_print_events(self):
+        """Refresh the sidebar when the spooler reports a change (Tk thread)"""
+        changed = False
+        while not self._print_events.empty():
+            self._print_events.get_nowait()
+            changed = True
+        if changed:
+            self._update_print_status()
+        self.after(500, self._poll_print_events)
+    
+    def _update_print_status(self):
+        """Summarize waiting and failed print jobs"""
+        jobs = self.spooler.jobs()
+        failed = sum(1 for job in jobs if job.status == STATUS_FAILED)
+        waiting = len(jobs) - failed
+        if failed:
+            self.sidebar.set_print_status(
+                f"⚠️ {failed} struk gagal dicetak (klik untuk ulang)", COLORS['danger'], clickable=True
+            )
+        elif waiting:
+            self.sidebar.set_print_status(f"🖨️ {waiting} struk dalam antrian")
+        else:
+            self.sidebar.set_print_status("")
+    
+    def _on_close(self):
+        """Write pending settings and the timing summary, then close the app"""
+        get_backup_scheduler().stop()
+        store_config.flush()
+        tracer.log_summary()
+        self.destroy()
     
     def _show_receipt(self, transaction):
         """Show receipt dialog"""
@@ -176,13 +308,6 @@ class KasirApp(tk.Tk):
 def main():
     """Main entry point"""
     try:
-        # Check for PIL (optional, for logo)
-        try:
-            from PIL import Image, ImageTk
-        except ImportError:
-            print("Note: PIL not installed. Logo display will use text fallback.")
-            print("Install with: pip install Pillow")
-        
         app = KasirApp()
         app.mainloop()
         
@@ -193,4 +318,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # Label rendering uses a process pool; needed for the frozen EXE on Windows
+    multiprocessing.freeze_support()
     main()
@@ -0,0 +1,63 @@
+"""
+Backup regression checks (run with: python -m unittest discover -s tests)
+"""
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.backup import BackupRepository, CHUNK_SIZE
+
+
+class BackupRepositoryTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        self.repository = BackupRepository(os.path.join(self.dir.name, "repo"))
+    
+    def _write(self, name, data, mode='wb'):
+        path = os.path.join(self.dir.name, name)
+        with open(path, mode) as f:
+            f.write(data)
+        return path
+    
+    def _restored(self, snapshot, name):
+        dest = os.path.join(self.dir.name, f"restore_{snapshot}")
+        self.repository.restore(snapshot, dest)
+        with open(os.path.join(dest, name), 'rb') as f:
+            return f.read()
+    
+    def _rows(self, stock):
+        return b"".join(b"%06d,Produk %06d,%d\n" % (i, i, stock if i == 5 else 15) for i in range(80000))
+    
+    def test_same_size_edit_in_place(self):
+        """An edit that keeps the size (stock 15 -> 14) must not reuse old chunks"""
+        path = self._write("products.csv", self._rows(15))
+        self.assertGreater(os.path.getsize(path), CHUNK_SIZE)
+        sources = [("products.csv", path)]
+        self.repository.backup(sources)
+        
+        with open(path, 'r+b') as f:
+            f.write(self._rows(14))
+        stats = self.repository.backup(sources)
+        
+        self.assertEqual(self._restored(stats['snapshot'], "products.csv"), self._rows(14))
+        self.assertGreater(stats['bytes_stored'], 0)
+    
+    def test_append_reuses_full_chunks(self):
+        path = self._write("transactions.csv", self._rows(15))
+        sources = [("transactions.csv", path)]
+        self.repository.backup(sources)
+        
+        self._write("transactions.csv", b"999999,Baru,1\n", mode='ab')
+        stats = self.repository.backup(sources)
+        
+        self.assertLess(stats['bytes_read'], CHUNK_SIZE)
+        self.assertEqual(self._restored(stats['snapshot'], "transactions.csv"), self._rows(15) + b"999999,Baru,1\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
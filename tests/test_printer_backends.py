@@ -0,0 +1,241 @@
+"""
+Printer backend checks against a local socket stand-in
+"""
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import printer_backends
+from utils.printer_backends import (
+    PrinterError, TcpPrinter, FilePrinter, SpoolDirPrinter, WindowsPrinter, CupsPrinter, open_printer
+)
+
+TIMEOUT = 5
+
+
+class FakePrinterServer:
+    """Raw socket printer on localhost that records the bytes of every connection
+    
+    With close_after_job the server hangs up after the first data it reads,
+    like a printer dropping an idle connection.
+    """
+    
+    def __init__(self, close_after_job=False):
+        self.close_after_job = close_after_job
+        self.connections = []  # bytearray per accepted connection
+        self.closed = threading.Event()
+        self._lock = threading.Lock()
+        self._listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._listener.bind(('127.0.0.1', 0))
+        self._listener.listen(5)
+        self.address = f"127.0.0.1:{self._listener.getsockname()[1]}"
+        threading.Thread(target=self._accept, daemon=True).start()
+    
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self._listener.accept()
+            except OSError:
+                return
+            received = bytearray()
+            with self._lock:
+                self.connections.append(received)
+            threading.Thread(target=self._serve, args=(conn, received), daemon=True).start()
+    
+    def _serve(self, conn, received):
+        with conn:
+            while True:
+                data = conn.recv(65536)
+                if not data:
+                    break
+                with self._lock:
+                    received.extend(data)
+                if self.close_after_job:
+                    break
+        self.closed.set()
+    
+    def received(self):
+        with self._lock:
+            return [bytes(data) for data in self.connections]
+    
+    def wait_for(self, total):
+        """Wait until total bytes arrived over all connections"""
+        deadline = time.monotonic() + TIMEOUT
+        while time.monotonic() < deadline:
+            if sum(len(data) for data in self.received()) >= total:
+                return self.received()
+            time.sleep(0.01)
+        raise AssertionError(f"Server got {self.received()!r}, expected {total} bytes")
+    
+    def close(self):
+        self._listener.close()
+
+
+class BrokenSocket:
+    """Socket stand-in that accepts fail_after bytes, then raises"""
+    
+    def __init__(self, fail_after):
+        self.fail_after = fail_after
+        self.sent = b''
+    
+    def send(self, data):
+        if len(self.sent) >= self.fail_after:
+            raise BrokenPipeError("printer hung up")
+        n = min(len(data), self.fail_after - len(self.sent))
+        self.sent += bytes(data[:n])
+        return n
+    
+    def close(self):
+        pass
+
+
+class TcpPrinterTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.server = None
+    
+    def tearDown(self):
+        if self.server is not None:
+            self.server.close()
+    
+    def test_jobs_reuse_one_connection(self):
+        self.server = FakePrinterServer()
+        printer = TcpPrinter(self.server.address)
+        try:
+            printer.write(b"job one\n")
+            printer.write(b"job two\n")
+            received = self.server.wait_for(16)
+        finally:
+            printer.close()
+        self.assertEqual(received, [b"job one\njob two\n"])
+    
+    def test_reconnect_after_peer_closes_idle_connection(self):
+        self.server = FakePrinterServer(close_after_job=True)
+        printer = TcpPrinter(self.server.address)
+        try:
+            printer.write(b"first\n")
+            self.assertTrue(self.server.closed.wait(TIMEOUT))
+            time.sleep(0.05)  # let the FIN reach the client
+            printer.write(b"second\n")
+            received = self.server.wait_for(13)
+        finally:
+            printer.close()
+        self.assertEqual(received, [b"first\n", b"second\n"])
+    
+    def test_no_resend_after_partial_send(self):
+        self.server = FakePrinterServer()
+        printer = TcpPrinter(self.server.address)
+        broken = BrokenSocket(fail_after=4)
+        printer._sock = broken
+        printer._is_alive = lambda: True
+        with self.assertRaises(PrinterError):
+            printer.write(b"receipt data")
+        self.assertEqual(broken.sent, b"rece")
+        # Nothing went out on a new connection
+        time.sleep(0.1)
+        self.assertEqual(self.server.received(), [])
+    
+    def test_resend_when_nothing_was_sent(self):
+        self.server = FakePrinterServer()
+        printer = TcpPrinter(self.server.address)
+        printer._sock = BrokenSocket(fail_after=0)
+        printer._is_alive = lambda: True
+        try:
+            printer.write(b"receipt data")
+            received = self.server.wait_for(12)
+        finally:
+            printer.close()
+        self.assertEqual(received, [b"receipt data"])
+    
+    def test_unreachable_printer(self):
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.bind(('127.0.0.1', 0))
+        port = listener.getsockname()[1]
+        listener.close()  # nothing listens on this port now
+        with self.assertRaises(PrinterError):
+            TcpPrinter(f"127.0.0.1:{port}").write(b"x")
+
+
+class FileBackendTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+    
+    def test_file_printer_appends_jobs(self):
+        path = os.path.join(self.dir.name, "lp0")
+        printer = FilePrinter(path)
+        try:
+            printer.write(b"one")
+            printer.write(b"two")
+        finally:
+            printer.close()
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(), b"onetwo")
+    
+    def test_file_printer_error(self):
+        printer = FilePrinter(os.path.join(self.dir.name, "missing", "lp0"))
+        with self.assertRaises(PrinterError):
+            printer.write(b"x")
+    
+    def test_spool_dir_writes_one_file_per_job(self):
+        spool = os.path.join(self.dir.name, "spool")
+        printer = SpoolDirPrinter(spool)
+        printer.write(b"first", title="Struk 1")
+        printer.write(b"second", title="Struk/2")
+        names = sorted(os.listdir(spool))
+        self.assertEqual(len(names), 2)
+        self.assertTrue(all(name.endswith('.prn') for name in names))
+        contents = set()
+        for name in names:
+            with open(os.path.join(spool, name), 'rb') as f:
+                contents.add(f.read())
+        self.assertEqual(contents, {b"first", b"second"})
+
+
+class OpenPrinterTest(unittest.TestCase):
+    
+    def test_scheme_dispatch(self):
+        printer = open_printer("tcp://192.168.1.50:9100")
+        self.assertIsInstance(printer, TcpPrinter)
+        self.assertEqual((printer.host, printer.port), ("192.168.1.50", 9100))
+        self.assertEqual(open_printer("TCP://printer.local").port, TcpPrinter.DEFAULT_PORT)
+        
+        printer = open_printer("file:///dev/usb/lp0")
+        self.assertIsInstance(printer, FilePrinter)
+        self.assertEqual(printer.path, "/dev/usb/lp0")
+        
+        printer = open_printer("spool:///var/spool/kasir")
+        self.assertIsInstance(printer, SpoolDirPrinter)
+        self.assertEqual(printer.path, "/var/spool/kasir")
+    
+    def test_installed_printer(self):
+        expected = WindowsPrinter if os.name == 'nt' else CupsPrinter
+        self.assertIsInstance(open_printer("EPSON TM-T82"), expected)
+    
+    def test_errors(self):
+        for name in ("", None, "lpt://1", "tcp://", "tcp://host:notaport", "file://", "spool://"):
+            with self.subTest(name=name):
+                with self.assertRaises(PrinterError):
+                    open_printer(name)
+    
+    def test_register_backend(self):
+        class Recorder(printer_backends.PrinterBackend):
+            def __init__(self, target):
+                self.target = target
+        
+        printer_backends.register_backend("Rec", Recorder)
+        self.addCleanup(printer_backends.BACKENDS.pop, "rec")
+        printer = open_printer("rec://anything")
+        self.assertIsInstance(printer, Recorder)
+        self.assertEqual(printer.target, "anything")
+
+
+if __name__ == '__main__':
+    unittest.main()
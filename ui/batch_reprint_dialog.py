@@ -0,0 +1,141 @@
+"""
+Batch Reprint Dialog Component - Reprint selected or a whole day's receipts at once
+"""
+import tkinter as tk
+from tkinter import messagebox, filedialog
+from config import COLORS, FONTS, store_config
+from db_manager import TransactionDatabase
+from ui.loader import BackgroundLoader
+from utils.receipt_batch import load_transactions, print_batch, save_batch
+
+class BatchReprintDialog(tk.Toplevel):
+    """Dialog to send many receipts as one printer job or one file"""
+    
+    FORMATS = [("Teks (.txt)", '.txt'), ("Data printer (.prn)", '.prn')]
+    
+    def __init__(self, parent, selected_ids, date):
+        super().__init__(parent)
+        
+        self.transaction_db = TransactionDatabase()
+        self.loader = BackgroundLoader(self)
+        self.selected_ids = list(selected_ids)
+        self.printer_name = store_config.get('default_printer', '')
+        
+        self.title("Cetak Ulang Massal")
+        self.geometry("420x400")
+        self.resizable(False, False)
+        self.transient(parent)
+        self.configure(bg=COLORS['white'])
+        
+        # Center window
+        self.update_idletasks()
+        x = (self.winfo_screenwidth() - 420) // 2
+        y = (self.winfo_screenheight() - 400) // 2
+        self.geometry(f"+{x}+{y}")
+        
+        self._create_widgets(date)
+    
+    def _create_widgets(self, date):
+        p = tk.Frame(self, bg=COLORS['white'], padx=20, pady=20)
+        p.pack(fill='both', expand=True)
+        
+        # Source
+        tk.Label(p, text="Struk:", font=FONTS['body_bold'], bg=COLORS['white']).pack(anchor='w')
+        self.source_var = tk.StringVar(value='selected' if self.selected_ids else 'date')
+        tk.Radiobutton(
+            p, text=f"Transaksi terpilih ({len(self.selected_ids)})", variable=self.source_var, value='selected',
+            font=FONTS['body'], bg=COLORS['white'], activebackground=COLORS['white'],
+            state='normal' if self.selected_ids else 'disabled'
+        ).pack(anchor='w')
+        
+        date_row = tk.Frame(p, bg=COLORS['white'])
+        date_row.pack(fill='x')
+        tk.Radiobutton(
+            date_row, text="Semua transaksi tanggal:", variable=self.source_var, value='date',
+            font=FONTS['body'], bg=COLORS['white'], activebackground=COLORS['white']
+        ).pack(side='left')
+        self.date_var = tk.StringVar(value=date)
+        tk.Entry(date_row, textvariable=self.date_var, width=12, font=FONTS['body']).pack(side='left', padx=5)
+        
+        # Target
+        tk.Label(p, text="Tujuan:", font=FONTS['body_bold'], bg=COLORS['white']).pack(anchor='w', pady=(10, 0))
+        self.target_var = tk.StringVar(value='printer' if self.printer_name else self.FORMATS[0][1])
+        tk.Radiobutton(
+            p, text=f"Printer ({self.printer_name or 'belum dipilih'}) - satu job", variable=self.target_var, value='printer',
+            font=FONTS['body'], bg=COLORS['white'], activebackground=COLORS['white'],
+            state='normal' if self.printer_name else 'disabled'
+        ).pack(anchor='w')
+        for text, value in self.FORMATS:
+            tk.Radiobutton(
+                p, text=f"Simpan ke file {text}", variable=self.target_var, value=value,
+                font=FONTS['body'], bg=COLORS['white'], activebackground=COLORS['white']
+            ).pack(anchor='w')
+        
+        self.status_label = tk.Label(p, text="", font=FONTS['small'], fg=COLORS['text_light'], bg=COLORS['white'])
+        self.status_label.pack(anchor='w', pady=(15, 0))
+        
+        # Buttons
+        btn_frame = tk.Frame(p, bg=COLORS['white'])
+        btn_frame.pack(fill='x', side='bottom')
+        
+        tk.Button(btn_frame, text="Tutup", command=self.destroy, font=FONTS['body'], bg='#E2E8F0', relief='flat').pack(side='left', fill='x', expand=True, padx=(0, 5))
+        
+        self.run_btn = tk.Button(btn_frame, text="🖨️ Proses", command=self._start, font=FONTS['body_bold'], bg=COLORS['primary'], fg='white', relief='flat')
+        self.run_btn.pack(side='left', fill='x', expand=True, padx=(5, 0))
+    
+    def _start(self):
+        """Read choices on the Tk thread, then load, render and send in the background"""
+        if self.source_var.get() == 'selected':
+            ids, date = self.selected_ids, None
+            name = f"struk_{len(ids)}_transaksi"
+        else:
+            ids, date = None, self.date_var.get().strip()
+            name = f"struk_{date}"
+        
+        target = self.target_var.get()
+        filepath = None
+        if target != 'printer':
+            filepath = filedialog.asksaveasfilename(
+                parent=self,
+                title="Simpan Struk",
+                defaultextension=target,
+                initialfile=f"{name}{target}",
+                filetypes=[(text, f"*{ext}") for text, ext in self.FORMATS if ext == target]
+            )
+            if not filepath:
+                return
+        printer_name = self.printer_name
+        
+        def work():
+            transactions = load_transactions(self.transaction_db, ids=ids, date=date)
+            if transactions:
+                if filepath:
+                    save_batch(filepath, transactions)
+                else:
+                    print_batch(printer_name, transactions)
+            return len(transactions), filepath
+        
+        self.run_btn.configure(state='disabled')
+        self.status_label.configure(text="Menyiapkan struk...", fg=COLORS['text_light'])
+        self.loader.submit('batch', work, self._on_done, on_error=self._on_error)
+    
+    def _on_done(self, result):
+        count, filepath = result
+        self.run_btn.configure(state='normal')
+        if count == 0:
+            self.status_label.configure(text="Tidak ada transaksi", fg=COLORS['text_light'])
+        elif filepath:
+            self.status_label.configure(text=f"✅ {count} struk disimpan", fg=COLORS['success'])
+            messagebox.showinfo("Sukses", f"{count} struk berhasil disimpan ke:\n{filepath}", parent=self)
+        else:
+            self.status_label.configure(text=f"✅ {count} struk masuk antrian cetak (1 job)", fg=COLORS['success'])
+    
+    def _on_error(self, error):
+        self.run_btn.configure(state='normal')
+        self.status_label.configure(text="Cetak ulang gagal", fg=COLORS['danger'])
+        messagebox.showerror("Error", f"Gagal cetak ulang: {error}", parent=self)
+
+
+def show_batch_reprint_dialog(parent, selected_ids, date):
+    """Show batch reprint dialog"""
+    BatchReprintDialog(parent, selected_ids, date)
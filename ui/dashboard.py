@@ -6,6 +6,8 @@ from tkinter import ttk
 from config import COLORS, FONTS
 from db_manager import ProductDatabase, TransactionDatabase
 from utils.helpers import format_currency, get_current_date, format_date
+from utils.live_metrics import live_metrics
+from ui.loader import BackgroundLoader
 from datetime import datetime
 
 class Dashboard(tk.Frame):
@@ -16,6 +18,8 @@ class Dashboard(tk.Frame):
         
         self.product_db = ProductDatabase()
         self.transaction_db = TransactionDatabase()
+        self.loader = BackgroundLoader(self)
+        self._clock_job = None
         
         self._create_widgets()
     
@@ -64,6 +68,7 @@ class Dashboard(tk.Frame):
         
         # Start clock update
         self._update_clock()
+        self.bind('<Map>', self._start_clock)
     
     def _create_stats_cards(self):
         """Create statistics cards"""
@@ -75,15 +80,11 @@ class Dashboard(tk.Frame):
         cards_frame.grid_columnconfigure(1, weight=1, uniform='card')
         cards_frame.grid_columnconfigure(2, weight=1, uniform='card')
         
-        # Get data
-        summary = self.transaction_db.get_today_summary()
-        products = self.product_db.get_all()
-        
-        # Cards data
+        # Cards data (values are filled in by refresh)
         cards_data = [
-            ("Penjualan Hari Ini", format_currency(summary['total_sales']), COLORS['success'], "💰"),
-            ("Transaksi Hari Ini", str(summary['total_transactions']), COLORS['primary'], "🧾"),
-            ("Total Produk", str(len(products)), COLORS['warning'], "📦"),
+            ("Penjualan Hari Ini", "-", COLORS['success'], "💰"),
+            ("Transaksi Hari Ini", "-", COLORS['primary'], "🧾"),
+            ("Total Produk", "-", COLORS['warning'], "📦"),
         ]
         
         self.stat_cards = []
@@ -188,20 +189,13 @@ class Dashboard(tk.Frame):
         
         self.transactions_tree.pack(side='left', fill='both', expand=True, padx=10, pady=10)
         scrollbar.pack(side='right', fill='y', pady=10)
-        
-        # Load data
-        self._load_recent_transactions()
     
-    def _load_recent_transactions(self):
+    def _load_recent_transactions(self, transactions):
         """Load recent transactions into treeview"""
         # Clear existing
         for item in self.transactions_tree.get_children():
             self.transactions_tree.delete(item)
         
-        # Get recent transactions (last 10)
-        transactions = self.transaction_db.get_all()
-        transactions = sorted(transactions, key=lambda x: (x['date'], x['time']), reverse=True)[:10]
-        
         for t in transactions:
             self.transactions_tree.insert('', 'end', values=(
                 t['id'],
@@ -253,16 +247,16 @@ class Dashboard(tk.Frame):
         )
         products_label.pack(side='left', padx=(20, 0))
     
-    def refresh(self):
-        """Refresh dashboard data"""
-        # Update stats
-        summary = self.transaction_db.get_today_summary()
-        products = self.product_db.get_all()
-        
+    def _fetch_data(self):
+        """Read dashboard data (runs on a worker thread when counters need seeding)"""
+        return live_metrics.snapshot(self.transaction_db, self.product_db)
+    
+    def _show_data(self, data):
+        """Show loaded dashboard data"""
         values = [
-            format_currency(summary['total_sales']),
-            str(summary['total_transactions']),
-            str(len(products))
+            format_currency(data['total_sales']),
+            str(data['total_transactions']),
+            str(data['product_count'])
         ]
         
         for i, (card, _) in enumerate(self.stat_cards):
@@ -270,12 +264,31 @@ class Dashboard(tk.Frame):
                 card.value_label.configure(text=values[i])
         
         # Refresh transactions
-        self._load_recent_transactions()
+        self._load_recent_transactions(data['recent'])
+    
+    def refresh(self):
+        """Refresh dashboard data"""
+        if live_metrics.is_current(self.transaction_db, self.product_db):
+            # Counters are up to date: no database reads needed
+            self.loader.cancel('data')
+            self._show_data(self._fetch_data())
+        else:
+            self.loader.submit('data', self._fetch_data, self._show_data)
+    
+    def _start_clock(self, event=None):
+        """Restart the clock when the page is shown again"""
+        if self._clock_job is None:
+            self._update_clock()
     
     def _update_clock(self):
-        """Update clock display every second"""
+        """Update clock display every second while the page is shown"""
         now = datetime.now()
         time_str = now.strftime("🕐 %H:%M:%S")
         self.clock_label.configure(text=time_str)
-        # Schedule next update in 1 second
-        self.after(1000, self._update_clock)
+        
+        # Stop ticking while hidden; <Map> restarts it
+        if not self.winfo_ismapped():
+            self._clock_job = None
+            return
+        # Schedule next update at the start of the next second
+        self._clock_job = self.after(1000 - now.microsecond // 1000, self._update_clock)
@@ -3,10 +3,11 @@ Developer Component - Developer information page
 """
 import tkinter as tk
 from tkinter import ttk
-from PIL import Image, ImageTk
 import os
 import webbrowser
 from config import COLORS, FONTS, ASSETS_DIR
+from utils import tracer
+from utils.image_cache import get_thumbnail
 
 class Developer(tk.Frame):
     """Developer information page"""
@@ -22,7 +23,12 @@ class Developer(tk.Frame):
         self._create_header()
         
         # Content
-        self._create_content()
+        body = tk.Frame(self, bg=COLORS['background'])
+        body.pack(fill='both', expand=True, padx=30, pady=(0, 30))
+        self._create_content(body)
+        
+        # Timing summary
+        self._create_trace_section(body)
     
     def _create_header(self):
         """Create page header"""
@@ -37,19 +43,15 @@ class Developer(tk.Frame):
             bg=COLORS['background']
         ).pack(side='left')
     
-    def _create_content(self):
+    def _create_content(self, parent):
         """Create main content"""
-        # Center container
-        container = tk.Frame(self, bg=COLORS['background'])
-        container.pack(expand=True)
-        
         # Card
-        card = tk.Frame(container, bg=COLORS['card'])
+        card = tk.Frame(parent, bg=COLORS['card'])
         card.configure(highlightbackground=COLORS['border'], highlightthickness=1)
-        card.pack(padx=50, pady=30)
+        card.pack(side='left', anchor='n', padx=(0, 20))
         
         inner = tk.Frame(card, bg=COLORS['card'])
-        inner.pack(padx=50, pady=40)
+        inner.pack(padx=40, pady=30)
         
         # Developer photo
         self._create_photo(inner)
@@ -118,13 +120,10 @@ class Developer(tk.Frame):
         photo_frame.pack_propagate(False)
         
         # Try to load developer image
-        photo_path = os.path.join(ASSETS_DIR, "developer.jpg")
-        if os.path.exists(photo_path):
+        photo_path = get_thumbnail(os.path.join(ASSETS_DIR, "developer.jpg"), (120, 120))
+        if photo_path:
             try:
-                img = Image.open(photo_path)
-                # Resize and make circular crop
-                img = img.resize((120, 120), Image.Resampling.LANCZOS)
-                self.dev_image = ImageTk.PhotoImage(img)
+                self.dev_image = tk.PhotoImage(file=photo_path)
                 
                 photo_label = tk.Label(photo_frame, image=self.dev_image, bg=COLORS['primary'])
                 photo_label.place(relx=0.5, rely=0.5, anchor='center')
@@ -178,6 +177,79 @@ class Developer(tk.Frame):
         value_label.bind('<Enter>', lambda e, lbl=value_label: lbl.configure(fg=COLORS['primary_dark']))
         value_label.bind('<Leave>', lambda e, lbl=value_label: lbl.configure(fg=COLORS['primary']))
     
+    def _create_trace_section(self, parent):
+        """Create table of startup, page and database timings"""
+        section = tk.Frame(parent, bg=COLORS['card'])
+        section.configure(highlightbackground=COLORS['border'], highlightthickness=1)
+        section.pack(side='left', fill='both', expand=True)
+        
+        header = tk.Frame(section, bg=COLORS['card'])
+        header.pack(fill='x', padx=15, pady=(15, 10))
+        
+        tk.Label(
+            header,
+            text="⏱️ Performa",
+            font=FONTS['subheading'],
+            fg=COLORS['text'],
+            bg=COLORS['card']
+        ).pack(side='left')
+        
+        tk.Button(
+            header,
+            text="Reset",
+            command=self._reset_trace,
+            font=FONTS['small'],
+            fg='#64748B',
+            bg='#E2E8F0',
+            relief='flat',
+            cursor='hand2'
+        ).pack(side='right')
+        
+        tk.Button(
+            header,
+            text="🔄 Muat Ulang",
+            command=self._load_trace,
+            font=FONTS['small'],
+            fg='white',
+            bg=COLORS['primary'],
+            relief='flat',
+            cursor='hand2'
+        ).pack(side='right', padx=(0, 5))
+        
+        table_frame = tk.Frame(section, bg=COLORS['card'])
+        table_frame.pack(fill='both', expand=True, padx=15, pady=(0, 15))
+        
+        columns = ('name', 'count', 'total', 'avg', 'max', 'last')
+        self.trace_tree = ttk.Treeview(table_frame, columns=columns, show='headings')
+        for column, text, width, anchor in (
+            ('name', 'Proses', 260, 'w'),
+            ('count', 'Jumlah', 70, 'e'),
+            ('total', 'Total (ms)', 90, 'e'),
+            ('avg', 'Rata-rata (ms)', 100, 'e'),
+            ('max', 'Maks (ms)', 90, 'e'),
+            ('last', 'Terakhir (ms)', 100, 'e'),
+        ):
+            self.trace_tree.heading(column, text=text)
+            self.trace_tree.column(column, width=width, anchor=anchor, stretch=(column == 'name'))
+        
+        scrollbar = ttk.Scrollbar(table_frame, orient='vertical', command=self.trace_tree.yview)
+        self.trace_tree.configure(yscrollcommand=scrollbar.set)
+        self.trace_tree.pack(side='left', fill='both', expand=True)
+        scrollbar.pack(side='right', fill='y')
+    
+    def _load_trace(self):
+        """Fill the timing table, slowest total first"""
+        self.trace_tree.delete(*self.trace_tree.get_children())
+        for name, count, total, avg, longest, last in tracer.summary():
+            self.trace_tree.insert('', 'end', values=(
+                name, count, f"{total:.1f}", f"{avg:.2f}", f"{longest:.2f}", f"{last:.2f}"
+            ))
+    
+    def _reset_trace(self):
+        """Clear collected timings"""
+        tracer.reset()
+        self._load_trace()
+    
     def _open_link(self, url):
         """Open link in browser"""
         try:
@@ -187,4 +259,4 @@ class Developer(tk.Frame):
     
     def refresh(self):
         """Refresh page"""
-        pass
+        self._load_trace()
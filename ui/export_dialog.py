@@ -0,0 +1,178 @@
+"""
+Export Dialog Component - Export a date range to CSV/XLSX in the background
+"""
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+import threading
+from config import COLORS, FONTS
+from db_manager import ProductDatabase, TransactionDatabase
+from utils.helpers import parse_float
+from utils.export import export_range, ExportCancelled
+
+class ExportDialog(tk.Toplevel):
+    """Dialog to export daily summaries or line items of a date range"""
+    
+    KINDS = [("Ringkasan Harian", 'daily'), ("Detail Item Penjualan", 'items')]
+    FORMATS = [("Excel (.xlsx)", '.xlsx'), ("CSV (.csv)", '.csv')]
+    
+    def __init__(self, parent, start_date, end_date):
+        super().__init__(parent)
+        
+        self.title("Export Laporan")
+        self.geometry("420x380")
+        self.resizable(False, False)
+        self.transient(parent)
+        self.configure(bg=COLORS['white'])
+        
+        # Center window
+        self.update_idletasks()
+        x = (self.winfo_screenwidth() - 420) // 2
+        y = (self.winfo_screenheight() - 380) // 2
+        self.geometry(f"+{x}+{y}")
+        
+        self.cancel_event = threading.Event()
+        self.worker = None
+        self.progress_value = 0.0
+        self.result = None
+        
+        self._create_widgets(start_date, end_date)
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+    
+    def _create_widgets(self, start_date, end_date):
+        p = tk.Frame(self, bg=COLORS['white'], padx=20, pady=20)
+        p.pack(fill='both', expand=True)
+        
+        # Date range
+        range_frame = tk.Frame(p, bg=COLORS['white'])
+        range_frame.pack(fill='x', pady=(0, 15))
+        
+        tk.Label(range_frame, text="Dari:", font=FONTS['body'], bg=COLORS['white']).pack(side='left')
+        self.date_from_var = tk.StringVar(value=start_date)
+        tk.Entry(range_frame, textvariable=self.date_from_var, width=12, font=FONTS['body']).pack(side='left', padx=5)
+        
+        tk.Label(range_frame, text="Sampai:", font=FONTS['body'], bg=COLORS['white']).pack(side='left', padx=(10, 0))
+        self.date_to_var = tk.StringVar(value=end_date)
+        tk.Entry(range_frame, textvariable=self.date_to_var, width=12, font=FONTS['body']).pack(side='left', padx=5)
+        
+        # Kind
+        tk.Label(p, text="Data:", font=FONTS['body_bold'], bg=COLORS['white']).pack(anchor='w')
+        self.kind_var = tk.StringVar(value=self.KINDS[0][1])
+        for text, value in self.KINDS:
+            tk.Radiobutton(
+                p, text=text, variable=self.kind_var, value=value,
+                font=FONTS['body'], bg=COLORS['white'], activebackground=COLORS['white']
+            ).pack(anchor='w')
+        
+        # Format
+        tk.Label(p, text="Format:", font=FONTS['body_bold'], bg=COLORS['white']).pack(anchor='w', pady=(10, 0))
+        self.format_var = tk.StringVar(value=self.FORMATS[0][1])
+        for text, value in self.FORMATS:
+            tk.Radiobutton(
+                p, text=text, variable=self.format_var, value=value,
+                font=FONTS['body'], bg=COLORS['white'], activebackground=COLORS['white']
+            ).pack(anchor='w')
+        
+        # Progress
+        self.progress_bar = ttk.Progressbar(p, orient='horizontal', mode='determinate', maximum=100)
+        self.progress_bar.pack(fill='x', pady=(15, 5))
+        
+        self.status_label = tk.Label(p, text="", font=FONTS['small'], fg=COLORS['text_light'], bg=COLORS['white'])
+        self.status_label.pack(anchor='w')
+        
+        # Buttons
+        btn_frame = tk.Frame(p, bg=COLORS['white'])
+        btn_frame.pack(fill='x', side='bottom')
+        
+        self.close_btn = tk.Button(btn_frame, text="Tutup", command=self._on_close, font=FONTS['body'], bg='#E2E8F0', relief='flat')
+        self.close_btn.pack(side='left', fill='x', expand=True, padx=(0, 5))
+        
+        self.export_btn = tk.Button(btn_frame, text="📤 Export", command=self._start_export, font=FONTS['body_bold'], bg=COLORS['primary'], fg='white', relief='flat')
+        self.export_btn.pack(side='left', fill='x', expand=True, padx=(5, 0))
+    
+    def _start_export(self):
+        """Ask for target file and start the export thread"""
+        kind = self.kind_var.get()
+        extension = self.format_var.get()
+        start_date = self.date_from_var.get()
+        end_date = self.date_to_var.get()
+        
+        name = "ringkasan_harian" if kind == 'daily' else "detail_item"
+        filepath = filedialog.asksaveasfilename(
+            parent=self,
+            title="Simpan Export",
+            defaultextension=extension,
+            initialfile=f"{name}_{start_date}_{end_date}{extension}",
+            filetypes=[(text, f"*{ext}") for text, ext in self.FORMATS if ext == extension]
+        )
+        if not filepath:
+            return
+        
+        self.cancel_event.clear()
+        self.progress_value = 0.0
+        self.result = None
+        self.export_btn.configure(state='disabled')
+        self.close_btn.configure(text="Batal")
+        self.status_label.configure(text="Mengekspor...", fg=COLORS['text_light'])
+        
+        self.worker = threading.Thread(
+            target=self._run_export,
+            args=(kind, start_date, end_date, filepath),
+            daemon=True
+        )
+        self.worker.start()
+        self._poll_progress()
+    
+    def _run_export(self, kind, start_date, end_date, filepath):
+        """Worker thread: stream rows to the file"""
+        def on_progress(done, total):
+            self.progress_value = (done / total * 100) if total else 100
+        
+        try:
+            buy_prices = {p['id']: parse_float(p.get('buy_price', 0)) for p in ProductDatabase().get_all()}
+            count = export_range(
+                TransactionDatabase(), kind, start_date, end_date, filepath,
+                buy_prices=buy_prices, on_progress=on_progress, cancel_event=self.cancel_event
+            )
+            self.result = ('done', count, filepath)
+        except ExportCancelled:
+            self.result = ('cancelled', 0, filepath)
+        except Exception as e:
+            self.result = ('error', e, filepath)
+    
+    def _poll_progress(self):
+        """Update progress bar from the main thread"""
+        if not self.winfo_exists():
+            return
+        self.progress_bar['value'] = self.progress_value
+        
+        if self.result is None:
+            self.after(100, self._poll_progress)
+            return
+        
+        status, value, filepath = self.result
+        self.worker = None
+        self.export_btn.configure(state='normal')
+        self.close_btn.configure(text="Tutup")
+        
+        if status == 'done':
+            self.progress_bar['value'] = 100
+            self.status_label.configure(text=f"✅ {value} baris diekspor", fg=COLORS['success'])
+            messagebox.showinfo("Sukses", f"{value} baris berhasil diexport ke:\n{filepath}", parent=self)
+        elif status == 'cancelled':
+            self.progress_bar['value'] = 0
+            self.status_label.configure(text="Export dibatalkan", fg=COLORS['text_light'])
+        else:
+            self.status_label.configure(text="Export gagal", fg=COLORS['danger'])
+            messagebox.showerror("Error", f"Gagal export: {value}", parent=self)
+    
+    def _on_close(self):
+        """Cancel a running export, or close the dialog"""
+        if self.worker is not None:
+            self.cancel_event.set()
+            return
+        self.destroy()
+
+
+def show_export_dialog(parent, start_date, end_date):
+    """Show export dialog"""
+    ExportDialog(parent, start_date, end_date)
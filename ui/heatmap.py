@@ -0,0 +1,232 @@
+"""
+Sales Heatmap Component - Hour-of-day x weekday sales for staffing
+"""
+import tkinter as tk
+from tkinter import ttk
+from datetime import datetime, timedelta
+from config import COLORS, FONTS
+from db_manager import TransactionDatabase
+from utils.helpers import format_currency, get_current_date
+from ui.loader import BackgroundLoader
+
+class SalesHeatmap(tk.Frame):
+    """Heatmap of revenue / transaction count per weekday and hour"""
+    
+    DAYS = ["Senin", "Selasa", "Rabu", "Kamis", "Jumat", "Sabtu", "Minggu"]
+    METRICS = [("Pendapatan", 'revenue'), ("Jumlah Transaksi", 'count')]
+    
+    def __init__(self, parent):
+        super().__init__(parent, bg=COLORS['background'])
+        
+        self.transaction_db = TransactionDatabase()
+        self.loader = BackgroundLoader(self)
+        self.revenue = [[0.0] * 24 for _ in range(7)]
+        self.count = [[0] * 24 for _ in range(7)]
+        self.heat_image = None
+        
+        self._create_widgets()
+    
+    def _create_widgets(self):
+        # Header
+        self._create_header()
+        
+        # Filter section
+        self._create_filter_section()
+        
+        # Heatmap canvas
+        self._create_chart_section()
+    
+    def _create_header(self):
+        """Create page header"""
+        header = tk.Frame(self, bg=COLORS['background'])
+        header.pack(fill='x', padx=30, pady=(30, 20))
+        
+        tk.Label(
+            header,
+            text="🕐 Jam Ramai",
+            font=FONTS['heading'],
+            fg=COLORS['text'],
+            bg=COLORS['background']
+        ).pack(side='left')
+        
+        # Summary
+        self.summary_label = tk.Label(
+            header,
+            text="",
+            font=FONTS['body'],
+            fg=COLORS['text_light'],
+            bg=COLORS['background']
+        )
+        self.summary_label.pack(side='right')
+    
+    def _create_filter_section(self):
+        """Create date range and metric selector"""
+        filter_frame = tk.Frame(self, bg=COLORS['card'])
+        filter_frame.configure(highlightbackground=COLORS['border'], highlightthickness=1)
+        filter_frame.pack(fill='x', padx=30, pady=(0, 10))
+        
+        inner = tk.Frame(filter_frame, bg=COLORS['card'])
+        inner.pack(fill='x', padx=20, pady=15)
+        
+        # Date from (default: last 4 weeks)
+        tk.Label(inner, text="Dari:", font=FONTS['body'], bg=COLORS['card']).pack(side='left', padx=(0, 5))
+        four_weeks_ago = (datetime.now() - timedelta(days=28)).strftime("%Y-%m-%d")
+        self.date_from_var = tk.StringVar(value=four_weeks_ago)
+        tk.Entry(inner, textvariable=self.date_from_var, width=12, font=FONTS['body']).pack(side='left', padx=5)
+        
+        # Date to
+        tk.Label(inner, text="Sampai:", font=FONTS['body'], bg=COLORS['card']).pack(side='left', padx=(20, 5))
+        self.date_to_var = tk.StringVar(value=get_current_date())
+        tk.Entry(inner, textvariable=self.date_to_var, width=12, font=FONTS['body']).pack(side='left', padx=5)
+        
+        # Metric
+        self.metric_var = tk.StringVar(value=self.METRICS[0][0])
+        metric_combo = ttk.Combobox(
+            inner,
+            textvariable=self.metric_var,
+            values=[name for name, _ in self.METRICS],
+            font=FONTS['body'],
+            state='readonly',
+            width=16
+        )
+        metric_combo.pack(side='left', padx=(20, 5))
+        metric_combo.bind('<<ComboboxSelected>>', lambda e: self._draw_heatmap())
+        
+        # Filter button
+        tk.Button(
+            inner,
+            text="🔍 Tampilkan",
+            font=FONTS['body'],
+            fg=COLORS['white'],
+            bg=COLORS['primary'],
+            relief='flat',
+            cursor='hand2',
+            command=self._load_data
+        ).pack(side='left', padx=20)
+    
+    def _create_chart_section(self):
+        """Create heatmap canvas"""
+        section = tk.Frame(self, bg=COLORS['card'])
+        section.configure(highlightbackground=COLORS['border'], highlightthickness=1)
+        section.pack(fill='both', expand=True, padx=30, pady=(10, 20))
+        
+        self.chart_canvas = tk.Canvas(
+            section,
+            bg=COLORS['white'],
+            highlightthickness=0,
+            height=350
+        )
+        self.chart_canvas.pack(fill='both', expand=True, padx=20, pady=20)
+        self.chart_canvas.bind('<Configure>', lambda e: self._draw_heatmap())
+    
+    def _load_data(self):
+        """Load weekday x hour matrices for the selected range"""
+        date_from = self.date_from_var.get()
+        date_to = self.date_to_var.get()
+        self.loader.submit(
+            'data',
+            lambda: self.transaction_db.get_hourly_heatmap(date_from, date_to),
+            self._show_data
+        )
+    
+    def _show_data(self, matrices):
+        """Show loaded matrices"""
+        self.revenue, self.count = matrices
+        
+        # Busiest slot by transaction count
+        busiest = max(
+            ((self.count[d][h], d, h) for d in range(7) for h in range(24)),
+            default=(0, 0, 0)
+        )
+        total_count = sum(sum(row) for row in self.count)
+        total_revenue = sum(sum(row) for row in self.revenue)
+        if busiest[0] > 0:
+            _, day, hour = busiest
+            busiest_text = f" | Tersibuk: {self.DAYS[day]} {hour:02d}:00"
+        else:
+            busiest_text = ""
+        self.summary_label.configure(
+            text=f"{total_count} transaksi | {format_currency(total_revenue)}{busiest_text}"
+        )
+        
+        self._draw_heatmap()
+    
+    @staticmethod
+    def _blend(color_from, color_to, ratio):
+        """Blend two #RRGGBB colors"""
+        c1 = [int(color_from[i:i + 2], 16) for i in (1, 3, 5)]
+        c2 = [int(color_to[i:i + 2], 16) for i in (1, 3, 5)]
+        ratio = max(0.0, min(1.0, ratio))
+        mixed = [round(a + (b - a) * ratio) for a, b in zip(c1, c2)]
+        return "#{:02x}{:02x}{:02x}".format(*mixed)
+    
+    def _draw_heatmap(self):
+        """Draw heatmap as one zoomed image plus axis labels"""
+        metric = dict(self.METRICS).get(self.metric_var.get(), 'revenue')
+        matrix = self.revenue if metric == 'revenue' else self.count
+        
+        self.chart_canvas.delete("all")
+        width = self.chart_canvas.winfo_width()
+        height = self.chart_canvas.winfo_height()
+        if width < 10 or height < 10:
+            width = 800
+            height = 350
+        
+        # Margins
+        left_margin = 70
+        top_margin = 10
+        bottom_margin = 50
+        
+        cell_w = max(1, (width - left_margin - 10) // 24)
+        cell_h = max(1, (height - top_margin - bottom_margin) // 7)
+        
+        # One pixel per cell, then zoom: a single image item regardless of cell count
+        max_value = max(max(row) for row in matrix) or 1
+        low = COLORS['background']
+        high = COLORS['primary']
+        pixel_rows = []
+        for day in range(7):
+            colors = [self._blend(low, high, matrix[day][hour] / max_value) for hour in range(24)]
+            pixel_rows.append("{" + " ".join(colors) + "}")
+        
+        image = tk.PhotoImage(width=24, height=7)
+        image.put(" ".join(pixel_rows))
+        self.heat_image = image.zoom(cell_w, cell_h)
+        self.chart_canvas.create_image(left_margin, top_margin, image=self.heat_image, anchor='nw')
+        
+        # Weekday labels
+        for day, name in enumerate(self.DAYS):
+            self.chart_canvas.create_text(
+                left_margin - 10, top_margin + (day + 0.5) * cell_h,
+                text=name,
+                anchor='e',
+                font=('Segoe UI', 9),
+                fill=COLORS['text_light']
+            )
+        
+        # Hour labels (every 2 hours)
+        bottom = top_margin + 7 * cell_h
+        for hour in range(0, 24, 2):
+            self.chart_canvas.create_text(
+                left_margin + (hour + 0.5) * cell_w, bottom + 12,
+                text=f"{hour:02d}",
+                font=('Segoe UI', 8),
+                fill=COLORS['text_light']
+            )
+        
+        # Legend
+        if metric == 'revenue':
+            legend = f"Maks: {format_currency(max_value)} / jam"
+        else:
+            legend = f"Maks: {max_value} transaksi / jam"
+        self.chart_canvas.create_text(
+            left_margin, bottom + 35,
+            text=legend,
+            anchor='w',
+            font=('Segoe UI', 9),
+            fill=COLORS['text_light']
+        )
+    
+    def refresh(self):
+        """Refresh heatmap data"""
+        self._load_data()
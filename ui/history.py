@@ -3,20 +3,37 @@ Transaction History Component
 """
 import tkinter as tk
 from tkinter import ttk, messagebox
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from config import COLORS, FONTS
 from db_manager import TransactionDatabase
 from utils.helpers import format_currency, format_date, get_current_date
+from ui.loader import BackgroundLoader
+from ui.refund_dialog import show_refund_dialog
+from ui.batch_reprint_dialog import show_batch_reprint_dialog
 
 class History(tk.Frame):
     """Transaction history interface"""
     
+    PAGE_SIZE = 100
+    ROW_CACHE_SIZE = 1000  # Loaded rows kept for selection/reprint without disk I/O
+    
     def __init__(self, parent, on_print_receipt=None):
         super().__init__(parent, bg=COLORS['background'])
         
         self.transaction_db = TransactionDatabase()
+        self.loader = BackgroundLoader(self)
         self.on_print_receipt = on_print_receipt
         
+        # Keyset pagination state: cursor is (date, time, id) of the last loaded row
+        self.page_range = None
+        self.page_query = None
+        self.page_cursor = None
+        self._search_job = None
+        
+        # Loaded transaction records by id, least recently used first
+        self.row_cache = OrderedDict()
+        
         self._create_widgets()
     
     def _create_widgets(self):
@@ -130,6 +147,26 @@ class History(tk.Frame):
             command=self._filter_month
         )
         month_btn.pack(side='left', padx=5)
+        
+        batch_btn = tk.Button(
+            inner,
+            text="🧾 Cetak Ulang Massal",
+            font=FONTS['small'],
+            fg=COLORS['text'],
+            bg=COLORS['background'],
+            relief='flat',
+            cursor='hand2',
+            command=self._batch_reprint
+        )
+        batch_btn.pack(side='left', padx=(20, 5))
+        
+        # Search by product or transaction ID (within the date range)
+        self.search_var = tk.StringVar()
+        search_entry = tk.Entry(inner, textvariable=self.search_var, width=22, font=FONTS['body'])
+        search_entry.pack(side='right', padx=(5, 0))
+        search_entry.bind('<KeyRelease>', self._on_search_key)
+        search_entry.bind('<Return>', lambda e: self._apply_filter())
+        tk.Label(inner, text="Cari:", font=FONTS['body'], bg=COLORS['card']).pack(side='right')
     
     def _create_transaction_list(self):
         """Create transaction list"""
@@ -139,7 +176,8 @@ class History(tk.Frame):
         
         # Treeview
         columns = ('id', 'date', 'time', 'items_count', 'total', 'payment', 'change', 'cashier')
-        self.transaction_tree = ttk.Treeview(list_frame, columns=columns, show='headings')
+        # Ctrl/Shift-click selects several rows for bulk delete
+        self.transaction_tree = ttk.Treeview(list_frame, columns=columns, show='headings', selectmode='extended')
         
         self.transaction_tree.heading('id', text='ID Transaksi')
         self.transaction_tree.heading('date', text='Tanggal')
@@ -159,11 +197,11 @@ class History(tk.Frame):
         self.transaction_tree.column('change', width=100)
         self.transaction_tree.column('cashier', width=80)
         
-        scrollbar = ttk.Scrollbar(list_frame, orient='vertical', command=self.transaction_tree.yview)
-        self.transaction_tree.configure(yscrollcommand=scrollbar.set)
+        self.tree_scrollbar = ttk.Scrollbar(list_frame, orient='vertical', command=self.transaction_tree.yview)
+        self.transaction_tree.configure(yscrollcommand=self._on_tree_scroll)
         
         self.transaction_tree.pack(side='left', fill='both', expand=True, padx=10, pady=10)
-        scrollbar.pack(side='right', fill='y', pady=10)
+        self.tree_scrollbar.pack(side='right', fill='y', pady=10)
         
         # Bind selection
         self.transaction_tree.bind('<<TreeviewSelect>>', self._on_select)
@@ -174,7 +212,9 @@ class History(tk.Frame):
         # Context menu
         self.context_menu = tk.Menu(self, tearoff=0)
         self.context_menu.add_command(label="Cetak Struk", command=self._print_receipt)
+        self.context_menu.add_command(label="Cetak Ulang Massal...", command=self._batch_reprint)
         self.context_menu.add_command(label="Edit Transaksi", command=self._edit_transaction)
+        self.context_menu.add_command(label="Refund / Retur", command=self._refund_transaction)
         self.context_menu.add_separator()
         self.context_menu.add_command(label="Hapus Transaksi", command=self._delete_transaction)
         
@@ -220,6 +260,19 @@ class History(tk.Frame):
         )
         self.edit_btn.pack(pady=8, ipady=10, padx=10)
         
+        self.refund_btn = tk.Button(
+            right,
+            text="↩️ Refund / Retur",
+            font=FONTS['body_bold'],
+            fg='#64748B',
+            bg='#E2E8F0',
+            relief='flat',
+            cursor='arrow',
+            width=18,
+            command=self._refund_transaction
+        )
+        self.refund_btn.pack(pady=8, ipady=10, padx=10)
+        
         self.delete_btn = tk.Button(
             right,
             text="🗑️ Hapus Transaksi",
@@ -261,38 +314,102 @@ class History(tk.Frame):
         self.items_text.pack(fill='x', pady=5)
     
     def _apply_filter(self):
-        """Apply date filter and load transactions"""
+        """Apply date filter and load the first page of transactions"""
         date_from = self.date_from_var.get()
         date_to = self.date_to_var.get()
+        query = self.search_var.get().strip() or None
+        
+        self.page_range = (date_from, date_to)
+        self.page_query = query
+        self.page_cursor = None
+        self.loader.cancel('page')
+        self.loader.submit(
+            'transactions',
+            lambda: self._fetch_first_page(date_from, date_to, query),
+            self._show_first_page
+        )
+    
+    def _on_search_key(self, event):
+        """Search shortly after the user stops typing"""
+        if self._search_job is not None:
+            self.after_cancel(self._search_job)
+        self._search_job = self.after(250, self._run_search)
+    
+    def _run_search(self):
+        self._search_job = None
+        if (self.search_var.get().strip() or None) != self.page_query:
+            self._apply_filter()
+    
+    def _fetch_first_page(self, date_from, date_to, query):
+        """Read the newest page and the range totals (runs on a worker thread)"""
+        page = self.transaction_db.get_page(date_from, date_to, limit=self.PAGE_SIZE, query=query)
+        totals = self.transaction_db.get_range_totals(date_from, date_to, query)
+        return page, totals
+    
+    def _show_first_page(self, result):
+        """Replace the list with the first page"""
+        (transactions, cursor), (count, total_sales) = result
         
-        # Clear existing
+        # Clear existing (rows may have been edited, deleted or refunded)
         for item in self.transaction_tree.get_children():
             self.transaction_tree.delete(item)
+        self.row_cache.clear()
         
-        transactions = self.transaction_db.get_by_date_range(date_from, date_to)
-        transactions = sorted(transactions, key=lambda x: (x['date'], x['time']), reverse=True)
+        self.summary_label.configure(
+            text=f"{count} transaksi | Total: {format_currency(total_sales)}"
+        )
+        self._append_page((transactions, cursor))
+    
+    def _cache_row(self, transaction):
+        """Remember a loaded record, evicting the least recently used"""
+        self.row_cache[transaction['id']] = transaction
+        self.row_cache.move_to_end(transaction['id'])
+        while len(self.row_cache) > self.ROW_CACHE_SIZE:
+            self.row_cache.popitem(last=False)
+    
+    def _on_tree_scroll(self, first, last):
+        """Update scrollbar and fetch the next page near the bottom"""
+        self.tree_scrollbar.set(first, last)
+        if float(last) >= 0.9:
+            self._load_next_page()
+    
+    def _load_next_page(self):
+        """Fetch the page after the current cursor"""
+        if (self.page_cursor is None or self.loader.is_loading('transactions')
+                or self.loader.is_loading('page')):
+            return
+        
+        date_from, date_to = self.page_range
+        query = self.page_query
+        cursor = self.page_cursor
+        self.loader.submit(
+            'page',
+            lambda: self.transaction_db.get_page(date_from, date_to, cursor, self.PAGE_SIZE, query),
+            self._append_page,
+            overlay=False
+        )
+    
+    def _append_page(self, page):
+        """Append loaded transactions to the treeview"""
+        transactions, self.page_cursor = page
         
-        total_sales = 0
         for t in transactions:
+            self._cache_row(t)
+            if self.transaction_tree.exists(t['id']):
+                continue
             # Fix: Sum quantity instead of count unique items
             items_count = sum(item['qty'] for item in t.get('items_list', []))
-            total = float(t['total'])
-            total_sales += total
             
             self.transaction_tree.insert('', 'end', iid=t['id'], values=(
                 t['id'],
                 format_date(t['date']),
                 t['time'],
                 items_count,
-                format_currency(total),
+                format_currency(float(t['total'])),
                 format_currency(float(t['payment'])),
                 format_currency(float(t['change'])),
                 t['cashier']
             ))
-        
-        self.summary_label.configure(
-            text=f"{len(transactions)} transaksi | Total: {format_currency(total_sales)}"
-        )
     
     def _filter_today(self):
         """Filter today's transactions"""
@@ -323,18 +440,53 @@ class History(tk.Frame):
         if not selection:
             return
         
-        transaction_id = selection[0]
-        transaction = self.transaction_db.get_by_id(transaction_id)
+        if len(selection) > 1:
+            # Only delete applies to several rows
+            self.selected_transaction = None
+            self.print_btn.configure(fg='#64748B', bg='#E2E8F0', cursor='arrow')
+            self.edit_btn.configure(fg='#64748B', bg='#E2E8F0', cursor='arrow')
+            self.refund_btn.configure(fg='#64748B', bg='#E2E8F0', cursor='arrow')
+            self.delete_btn.configure(fg=COLORS['white'], bg=COLORS['danger'], cursor='hand2')
+            self.detail_label.configure(text=f"{len(selection)} transaksi dipilih")
+            self.items_text.configure(state='normal')
+            self.items_text.delete('1.0', 'end')
+            self.items_text.configure(state='disabled')
+            return
         
+        transaction_id = selection[0]
+        transaction = self.row_cache.get(transaction_id)
+        if transaction is None:
+            # Evicted from the cache: look it up in the background
+            self.loader.submit(
+                'detail',
+                lambda: self.transaction_db.get_by_id(transaction_id),
+                lambda t: self._show_detail(t, transaction_id),
+                overlay=False
+            )
+            return
+        self.row_cache.move_to_end(transaction_id)
+        self._show_detail(transaction, transaction_id)
+    
+    def _show_detail(self, transaction, transaction_id):
+        """Show a transaction in the detail panel"""
+        if self.transaction_tree.selection() != (transaction_id,):
+            return
         if transaction:
+            self._cache_row(transaction)
             self.selected_transaction = transaction
             # Enable buttons with proper colors
             self.print_btn.configure(fg=COLORS['white'], bg=COLORS['primary'], cursor='hand2')
             self.edit_btn.configure(fg=COLORS['white'], bg=COLORS['warning'], cursor='hand2')
             self.delete_btn.configure(fg=COLORS['white'], bg=COLORS['danger'], cursor='hand2')
+            if transaction.get('ref_id'):
+                self.refund_btn.configure(fg='#64748B', bg='#E2E8F0', cursor='arrow')
+            else:
+                self.refund_btn.configure(fg=COLORS['white'], bg=COLORS['danger'], cursor='hand2')
             
             # Update detail label
             detail_text = f"ID: {transaction['id']}\n"
+            if transaction.get('ref_id'):
+                detail_text += f"Refund dari: {transaction['ref_id']}\n"
             detail_text += f"Tanggal: {format_date(transaction['date'])} {transaction['time']}\n"
             detail_text += f"Total: {format_currency(float(transaction['total']))}"
             self.detail_label.configure(text=detail_text)
@@ -356,23 +508,43 @@ class History(tk.Frame):
     
     def _print_receipt(self):
         """Print receipt for selected transaction"""
-        if hasattr(self, 'selected_transaction') and self.on_print_receipt:
+        if getattr(self, 'selected_transaction', None) and self.on_print_receipt:
             self.on_print_receipt(self.selected_transaction)
     
+    def _batch_reprint(self):
+        """Reprint the selected transactions, or a whole day, as one job or file"""
+        show_batch_reprint_dialog(self, self.transaction_tree.selection(), self.date_to_var.get())
+    
     def _delete_transaction(self):
-        """Delete selected transaction"""
-        if not hasattr(self, 'selected_transaction'):
+        """Delete selected transactions (one rewrite for any number of rows)"""
+        ids = list(self.transaction_tree.selection())
+        if not ids:
             return
         
-        if messagebox.askyesno("Konfirmasi", f"Hapus transaksi {self.selected_transaction['id']}?"):
+        if len(ids) == 1:
+            question = f"Hapus transaksi {ids[0]}?"
+        else:
+            question = f"Hapus {len(ids)} transaksi yang dipilih?"
+        
+        if messagebox.askyesno("Konfirmasi", question):
             try:
-                self.transaction_db.delete(self.selected_transaction['id'])
-                messagebox.showinfo("Sukses", "Transaksi berhasil dihapus!")
+                deleted, archived = self.transaction_db.delete_many(ids)
+                if archived:
+                    messagebox.showwarning(
+                        "Sebagian Dihapus",
+                        f"{deleted} transaksi berhasil dihapus.\n\n"
+                        f"{len(archived)} transaksi tidak dihapus karena bulannya sudah ditutup."
+                    )
+                elif len(ids) == 1:
+                    messagebox.showinfo("Sukses", "Transaksi berhasil dihapus!")
+                else:
+                    messagebox.showinfo("Sukses", f"{deleted} transaksi berhasil dihapus!")
                 self._apply_filter()
                 self.selected_transaction = None
                 # Reset buttons to inactive colors
                 self.print_btn.configure(fg='#64748B', bg='#E2E8F0', cursor='arrow')
                 self.edit_btn.configure(fg='#64748B', bg='#E2E8F0', cursor='arrow')
+                self.refund_btn.configure(fg='#64748B', bg='#E2E8F0', cursor='arrow')
                 self.delete_btn.configure(fg='#64748B', bg='#E2E8F0', cursor='arrow')
                 self.detail_label.configure(text="Pilih transaksi untuk melihat detail")
                 self.items_text.configure(state='normal')
@@ -381,12 +553,27 @@ class History(tk.Frame):
             except Exception as e:
                 messagebox.showerror("Error", f"Gagal menghapus: {e}")
     
+    def _refund_transaction(self):
+        """Open refund dialog for the selected sale"""
+        t = getattr(self, 'selected_transaction', None)
+        if not t or t.get('ref_id'):
+            return
+        
+        def on_done(refund):
+            self._apply_filter()
+            if self.on_print_receipt:
+                self.on_print_receipt(refund)
+        
+        show_refund_dialog(self, t, on_done)
+    
     def _show_context_menu(self, event):
         """Show value context menu"""
         try:
             item = self.transaction_tree.identify_row(event.y)
             if item:
-                self.transaction_tree.selection_set(item)
+                # Keep a multi-selection when right-clicking inside it
+                if item not in self.transaction_tree.selection():
+                    self.transaction_tree.selection_set(item)
                 self.context_menu.post(event.x_root, event.y_root)
         except:
             pass
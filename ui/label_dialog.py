@@ -0,0 +1,216 @@
+"""
+Label Dialog Component - Print barcode label sheets for products
+"""
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+import threading
+from config import COLORS, FONTS
+from db_manager import ProductDatabase
+from utils.helpers import format_currency, parse_float
+from utils.barcode_labels import render_labels, LabelsCancelled, SHEETS, DEFAULT_SHEET
+
+class LabelDialog(tk.Toplevel):
+    """Dialog to render barcode labels of selected products or a category"""
+    
+    ALL_CATEGORIES = "(Semua kategori)"
+    FORMATS = [("PDF (.pdf)", '.pdf'), ("Gambar PNG (.png)", '.png')]
+    
+    def __init__(self, parent, selected_ids):
+        super().__init__(parent)
+        
+        self.product_db = ProductDatabase()
+        self.selected_ids = list(selected_ids)
+        
+        self.title("Cetak Label Barcode")
+        self.geometry("440x480")
+        self.resizable(False, False)
+        self.transient(parent)
+        self.configure(bg=COLORS['white'])
+        
+        # Center window
+        self.update_idletasks()
+        x = (self.winfo_screenwidth() - 440) // 2
+        y = (self.winfo_screenheight() - 480) // 2
+        self.geometry(f"+{x}+{y}")
+        
+        self.cancel_event = threading.Event()
+        self.worker = None
+        self.progress_value = 0.0
+        self.result = None
+        
+        self._create_widgets()
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+    
+    def _create_widgets(self):
+        p = tk.Frame(self, bg=COLORS['white'], padx=20, pady=20)
+        p.pack(fill='both', expand=True)
+        
+        # Products
+        tk.Label(p, text="Produk:", font=FONTS['body_bold'], bg=COLORS['white']).pack(anchor='w')
+        self.source_var = tk.StringVar(value='selected' if self.selected_ids else 'category')
+        tk.Radiobutton(
+            p, text=f"Produk terpilih ({len(self.selected_ids)})", variable=self.source_var, value='selected',
+            font=FONTS['body'], bg=COLORS['white'], activebackground=COLORS['white'],
+            state='normal' if self.selected_ids else 'disabled'
+        ).pack(anchor='w')
+        
+        category_row = tk.Frame(p, bg=COLORS['white'])
+        category_row.pack(fill='x')
+        tk.Radiobutton(
+            category_row, text="Kategori:", variable=self.source_var, value='category',
+            font=FONTS['body'], bg=COLORS['white'], activebackground=COLORS['white']
+        ).pack(side='left')
+        self.category_var = tk.StringVar(value=self.ALL_CATEGORIES)
+        ttk.Combobox(
+            category_row,
+            textvariable=self.category_var,
+            values=[self.ALL_CATEGORIES] + self.product_db.get_categories(),
+            font=FONTS['body'],
+            state='readonly',
+            width=20
+        ).pack(side='left', padx=5)
+        
+        copies_row = tk.Frame(p, bg=COLORS['white'])
+        copies_row.pack(fill='x', pady=(5, 0))
+        tk.Label(copies_row, text="Jumlah per produk:", font=FONTS['body'], bg=COLORS['white']).pack(side='left')
+        self.copies_var = tk.StringVar(value="1")
+        tk.Spinbox(copies_row, from_=1, to=100, textvariable=self.copies_var, width=5, font=FONTS['body']).pack(side='left', padx=5)
+        
+        # Sheet
+        tk.Label(p, text="Kertas:", font=FONTS['body_bold'], bg=COLORS['white']).pack(anchor='w', pady=(10, 0))
+        self.sheet_var = tk.StringVar(value=DEFAULT_SHEET)
+        for key, sheet in SHEETS.items():
+            tk.Radiobutton(
+                p, text=sheet.title, variable=self.sheet_var, value=key,
+                font=FONTS['body'], bg=COLORS['white'], activebackground=COLORS['white']
+            ).pack(anchor='w')
+        
+        # Format
+        tk.Label(p, text="Format:", font=FONTS['body_bold'], bg=COLORS['white']).pack(anchor='w', pady=(10, 0))
+        self.format_var = tk.StringVar(value=self.FORMATS[0][1])
+        for text, value in self.FORMATS:
+            tk.Radiobutton(
+                p, text=text, variable=self.format_var, value=value,
+                font=FONTS['body'], bg=COLORS['white'], activebackground=COLORS['white']
+            ).pack(anchor='w')
+        
+        # Progress
+        self.progress_bar = ttk.Progressbar(p, orient='horizontal', mode='determinate', maximum=100)
+        self.progress_bar.pack(fill='x', pady=(15, 5))
+        
+        self.status_label = tk.Label(p, text="", font=FONTS['small'], fg=COLORS['text_light'], bg=COLORS['white'])
+        self.status_label.pack(anchor='w')
+        
+        # Buttons
+        btn_frame = tk.Frame(p, bg=COLORS['white'])
+        btn_frame.pack(fill='x', side='bottom')
+        
+        self.close_btn = tk.Button(btn_frame, text="Tutup", command=self._on_close, font=FONTS['body'], bg='#E2E8F0', relief='flat')
+        self.close_btn.pack(side='left', fill='x', expand=True, padx=(0, 5))
+        
+        self.render_btn = tk.Button(btn_frame, text="🏷️ Buat Label", command=self._start, font=FONTS['body_bold'], bg=COLORS['primary'], fg='white', relief='flat')
+        self.render_btn.pack(side='left', fill='x', expand=True, padx=(5, 0))
+    
+    def _start(self):
+        """Ask for the target file and start rendering"""
+        try:
+            copies = max(1, int(self.copies_var.get()))
+        except ValueError:
+            copies = 1
+        source = self.source_var.get()
+        category = self.category_var.get()
+        sheet = SHEETS[self.sheet_var.get()]
+        extension = self.format_var.get()
+        
+        name = "label_terpilih" if source == 'selected' else f"label_{category if category != self.ALL_CATEGORIES else 'semua'}"
+        filepath = filedialog.asksaveasfilename(
+            parent=self,
+            title="Simpan Label",
+            defaultextension=extension,
+            initialfile=f"{name}{extension}",
+            filetypes=[(text, f"*{ext}") for text, ext in self.FORMATS if ext == extension]
+        )
+        if not filepath:
+            return
+        
+        self.cancel_event.clear()
+        self.progress_value = 0.0
+        self.result = None
+        self.render_btn.configure(state='disabled')
+        self.close_btn.configure(text="Batal")
+        self.status_label.configure(text="Membuat label...", fg=COLORS['text_light'])
+        
+        self.worker = threading.Thread(
+            target=self._run,
+            args=(source, category, copies, sheet, filepath),
+            daemon=True
+        )
+        self.worker.start()
+        self._poll_progress()
+    
+    def _labels(self, source, category, copies):
+        """(name, barcode, price) per label, in product list order"""
+        products = self.product_db.get_all()
+        if source == 'selected':
+            wanted = set(self.selected_ids)
+            products = [p for p in products if p['id'] in wanted]
+        elif category != self.ALL_CATEGORIES:
+            products = [p for p in products if p['category'] == category]
+        labels = []
+        for p in products:
+            label = (p['name'], p['barcode'], format_currency(parse_float(p['sell_price'])))
+            labels.extend([label] * copies)
+        return labels
+    
+    def _run(self, source, category, copies, sheet, filepath):
+        """Worker thread: render pages (on the process pool) to the file"""
+        def on_progress(done, total):
+            self.progress_value = done / total * 100
+        
+        try:
+            labels = self._labels(source, category, copies)
+            files = render_labels(labels, filepath, sheet, on_progress=on_progress, cancel_event=self.cancel_event)
+            self.result = ('done', len(labels), files)
+        except LabelsCancelled:
+            self.result = ('cancelled', 0, [])
+        except Exception as e:
+            self.result = ('error', e, [])
+    
+    def _poll_progress(self):
+        """Update progress bar from the main thread"""
+        if not self.winfo_exists():
+            return
+        self.progress_bar['value'] = self.progress_value
+        
+        if self.result is None:
+            self.after(100, self._poll_progress)
+            return
+        
+        status, value, files = self.result
+        self.worker = None
+        self.render_btn.configure(state='normal')
+        self.close_btn.configure(text="Tutup")
+        
+        if status == 'done':
+            self.progress_bar['value'] = 100
+            self.status_label.configure(text=f"✅ {value} label dibuat", fg=COLORS['success'])
+            where = files[0] if len(files) == 1 else f"{len(files)} file ({files[0]} ...)"
+            messagebox.showinfo("Sukses", f"{value} label berhasil dibuat:\n{where}", parent=self)
+        elif status == 'cancelled':
+            self.progress_bar['value'] = 0
+            self.status_label.configure(text="Dibatalkan", fg=COLORS['text_light'])
+        else:
+            self.status_label.configure(text="Gagal membuat label", fg=COLORS['danger'])
+            messagebox.showerror("Error", f"Gagal membuat label: {value}", parent=self)
+    
+    def _on_close(self):
+        """Cancel a running job, or close the dialog"""
+        if self.worker is not None:
+            self.cancel_event.set()
+            return
+        self.destroy()
+
+
+def show_label_dialog(parent, selected_ids):
+    """Show barcode label dialog"""
+    LabelDialog(parent, selected_ids)
@@ -0,0 +1,157 @@
+"""
+Background Loader - Run page data loading off the Tk main thread
+"""
+import itertools
+import queue
+import threading
+import tkinter as tk
+from tkinter import messagebox
+from concurrent.futures import ThreadPoolExecutor
+from config import COLORS, FONTS
+from utils.tracer import traced
+
+MAX_WORKERS = 3
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Get the worker pool shared by all pages (created on first use)"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='loader')
+        return _executor
+
+
+class BackgroundLoader:
+    """Runs loader functions on the shared pool and delivers results on the Tk thread
+    
+    Every request belongs to a channel (e.g. 'data', 'products'). A newer
+    request on the same channel supersedes older ones: their results are
+    dropped when they arrive. Loaders must not touch Tk widgets or
+    variables; read those on the main thread and pass the values in.
+    """
+    
+    POLL_MS = 30
+    OVERLAY_DELAY_MS = 150  # Fast loads finish before the overlay appears
+    
+    def __init__(self, widget, overlay_target=None):
+        self.widget = widget
+        self.overlay_target = overlay_target or widget
+        self._latest = {}  # channel -> token of the newest request
+        self._overlay_channels = set()
+        self._results = queue.Queue()
+        self._tokens = itertools.count(1)
+        self._polling = False
+        self._overlay = None
+        self._overlay_job = None
+    
+    def submit(self, channel, loader, on_done, on_error=None, overlay=True):
+        """Run loader() in the background and call on_done(result) on the Tk thread
+        
+        Returns:
+            Token identifying this request
+        """
+        token = next(self._tokens)
+        self._latest[channel] = token
+        if overlay:
+            self._overlay_channels.add(channel)
+            self._schedule_overlay()
+        else:
+            self._overlay_channels.discard(channel)
+        
+        span_name = f"load.{type(self.widget).__name__}.{channel}"
+        future = get_executor().submit(traced(span_name)(loader))
+        future.add_done_callback(
+            lambda f: self._results.put((channel, token, f, on_done, on_error))
+        )
+        
+        if not self._polling:
+            self._polling = True
+            self.widget.after(self.POLL_MS, self._poll)
+        return token
+    
+    def cancel(self, channel):
+        """Forget a pending request; its result will be dropped"""
+        self._latest.pop(channel, None)
+        self._overlay_channels.discard(channel)
+        self._update_overlay()
+    
+    def is_loading(self, channel=None):
+        """Check whether a request (on channel, or any) is still pending"""
+        if channel is None:
+            return bool(self._latest)
+        return channel in self._latest
+    
+    def _poll(self):
+        """Deliver finished results on the Tk thread"""
+        try:
+            if not self.widget.winfo_exists():
+                return
+        except tk.TclError:
+            return
+        
+        while True:
+            try:
+                channel, token, future, on_done, on_error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            
+            # Superseded by a newer request on the same channel
+            if self._latest.get(channel) != token:
+                continue
+            del self._latest[channel]
+            self._overlay_channels.discard(channel)
+            
+            try:
+                error = future.exception()
+                if error is None:
+                    on_done(future.result())
+                elif on_error:
+                    on_error(error)
+                else:
+                    messagebox.showerror("Error", f"Gagal memuat data: {error}")
+            except Exception as e:
+                print(f"Error delivering {channel} result: {e}")
+        
+        self._update_overlay()
+        if self._latest:
+            self.widget.after(self.POLL_MS, self._poll)
+        else:
+            self._polling = False
+    
+    def _schedule_overlay(self):
+        if self._overlay_job is None and self._overlay is None:
+            self._overlay_job = self.widget.after(self.OVERLAY_DELAY_MS, self._show_overlay)
+    
+    def _show_overlay(self):
+        """Show the loading label over the page"""
+        self._overlay_job = None
+        if not self._overlay_channels or self._overlay is not None:
+            return
+        self._overlay = tk.Label(
+            self.overlay_target,
+            text="⏳ Memuat data...",
+            font=FONTS['body_bold'],
+            fg=COLORS['text_light'],
+            bg=COLORS['card'],
+            padx=20,
+            pady=10,
+            highlightbackground=COLORS['border'],
+            highlightthickness=1
+        )
+        self._overlay.place(relx=0.5, rely=0.5, anchor='center')
+        self._overlay.lift()
+    
+    def _update_overlay(self):
+        """Hide the loading label once no overlay request is pending"""
+        if self._overlay_channels:
+            return
+        if self._overlay_job is not None:
+            self.widget.after_cancel(self._overlay_job)
+            self._overlay_job = None
+        if self._overlay is not None:
+            self._overlay.destroy()
+            self._overlay = None
@@ -7,6 +7,8 @@ import csv
 from config import COLORS, FONTS
 from db_manager import ProductDatabase
 from utils.helpers import format_currency, parse_float, parse_int, format_currency_input, parse_currency_input
+from ui.loader import BackgroundLoader
+from ui.label_dialog import show_label_dialog
 
 class Products(tk.Frame):
     """Product management interface"""
@@ -15,6 +17,7 @@ class Products(tk.Frame):
         super().__init__(parent, bg=COLORS['background'])
         
         self.product_db = ProductDatabase()
+        self.loader = BackgroundLoader(self)
         self.selected_product = None
         self._initialized = False
         
@@ -81,6 +84,18 @@ class Products(tk.Frame):
         )
         export_btn.pack(side='left', padx=5)
         
+        label_btn = tk.Button(
+            btn_row,
+            text="🏷️ Cetak Label",
+            font=FONTS['small'],
+            fg=COLORS['text'],
+            bg=COLORS['background'],
+            relief='flat',
+            cursor='hand2',
+            command=lambda: show_label_dialog(self, self.product_tree.selection())
+        )
+        label_btn.pack(side='left', padx=5)
+        
         # Search box
         search_frame = tk.Frame(panel, bg=COLORS['card'])
         search_frame.pack(fill='x', padx=20, pady=10)
@@ -423,14 +438,23 @@ class Products(tk.Frame):
         """Load products into treeview"""
         if not hasattr(self, 'product_tree'):
             return
-            
-        for item in self.product_tree.get_children():
-            self.product_tree.delete(item)
         
+        self.loader.submit('products', lambda: self._fetch_products(query), self._show_products)
+    
+    def _fetch_products(self, query):
+        """Read matching products and categories (runs on a worker thread)"""
         if query:
             products = self.product_db.search(query)
         else:
             products = self.product_db.get_all()
+        return products, self.product_db.get_categories()
+    
+    def _show_products(self, result):
+        """Show loaded products in treeview"""
+        products, categories = result
+        
+        for item in self.product_tree.get_children():
+            self.product_tree.delete(item)
         
         for p in products:
             self.product_tree.insert('', 'end', iid=p['id'], values=(
@@ -447,7 +471,6 @@ class Products(tk.Frame):
         
         # Update category combo if exists
         if hasattr(self, 'category_combo'):
-            categories = self.product_db.get_categories()
             self.category_combo['values'] = categories
     
     def _on_search_key(self, event):
@@ -8,6 +8,8 @@ from calendar import monthrange
 from config import COLORS, FONTS
 from db_manager import ProductDatabase, TransactionDatabase
 from utils.helpers import format_currency
+from ui.export_dialog import show_export_dialog
+from ui.loader import BackgroundLoader
 
 class ProfitLoss(tk.Frame):
     """Profit and Loss calculation report"""
@@ -17,6 +19,7 @@ class ProfitLoss(tk.Frame):
         
         self.product_db = ProductDatabase()
         self.transaction_db = TransactionDatabase()
+        self.loader = BackgroundLoader(self)
         
         # Default to current month
         self.current_month = datetime.now().month
@@ -24,19 +27,20 @@ class ProfitLoss(tk.Frame):
         
         # Cache product buy prices
         self.product_prices = {}
-        self._load_product_prices()
         
         self._create_widgets()
-        self._load_data()
     
     def _load_product_prices(self):
         """Load all product buy prices into cache"""
+        prices = {}
         products = self.product_db.get_all()
         for p in products:
             try:
-                self.product_prices[p['id']] = float(p.get('buy_price', 0) or 0)
+                prices[p['id']] = float(p.get('buy_price', 0) or 0)
             except (ValueError, TypeError):
-                self.product_prices[p['id']] = 0
+                prices[p['id']] = 0
+        # Swap in one step so a running calculation never sees a partial dict
+        self.product_prices = prices
     
     def _create_widgets(self):
         # Header
@@ -112,6 +116,18 @@ class ProfitLoss(tk.Frame):
             cursor='hand2',
             command=self._next_month
         ).pack(side='left', padx=5)
+        
+        # Export
+        tk.Button(
+            header,
+            text="📤 Export",
+            font=FONTS['body'],
+            fg=COLORS['white'],
+            bg=COLORS['success'],
+            relief='flat',
+            cursor='hand2',
+            command=self._open_export
+        ).pack(side='right', padx=(0, 20))
     
     def _create_stats_section(self, parent):
         """Create statistics cards section"""
@@ -244,6 +260,13 @@ class ProfitLoss(tk.Frame):
             self.current_month -= 1
         self._load_data()
     
+    def _open_export(self):
+        """Open export dialog for the selected month"""
+        days_in_month = monthrange(self.current_year, self.current_month)[1]
+        start_date = f"{self.current_year}-{self.current_month:02d}-01"
+        end_date = f"{self.current_year}-{self.current_month:02d}-{days_in_month:02d}"
+        show_export_dialog(self, start_date, end_date)
+    
     def _next_month(self):
         """Go to next month"""
         if self.current_month == 12:
@@ -275,16 +298,21 @@ class ProfitLoss(tk.Frame):
                   "Juli", "Agustus", "September", "Oktober", "November", "Desember"]
         self.month_label.configure(text=f"{months[self.current_month]} {self.current_year}")
         
-        # Reload product prices
-        self._load_product_prices()
-        
         # Get date range
         days_in_month = monthrange(self.current_year, self.current_month)[1]
         start_date = f"{self.current_year}-{self.current_month:02d}-01"
         end_date = f"{self.current_year}-{self.current_month:02d}-{days_in_month:02d}"
         
-        # Get transactions
-        transactions = self.transaction_db.get_by_date_range(start_date, end_date)
+        self.loader.submit(
+            'data',
+            lambda: self._fetch_daily_profit(start_date, end_date),
+            lambda result: self._show_data(result, days_in_month)
+        )
+    
+    def _fetch_daily_profit(self, start_date, end_date):
+        """Calculate revenue, cost and profit per day (runs on a worker thread)"""
+        # Reload product prices
+        self._load_product_prices()
         
         # Calculate daily profits
         daily_data = {}  # day: {revenue, cost, profit}
@@ -292,7 +320,7 @@ class ProfitLoss(tk.Frame):
         total_cost = 0
         total_profit = 0
         
-        for t in transactions:
+        for t in self.transaction_db.iter_by_date_range(start_date, end_date):
             day = int(t['date'].split('-')[2])
             revenue, cost, profit = self._calculate_transaction_profit(t)
             
@@ -307,6 +335,12 @@ class ProfitLoss(tk.Frame):
             total_cost += cost
             total_profit += profit
         
+        return daily_data, total_revenue, total_cost, total_profit
+    
+    def _show_data(self, result, days_in_month):
+        """Show loaded profit/loss data"""
+        daily_data, total_revenue, total_cost, total_profit = result
+        
         # Calculate margin
         margin = (total_profit / total_revenue * 100) if total_revenue > 0 else 0
         
@@ -469,5 +503,4 @@ class ProfitLoss(tk.Frame):
     
     def refresh(self):
         """Refresh report data"""
-        self._load_product_prices()
         self._load_data()
@@ -5,20 +5,24 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import os
 import tempfile
-import json
-from config import COLORS, FONTS, STORE_CONFIG, APP_DIR
+import queue
+from config import COLORS, FONTS, store_config
+from utils.print_spooler import (
+    get_spooler, STATUS_QUEUED, STATUS_PRINTING, STATUS_RETRYING, STATUS_DONE, STATUS_FAILED
+)
 from utils.helpers import format_currency, format_date
+from utils.receipt_layout import ReceiptLayout, render_text, render_escpos
 
 class Receipt(tk.Toplevel):
     """Receipt preview and print dialog"""
     
-    CONFIG_FILE = os.path.join(APP_DIR, "store_config.json")
-    
     def __init__(self, parent, transaction):
         super().__init__(parent)
         
         self.transaction = transaction
-        self._load_store_config()
+        self._print_events = queue.Queue()  # spooler status updates from the worker thread
+        self._polling_print = False
+        self.layout = ReceiptLayout(transaction)
         
         self.title("Struk Pembayaran")
         self.geometry("400x600")
@@ -36,18 +40,6 @@ class Receipt(tk.Toplevel):
         # Show print confirmation after window is displayed
         self.after(300, self._ask_print_confirmation)
     
-    def _load_store_config(self):
-        """Load store configuration"""
-        self.store_config = STORE_CONFIG.copy()
-        
-        if os.path.exists(self.CONFIG_FILE):
-            try:
-                with open(self.CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    saved_config = json.load(f)
-                    self.store_config.update(saved_config)
-            except:
-                pass
-    
     def _create_widgets(self):
         # Main container
         main = tk.Frame(self, bg=COLORS['white'])
@@ -59,206 +51,109 @@ class Receipt(tk.Toplevel):
         # Action buttons
         self._create_buttons(main)
     
+    # Left/right margin of receipt lines in the preview (pixels)
+    PREVIEW_MARGIN = 30
+    
     def _create_receipt_preview(self, parent):
-        """Create receipt preview"""
-        # Scrollable frame
-        canvas = tk.Canvas(parent, bg=COLORS['white'], highlightthickness=0)
-        scrollbar = ttk.Scrollbar(parent, orient='vertical', command=canvas.yview)
-        
-        self.receipt_frame = tk.Frame(canvas, bg=COLORS['white'])
+        """Create receipt preview (a single Text widget, whatever the number of lines)"""
+        frame = tk.Frame(parent, bg=COLORS['white'])
+        frame.pack(fill='both', expand=True, pady=10)
         
-        canvas.configure(yscrollcommand=scrollbar.set)
+        self.preview = tk.Text(
+            frame,
+            font=FONTS['receipt'],
+            bg=COLORS['white'],
+            fg=COLORS['text'],
+            relief='flat',
+            bd=0,
+            highlightthickness=0,
+            wrap='word',
+            cursor='arrow',
+            padx=0,
+            pady=10
+        )
+        scrollbar = ttk.Scrollbar(frame, orient='vertical', command=self.preview.yview)
+        self.preview.configure(yscrollcommand=scrollbar.set)
         
         scrollbar.pack(side='right', fill='y')
-        canvas.pack(side='left', fill='both', expand=True, pady=10)
-        
-        canvas_frame = canvas.create_window((0, 0), window=self.receipt_frame, anchor='nw')
-        
-        def configure_scroll(event):
-            canvas.configure(scrollregion=canvas.bbox('all'))
-            canvas.itemconfig(canvas_frame, width=event.width)
-        
-        self.receipt_frame.bind('<Configure>', configure_scroll)
-        canvas.bind('<Configure>', lambda e: canvas.itemconfig(canvas_frame, width=e.width))
+        self.preview.pack(side='left', fill='both', expand=True)
+        
+        # Line styles
+        margin = self.PREVIEW_MARGIN
+        self.preview.tag_configure('center', justify='center')
+        self.preview.tag_configure('title', justify='center', font=FONTS['receipt_bold'], spacing1=10, spacing3=2)
+        self.preview.tag_configure('light', foreground=COLORS['text_light'])
+        self.preview.tag_configure('bold', font=FONTS['receipt_bold'])
+        self.preview.tag_configure('separator', justify='center', foreground=COLORS['text_light'],
+                                   wrap='none', spacing1=5, spacing3=5)
+        self.preview.tag_configure('row', lmargin1=margin, lmargin2=margin, rmargin=margin)
+        self.preview.tag_configure('total', spacing1=2, spacing3=2)
+        self.preview.tag_configure('item_detail', spacing3=5)
+        self.preview.tag_configure('footer', spacing1=15, spacing3=15)
+        
+        # Values are right-aligned on a tab stop that follows the widget width
+        self.preview.bind('<Configure>', self._update_tab_stop)
         
         # Build receipt content
         self._build_receipt_content()
+        self.preview.configure(state='disabled')
+    
+    def _update_tab_stop(self, event):
+        """Keep the right-aligned column at the right margin"""
+        self.preview.tag_configure('row', tabs=(max(1, event.width - self.PREVIEW_MARGIN), 'right'))
     
     def _build_receipt_content(self):
-        """Build receipt content"""
-        frame = self.receipt_frame
-        t = self.transaction
+        """Build receipt content from the receipt layout in one insert"""
+        layout = self.layout
+        store = layout.store
+        segments = []  # alternating text, tags for Text.insert
         
-        # Store header
-        tk.Label(
-            frame,
-            text=self.store_config.get('name', 'TOKO'),
-            font=FONTS['receipt_bold'],
-            bg=COLORS['white']
-        ).pack(pady=(20, 2))
+        def add(text, *tags):
+            segments.extend((text, tags))
         
-        tk.Label(
-            frame,
-            text=self.store_config.get('address', ''),
-            font=FONTS['receipt'],
-            fg=COLORS['text_light'],
-            bg=COLORS['white']
-        ).pack()
+        def separator():
+            add("-" * 45 + "\n", 'separator')
         
-        tk.Label(
-            frame,
-            text=self.store_config.get('phone', ''),
-            font=FONTS['receipt'],
-            fg=COLORS['text_light'],
-            bg=COLORS['white']
-        ).pack()
+        def row(label, value, *tags):
+            add(f"{label}\t{value}\n", 'row', *tags)
         
-        # Separator
-        self._add_separator(frame)
+        # Store header
+        add(f"{store.name}\n", 'title')
+        add(f"{store.address}\n", 'center', 'light')
+        add(f"{store.phone}\n", 'center', 'light')
+        separator()
         
         # Transaction info
-        info_frame = tk.Frame(frame, bg=COLORS['white'])
-        info_frame.pack(fill='x', padx=30)
-        
-        self._add_info_row(info_frame, "No", t['id'])
-        self._add_info_row(info_frame, "Tanggal", format_date(t['date']))
-        self._add_info_row(info_frame, "Waktu", t['time'])
-        self._add_info_row(info_frame, "Kasir", t.get('cashier', 'Kasir'))
-        
-        # Separator
-        self._add_separator(frame)
-        
-        # Items
-        items_frame = tk.Frame(frame, bg=COLORS['white'])
-        items_frame.pack(fill='x', padx=30)
-        
-        items = t.get('items_list', [])
-        if not items and 'items' in t:
-            try:
-                items = json.loads(t['items'])
-            except:
-                items = []
-        
-        for item in items:
-            self._add_item_row(items_frame, item)
-        
-        # Separator
-        self._add_separator(frame)
+        row("No:", layout.id)
+        if layout.ref_id:
+            row("Refund:", layout.ref_id)
+        row("Tanggal:", format_date(layout.date))
+        row("Waktu:", layout.time)
+        row("Kasir:", layout.cashier)
+        separator()
+        
+        # Items: name, then qty x price = subtotal
+        for item in layout.items:
+            add(f"{item.name}\n", 'row')
+            add(f"  {item.qty} x {format_currency(item.price)}", 'row', 'item_detail', 'light')
+            add(f"\t{format_currency(item.subtotal)}\n", 'row', 'item_detail')
+        separator()
         
         # Totals
-        totals_frame = tk.Frame(frame, bg=COLORS['white'])
-        totals_frame.pack(fill='x', padx=30)
-        
-        subtotal = float(t.get('subtotal', 0))
-        discount = float(t.get('discount', 0))
-        total = float(t.get('total', 0))
-        payment = float(t.get('payment', 0))
-        change = float(t.get('change', 0))
-        
-        self._add_total_row(totals_frame, "Subtotal", format_currency(subtotal))
-        if discount > 0:
-            self._add_total_row(totals_frame, "Diskon", f"-{format_currency(discount)}")
-        self._add_total_row(totals_frame, "TOTAL", format_currency(total), bold=True)
-        self._add_total_row(totals_frame, "Bayar", format_currency(payment))
-        self._add_total_row(totals_frame, "Kembali", format_currency(change))
-        
-        # Separator
-        self._add_separator(frame)
+        row("Subtotal", format_currency(layout.subtotal), 'total')
+        if layout.discount:
+            # Refunds store a negative discount: the refunded total exceeds the subtotal
+            sign = '-' if layout.discount > 0 else '+'
+            row("Diskon", f"{sign}{format_currency(abs(layout.discount))}", 'total')
+        row("TOTAL", format_currency(layout.total), 'total', 'bold')
+        row("Bayar", format_currency(layout.payment), 'total')
+        row("Kembali", format_currency(layout.change), 'total')
+        separator()
         
         # Footer
-        tk.Label(
-            frame,
-            text=self.store_config.get('footer', 'Terima kasih!'),
-            font=FONTS['receipt'],
-            fg=COLORS['text_light'],
-            bg=COLORS['white']
-        ).pack(pady=15)
-    
-    def _add_separator(self, parent, char="-"):
-        """Add separator line"""
-        sep = tk.Label(
-            parent,
-            text=char * 45,
-            font=FONTS['receipt'],
-            fg=COLORS['text_light'],
-            bg=COLORS['white']
-        )
-        sep.pack(pady=5)
-    
-    def _add_info_row(self, parent, label, value):
-        """Add info row"""
-        row = tk.Frame(parent, bg=COLORS['white'])
-        row.pack(fill='x')
+        add(store.footer, 'center', 'light', 'footer')
         
-        tk.Label(
-            row,
-            text=f"{label}:",
-            font=FONTS['receipt'],
-            bg=COLORS['white'],
-            width=10,
-            anchor='w'
-        ).pack(side='left')
-        
-        tk.Label(
-            row,
-            text=value,
-            font=FONTS['receipt'],
-            bg=COLORS['white'],
-            anchor='e'
-        ).pack(side='right')
-    
-    def _add_item_row(self, parent, item):
-        """Add item row"""
-        # Item name
-        tk.Label(
-            parent,
-            text=item['name'],
-            font=FONTS['receipt'],
-            bg=COLORS['white'],
-            anchor='w'
-        ).pack(fill='x')
-        
-        # Qty x price = subtotal
-        detail = tk.Frame(parent, bg=COLORS['white'])
-        detail.pack(fill='x', pady=(0, 5))
-        
-        tk.Label(
-            detail,
-            text=f"  {item['qty']} x {format_currency(item['price'])}",
-            font=FONTS['receipt'],
-            fg=COLORS['text_light'],
-            bg=COLORS['white']
-        ).pack(side='left')
-        
-        tk.Label(
-            detail,
-            text=format_currency(item['subtotal']),
-            font=FONTS['receipt'],
-            bg=COLORS['white']
-        ).pack(side='right')
-    
-    def _add_total_row(self, parent, label, value, bold=False):
-        """Add total row"""
-        row = tk.Frame(parent, bg=COLORS['white'])
-        row.pack(fill='x', pady=2)
-        
-        font = FONTS['receipt_bold'] if bold else FONTS['receipt']
-        
-        tk.Label(
-            row,
-            text=label,
-            font=font,
-            bg=COLORS['white'],
-            anchor='w'
-        ).pack(side='left')
-        
-        tk.Label(
-            row,
-            text=value,
-            font=font,
-            bg=COLORS['white'],
-            anchor='e'
-        ).pack(side='right')
+        self.preview.insert('end', *segments)
     
     def _create_buttons(self, parent):
         """Create action buttons"""
@@ -276,7 +171,19 @@ class Receipt(tk.Toplevel):
             cursor='hand2',
             command=self._print_to_printer
         )
-        print_btn.pack(fill='x', ipady=10, pady=(0, 10))
+        print_btn.pack(fill='x', ipady=10, pady=(0, 5))
+        
+        # Spooler status of this receipt
+        self.print_status_label = tk.Label(
+            btn_frame,
+            text="",
+            font=FONTS['small'],
+            fg=COLORS['text_light'],
+            bg=COLORS['background'],
+            wraplength=340,
+            justify='left'
+        )
+        self.print_status_label.pack(fill='x', pady=(0, 5))
         
         # Close button
         close_btn = tk.Button(
@@ -293,153 +200,11 @@ class Receipt(tk.Toplevel):
     
     def _generate_receipt_text(self):
         """Generate plain text receipt for 48mm thermal printer with ESC/POS formatting"""
-        import textwrap
-        
-        t = self.transaction
-        width = 32  # Characters width for 48mm thermal printer
-        
-        lines = []
-        
-        # ESC/POS Commands
-        ESC = "\x1b"
-        GS = "\x1d"
-        INIT = ESC + "@"           # Initialize printer
-        BOLD_ON = ESC + "E\x01"    # Bold on
-        BOLD_OFF = ESC + "E\x00"   # Bold off
-        DOUBLE_ON = GS + "!\x11"   # Double width+height
-        DOUBLE_OFF = GS + "!\x00"  # Normal size
-        CENTER_ON = ESC + "a\x01"  # Center align
-        LEFT_ON = ESC + "a\x00"    # Left align
-        
-        # Helper: format number with thousand separator (Indonesian style: 1.000)
-        def fmt_num(n):
-            return "{:,.0f}".format(float(n)).replace(",", ".")
-        
-        # Helper: center text with wrapping
-        def center(text):
-            text = str(text)
-            wrapped = textwrap.wrap(text, width)
-            return "\n".join(line.center(width) for line in wrapped)
-        
-        def line(char="-"):
-            return char * width
-        
-        def left_right(left, right):
-            # If combining them fits
-            if len(left) + len(right) + 1 <= width:
-                space = width - len(left) - len(right)
-                return f"{left}{' ' * space}{right}"
-            
-            # If left is too long, wrap it
-            wrapped = textwrap.wrap(left, width)
-            # If the last line of wrapped text + right fits
-            if len(wrapped[-1]) + len(right) + 1 <= width:
-                result = wrapped[:-1]
-                last_line = wrapped[-1]
-                space = width - len(last_line) - len(right)
-                result.append(f"{last_line}{' ' * space}{right}")
-                return "\n".join(result)
-            else:
-                # Print wrapped text then right aligned on next line
-                result = wrapped
-                result.append(right.rjust(width))
-                return "\n".join(result)
-        
-        # Initialize printer
-        lines.append(INIT)
-        
-        # Header - Bold and Double size, centered
-        # Double width = half characters per line (16)
-        header_name = self.store_config.get('name', 'TOKO').upper()
-        
-        # Custom wrapping for header (max 16 chars due to double width)
-        wrapped_header = textwrap.wrap(header_name, 16)
-        centered_header = "\n".join(line.center(16) for line in wrapped_header)
-        
-        # ESC ! n = Master Print Mode Select
-        # n = 0x38 (56) = Emphasized (8) + Double Height (16) + Double Width (32)
-        HEADER_STYLE = ESC + "!\x38"
-        NORMAL_STYLE = ESC + "!\x00"
-        
-        lines.append(CENTER_ON + HEADER_STYLE)
-        lines.append(centered_header)
-        lines.append(NORMAL_STYLE)
-        
-        # Address and phone - normal, centered
-        addr = self.store_config.get('address', '')
-        if addr:
-            lines.append(center(addr))
-        phone = self.store_config.get('phone', '')
-        if phone:
-            lines.append(center(phone))
-        lines.append(LEFT_ON)
-        lines.append(line("="))
-        
-        # Transaction info
-        lines.append(left_right("No:", t['id'][-12:]))
-        lines.append(left_right("Tgl:", format_date(t['date'])))
-        lines.append(left_right("Jam:", t['time']))
-        lines.append(line("-"))
-        
-        # Items header
-        lines.append(BOLD_ON)
-        lines.append(left_right("Item", "Harga"))
-        lines.append(BOLD_OFF)
-        lines.append(line("-"))
-        
-        # Items
-        items = t.get('items_list', [])
-        if not items and 'items' in t:
-            try:
-                items = json.loads(t['items'])
-            except:
-                items = []
-        
-        for item in items:
-            name = item['name']
-            lines.append(name)
-            
-            qty_price = f" {item['qty']} x {fmt_num(item['price'])}"
-            subtotal_str = fmt_num(item['subtotal'])
-            
-            # Indent qty_price slightly to visually separate from name
-            lines.append(left_right(qty_price, subtotal_str))
-        
-        lines.append(line("-"))
-        
-        # Totals
-        subtotal = float(t.get('subtotal', 0))
-        discount = float(t.get('discount', 0))
-        total = float(t.get('total', 0))
-        payment = float(t.get('payment', 0))
-        change = float(t.get('change', 0))
-        
-        lines.append(left_right("Subtotal", fmt_num(subtotal)))
-        if discount > 0:
-            lines.append(left_right("Diskon", f"-{fmt_num(discount)}"))
-        
-        # Total in bold
-        lines.append(BOLD_ON)
-        lines.append(left_right("TOTAL", fmt_num(total)))
-        lines.append(BOLD_OFF)
-        
-        lines.append(left_right("Bayar", fmt_num(payment)))
-        lines.append(left_right("Kembali", fmt_num(change)))
-        lines.append(line("="))
-        
-        # Footer - centered
-        lines.append(CENTER_ON)
-        footer = self.store_config.get('footer', 'Terima kasih!')
-        lines.append(center(footer))
-        lines.append(LEFT_ON)
-        # Feed lines for manual tear-off if cutter command fails/not present
-        lines.append("\n\n")
-        
-        return "\n".join(lines)
+        return render_text(self.layout)
     
     def _ask_print_confirmation(self):
         """Ask user if they want to print the receipt"""
-        default_printer = self.store_config.get('default_printer', '')
+        default_printer = store_config.get('default_printer', '')
         
         if default_printer:
             # If default printer is set, ask for confirmation
@@ -461,81 +226,44 @@ class Receipt(tk.Toplevel):
                 self._print_to_printer()
     
     def _print_to_printer_direct(self, printer_name):
-        """Print receipt directly to thermal printer"""
+        """Queue receipt for the thermal printer (printed by the background spooler)"""
         try:
-            receipt_text = self._generate_receipt_text()
-            
-            # Add ESC/POS command for paper cut (works on most thermal printers)
-            # ESC d n = print and feed n lines
-            # GS V m = cut paper (m=0 full cut, m=1 partial cut)
-            cut_command = "\n\n\n\x1d\x56\x00"  # Feed 3 lines then full cut
-            receipt_with_cut = receipt_text + cut_command
-            
-            # Try using win32print first
-            printed = False
-            try:
-                import win32print
-                import win32api
-                
-                # Open printer
-                hPrinter = win32print.OpenPrinter(printer_name)
-                try:
-                    # Start raw document
-                    hJob = win32print.StartDocPrinter(hPrinter, 1, ("Receipt", None, "RAW"))
-                    try:
-                        win32print.StartPagePrinter(hPrinter)
-                        # Write raw data
-                        win32print.WritePrinter(hPrinter, receipt_with_cut.encode('cp437', errors='replace'))
-                        win32print.EndPagePrinter(hPrinter)
-                        printed = True
-                    finally:
-                        win32print.EndDocPrinter(hPrinter)
-                finally:
-                    win32print.ClosePrinter(hPrinter)
-                
-                if printed:
-                    messagebox.showinfo("Sukses", f"Struk berhasil dicetak ke {printer_name}!", parent=self)
-                    return
-                    
-            except ImportError:
-                # win32print not installed, try alternative method
-                pass
-            except Exception as e:
-                print(f"win32print error: {e}")
-            
-            # Alternative: Use copy command to print to LPT or USB printer
-            # Create temp file
-            with tempfile.NamedTemporaryFile(mode='wb', suffix='.txt', delete=False) as f:
-                f.write(receipt_with_cut.encode('cp437', errors='replace'))
-                temp_file = f.name
-            
-            try:
-                import subprocess
-                # Try copy to printer share name
-                # Format: copy /b filename \\computername\printername
-                result = subprocess.run(
-                    ['cmd', '/c', f'copy /b "{temp_file}" "{printer_name}"'],
-                    capture_output=True,
-                    text=True,
-                    timeout=30
-                )
-                
-                if result.returncode == 0 or 'copied' in result.stdout.lower():
-                    messagebox.showinfo("Sukses", f"Struk berhasil dicetak!", parent=self)
-                else:
-                    # Fallback to print dialog
-                    os.startfile(temp_file, "print")
-                    messagebox.showinfo("Info", "Silakan pilih printer dan klik Print", parent=self)
-                    
-            except Exception as e:
-                os.startfile(temp_file, "print")
-                messagebox.showinfo("Info", "Silakan pilih printer dan klik Print", parent=self)
-            
-            # Clean up
-            self.after(10000, lambda: self._cleanup_temp(temp_file))
+            data = render_escpos(self.layout)
             
+            get_spooler().submit(
+                printer_name,
+                data,
+                title=f"Struk {self.transaction['id']}",
+                on_status=self._print_events.put
+            )
         except Exception as e:
             messagebox.showerror("Error", f"Gagal mencetak: {e}", parent=self)
+            return
+        
+        if not self._polling_print:
+            self._polling_print = True
+            self._poll_print_status()
+    
+    def _poll_print_status(self):
+        """Show spooler status updates for this receipt (Tk thread)"""
+        if not self.winfo_exists():
+            return
+        job = None
+        while not self._print_events.empty():
+            job = self._print_events.get_nowait()
+        if job is not None:
+            text, color = {
+                STATUS_QUEUED: ("⏳ Struk masuk antrian cetak...", COLORS['text_light']),
+                STATUS_PRINTING: ("🖨️ Mencetak...", COLORS['text_light']),
+                STATUS_RETRYING: (f"⚠️ Printer belum merespon, mencoba lagi... ({job.error})", COLORS['warning']),
+                STATUS_DONE: (f"✅ Struk berhasil dicetak ke {job.printer}", COLORS['success']),
+                STATUS_FAILED: (f"❌ Gagal mencetak: {job.error}\nStruk tetap di antrian.", COLORS['danger']),
+            }[job.status]
+            self.print_status_label.configure(text=text, fg=color)
+            if job.status in (STATUS_DONE, STATUS_FAILED):
+                self._polling_print = False
+                return
+        self.after(200, self._poll_print_status)
     
     def _print_to_printer(self):
         """Print receipt using Windows print dialog"""
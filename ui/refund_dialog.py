@@ -0,0 +1,147 @@
+"""
+Refund Dialog Component - Return items of a sale as a reversal transaction
+"""
+import tkinter as tk
+from tkinter import messagebox
+from config import COLORS, FONTS
+from db_manager import TransactionDatabase
+from utils.helpers import format_currency
+
+class RefundDialog(tk.Toplevel):
+    """Dialog to choose returned quantities for a sale"""
+    
+    def __init__(self, parent, transaction, on_done=None):
+        super().__init__(parent)
+        
+        self.transaction_db = TransactionDatabase()
+        self.transaction = transaction
+        self.on_done = on_done
+        self.qty_vars = {}
+        
+        self.title("Refund / Retur")
+        self.geometry("460x420")
+        self.resizable(False, True)
+        self.transient(parent)
+        self.grab_set()
+        self.configure(bg=COLORS['white'])
+        
+        # Center window
+        self.update_idletasks()
+        x = (self.winfo_screenwidth() - 460) // 2
+        y = (self.winfo_screenheight() - 420) // 2
+        self.geometry(f"+{x}+{y}")
+        
+        self.remaining = self.transaction_db.get_refundable_quantities(transaction['id'])
+        self._create_widgets()
+        self._update_total()
+    
+    def _create_widgets(self):
+        p = tk.Frame(self, bg=COLORS['white'], padx=20, pady=20)
+        p.pack(fill='both', expand=True)
+        
+        tk.Label(p, text=f"Refund untuk: {self.transaction['id']}", font=FONTS['body_bold'], bg=COLORS['white']).pack(anchor='w')
+        tk.Label(
+            p,
+            text="Refund dicatat sebagai transaksi baru; transaksi asli tidak diubah.",
+            font=FONTS['small'],
+            fg=COLORS['text_light'],
+            bg=COLORS['white']
+        ).pack(anchor='w', pady=(0, 15))
+        
+        # One row per line item: name, refundable qty, qty to return
+        items_frame = tk.Frame(p, bg=COLORS['white'])
+        items_frame.pack(fill='both', expand=True)
+        items_frame.grid_columnconfigure(0, weight=1)
+        
+        tk.Label(items_frame, text="Item", font=FONTS['small'], fg=COLORS['text_light'], bg=COLORS['white']).grid(row=0, column=0, sticky='w')
+        tk.Label(items_frame, text="Sisa", font=FONTS['small'], fg=COLORS['text_light'], bg=COLORS['white']).grid(row=0, column=1, padx=10)
+        tk.Label(items_frame, text="Retur", font=FONTS['small'], fg=COLORS['text_light'], bg=COLORS['white']).grid(row=0, column=2)
+        
+        for row, item in enumerate(self.transaction.get('items_list', []), start=1):
+            product_id = item['product_id']
+            remaining = max(0, self.remaining.get(product_id, 0))
+            
+            tk.Label(
+                items_frame,
+                text=f"{item['name']} @ {format_currency(item['price'])}",
+                font=FONTS['body'],
+                bg=COLORS['white'],
+                anchor='w'
+            ).grid(row=row, column=0, sticky='w', pady=3)
+            tk.Label(items_frame, text=str(remaining), font=FONTS['body'], bg=COLORS['white']).grid(row=row, column=1, padx=10)
+            
+            qty_var = tk.StringVar(value="0")
+            qty_var.trace('w', lambda *args: self._update_total())
+            spinbox = tk.Spinbox(
+                items_frame,
+                from_=0,
+                to=remaining,
+                textvariable=qty_var,
+                width=5,
+                font=FONTS['body'],
+                state='normal' if remaining > 0 else 'disabled'
+            )
+            spinbox.grid(row=row, column=2)
+            self.qty_vars[product_id] = (qty_var, item)
+        
+        # Refund total preview
+        self.total_label = tk.Label(p, text="", font=FONTS['body_bold'], fg=COLORS['danger'], bg=COLORS['white'])
+        self.total_label.pack(anchor='w', pady=(15, 15))
+        
+        # Buttons
+        btn_frame = tk.Frame(p, bg=COLORS['white'])
+        btn_frame.pack(fill='x', side='bottom')
+        
+        tk.Button(btn_frame, text="Batal", command=self.destroy, font=FONTS['body'], bg='#E2E8F0', relief='flat').pack(side='left', fill='x', expand=True, padx=(0, 5))
+        tk.Button(btn_frame, text="↩️ Proses Refund", command=self._submit, font=FONTS['body_bold'], bg=COLORS['danger'], fg='white', relief='flat').pack(side='left', fill='x', expand=True, padx=(5, 0))
+    
+    def _quantities(self):
+        """Get {product_id: qty} entered by the user"""
+        quantities = {}
+        for product_id, (qty_var, item) in self.qty_vars.items():
+            try:
+                qty = int(qty_var.get())
+            except ValueError:
+                qty = 0
+            if qty > 0:
+                quantities[product_id] = qty
+        return quantities
+    
+    def _update_total(self):
+        """Show refund amount after the sale's discount"""
+        if not hasattr(self, 'total_label'):
+            return
+        subtotal = sum(
+            float(self.qty_vars[product_id][1]['price']) * qty
+            for product_id, qty in self._quantities().items()
+        )
+        original_subtotal = float(self.transaction.get('subtotal') or 0)
+        ratio = float(self.transaction.get('total') or 0) / original_subtotal if original_subtotal else 1.0
+        self.total_label.configure(text=f"Total refund: {format_currency(subtotal * ratio)}")
+    
+    def _submit(self):
+        """Append the refund transaction"""
+        quantities = self._quantities()
+        if not quantities:
+            messagebox.showerror("Error", "Pilih minimal satu item untuk direfund", parent=self)
+            return
+        
+        try:
+            refund = self.transaction_db.add_refund(
+                self.transaction['id'],
+                quantities,
+                cashier=self.transaction.get('cashier') or "Kasir"
+            )
+        except Exception as e:
+            messagebox.showerror("Error", f"Gagal memproses refund: {e}", parent=self)
+            return
+        
+        messagebox.showinfo("Sukses", f"Refund {refund['id']} berhasil dicatat!", parent=self)
+        self.destroy()
+        if self.on_done:
+            self.on_done(refund)
+
+
+def show_refund_dialog(parent, transaction, on_done=None):
+    """Show refund dialog"""
+    RefundDialog(parent, transaction, on_done)
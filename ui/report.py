@@ -8,6 +8,8 @@ from calendar import monthrange
 from config import COLORS, FONTS
 from db_manager import TransactionDatabase
 from utils.helpers import format_currency
+from ui.export_dialog import show_export_dialog
+from ui.loader import BackgroundLoader
 
 class Report(tk.Frame):
     """Monthly sales report with chart visualization"""
@@ -16,11 +18,11 @@ class Report(tk.Frame):
         super().__init__(parent, bg=COLORS['background'])
         
         self.transaction_db = TransactionDatabase()
+        self.loader = BackgroundLoader(self)
         self.current_month = datetime.now().month
         self.current_year = datetime.now().year
         
         self._create_widgets()
-        self._load_data()
     
     def _create_widgets(self):
         # Header
@@ -92,6 +94,18 @@ class Report(tk.Frame):
             cursor='hand2',
             command=self._next_month
         ).pack(side='left', padx=5)
+        
+        # Export
+        tk.Button(
+            header,
+            text="📤 Export",
+            font=FONTS['body'],
+            fg=COLORS['white'],
+            bg=COLORS['success'],
+            relief='flat',
+            cursor='hand2',
+            command=self._open_export
+        ).pack(side='right', padx=(0, 20))
     
     def _create_chart_section(self, parent):
         """Create bar chart visualization"""
@@ -175,6 +189,13 @@ class Report(tk.Frame):
             self.current_month -= 1
         self._load_data()
     
+    def _open_export(self):
+        """Open export dialog for the selected month"""
+        days_in_month = monthrange(self.current_year, self.current_month)[1]
+        start_date = f"{self.current_year}-{self.current_month:02d}-01"
+        end_date = f"{self.current_year}-{self.current_month:02d}-{days_in_month:02d}"
+        show_export_dialog(self, start_date, end_date)
+    
     def _next_month(self):
         """Go to next month"""
         if self.current_month == 12:
@@ -196,19 +217,31 @@ class Report(tk.Frame):
         start_date = f"{self.current_year}-{self.current_month:02d}-01"
         end_date = f"{self.current_year}-{self.current_month:02d}-{days_in_month:02d}"
         
-        # Get transactions
-        transactions = self.transaction_db.get_by_date_range(start_date, end_date)
-        
-        # Calculate daily totals
+        self.loader.submit(
+            'data',
+            lambda: self._fetch_daily_totals(start_date, end_date),
+            lambda result: self._show_data(result, days_in_month)
+        )
+    
+    def _fetch_daily_totals(self, start_date, end_date):
+        """Sum sales per day of month (runs on a worker thread)"""
         daily_totals = {}
-        for t in transactions:
+        total_transactions = 0
+        for t in self.transaction_db.iter_by_date_range(start_date, end_date):
             day = int(t['date'].split('-')[2])
             total = float(t['total'])
             daily_totals[day] = daily_totals.get(day, 0) + total
+            if not t.get('ref_id'):
+                # Refunds count toward the totals, not the number of transactions
+                total_transactions += 1
+        return daily_totals, total_transactions
+    
+    def _show_data(self, result, days_in_month):
+        """Show loaded month data"""
+        daily_totals, total_transactions = result
         
         # Calculate stats
         total_sales = sum(daily_totals.values())
-        total_transactions = len(transactions)
         avg_daily = total_sales / days_in_month if total_sales > 0 else 0
         highest_day = max(daily_totals.values()) if daily_totals else 0
         highest_day_num = max(daily_totals, key=daily_totals.get) if daily_totals else 0
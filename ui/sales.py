@@ -6,6 +6,7 @@ from tkinter import ttk, messagebox
 from config import COLORS, FONTS
 from db_manager import ProductDatabase, TransactionDatabase
 from utils.helpers import format_currency, parse_float, parse_int, format_currency_input, parse_currency_input
+from ui.loader import BackgroundLoader
 
 class Sales(tk.Frame):
     """Point of Sale interface for transactions"""
@@ -15,6 +16,7 @@ class Sales(tk.Frame):
         
         self.product_db = ProductDatabase()
         self.transaction_db = TransactionDatabase()
+        self.loader = BackgroundLoader(self)
         self.on_print_receipt = on_print_receipt
         
         # Cart items: list of {product_id, barcode, name, price, qty, subtotal}
@@ -368,14 +370,20 @@ class Sales(tk.Frame):
     
     def _load_products(self, query=""):
         """Load products into treeview"""
+        # Search-as-you-type: each keystroke supersedes the previous search
+        self.loader.submit('products', lambda: self._fetch_products(query), self._show_products, overlay=False)
+    
+    def _fetch_products(self, query):
+        """Read matching products (runs on a worker thread)"""
+        if query:
+            return self.product_db.search(query)
+        return self.product_db.get_all()
+    
+    def _show_products(self, products):
+        """Show loaded products in treeview"""
         for item in self.product_tree.get_children():
             self.product_tree.delete(item)
         
-        if query:
-            products = self.product_db.search(query)
-        else:
-            products = self.product_db.get_all()
-        
         for p in products:
             self.product_tree.insert('', 'end', iid=p['id'], values=(
                 p['barcode'],
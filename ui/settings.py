@@ -2,45 +2,65 @@
 Settings Component - Application configuration
 """
 import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
-import json
+from tkinter import ttk, messagebox, filedialog, simpledialog
 import os
+import queue
 import shutil
-from config import COLORS, FONTS, STORE_CONFIG, DATABASE_DIR, APP_DIR, ASSETS_DIR, THEMES, apply_theme
+import tempfile
+import time
+from datetime import datetime
+from config import COLORS, FONTS, DATABASE_DIR, ASSETS_DIR, THEMES, apply_theme, store_config
 from db_manager import ProductDatabase, TransactionDatabase
+from utils.image_cache import save_logo
+from utils.receipt_logo import build_raster
+from utils.backup import BackupRepository
+from utils.locks import write_lock
+from utils.backup_scheduler import get_backup_scheduler, DEFAULT_INTERVAL_HOURS, DEFAULT_KEEP
+from utils.printer_discovery import printer_discovery
+from ui.loader import BackgroundLoader
 
 class Settings(tk.Frame):
     """Application settings interface"""
     
-    CONFIG_FILE = os.path.join(APP_DIR, "store_config.json")
-    
     def __init__(self, parent):
         super().__init__(parent, bg=COLORS['background'])
         
+        self.loader = BackgroundLoader(self)
         self._load_config()
         self._create_widgets()
+        
+        # Listeners run on whichever thread noticed the change: hand it to the Tk thread
+        self._config_events = queue.Queue()
+        store_config.add_listener(self._on_config_changed)
+        self.bind('<Destroy>', self._on_destroy)
+        self._poll_config_events()
     
     def _load_config(self):
         """Load store configuration"""
-        self.config = STORE_CONFIG.copy()
-        
-        if os.path.exists(self.CONFIG_FILE):
-            try:
-                with open(self.CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    saved_config = json.load(f)
-                    self.config.update(saved_config)
-            except:
-                pass
+        self.config = store_config.snapshot()
+    
+    def _on_config_changed(self, config, changed):
+        """Queue changes made elsewhere (any thread)"""
+        self._config_events.put(changed)
+    
+    def _poll_config_events(self):
+        """Keep the local copy in sync with queued changes (Tk thread)"""
+        changed = False
+        while not self._config_events.empty():
+            self._config_events.get_nowait()
+            changed = True
+        if changed:
+            self._load_config()
+        self.after(500, self._poll_config_events)
+    
+    def _on_destroy(self, event):
+        if event.widget is self:
+            store_config.remove_listener(self._on_config_changed)
     
     def _save_config(self):
-        """Save store configuration"""
-        try:
-            with open(self.CONFIG_FILE, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, indent=2, ensure_ascii=False)
-            return True
-        except Exception as e:
-            messagebox.showerror("Error", f"Gagal menyimpan konfigurasi: {e}")
-            return False
+        """Save store configuration (written to disk shortly after, coalesced)"""
+        store_config.update(self.config)
+        return True
     
     def _create_widgets(self):
         # Header
@@ -202,15 +222,14 @@ class Settings(tk.Frame):
         
         tk.Label(
             parent,
-            text="Pilih printer default untuk cetak struk otomatis",
+            text="Pilih printer default untuk cetak struk otomatis, atau ketik alamat\n"
+                 "tcp://192.168.1.50:9100, file:///dev/usb/lp0 atau spool:///folder",
             font=FONTS['small'],
             fg=COLORS['text_light'],
-            bg=COLORS['card']
+            bg=COLORS['card'],
+            justify='left'
         ).pack(anchor='w')
         
-        # Get list of printers
-        printers = self._get_printers()
-        
         printer_frame = tk.Frame(parent, bg=COLORS['card'])
         printer_frame.pack(fill='x', pady=10)
         
@@ -224,14 +243,14 @@ class Settings(tk.Frame):
         
         self.printer_var = tk.StringVar(value=self.config.get('default_printer', ''))
         
-        printer_combo = ttk.Combobox(
+        # Filled in when printer discovery finishes
+        self.printer_combo = ttk.Combobox(
             printer_frame,
             textvariable=self.printer_var,
-            values=printers,
-            font=FONTS['body'],
-            state='readonly'
+            values=self._printer_choices(printer_discovery.cached() or []),
+            font=FONTS['body']
         )
-        printer_combo.pack(fill='x', pady=5, ipady=5)
+        self.printer_combo.pack(fill='x', pady=5, ipady=5)
         
         # Buttons row
         btn_row = tk.Frame(parent, bg=COLORS['card'])
@@ -245,7 +264,7 @@ class Settings(tk.Frame):
             bg=COLORS['background'],
             relief='flat',
             cursor='hand2',
-            command=lambda: self._refresh_printers(printer_combo)
+            command=self._refresh_printers
         )
         refresh_btn.pack(side='left', padx=(0, 10))
         
@@ -275,35 +294,33 @@ class Settings(tk.Frame):
         current = self.config.get('default_printer', '')
         if current:
             self.printer_status.configure(text=f"✅ Printer aktif: {current}", fg=COLORS['success'])
+        
+        self._load_printers()
     
-    def _get_printers(self):
-        """Get list of installed printers"""
-        printers = []
-        try:
-            import subprocess
-            # Use wmic to get list of printers
-            result = subprocess.run(
-                ['wmic', 'printer', 'get', 'name'],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            lines = result.stdout.strip().split('\n')
-            for line in lines[1:]:  # Skip header
-                printer = line.strip()
-                if printer:
-                    printers.append(printer)
-        except Exception as e:
-            print(f"Error getting printers: {e}")
-            # Add some common printer names as fallback
-            printers = ["Microsoft Print to PDF", "Microsoft XPS Document Writer"]
+    def _printer_choices(self, printers):
+        """Discovered printers, plus the saved one if it was typed in by hand"""
+        current = self.config.get('default_printer', '')
+        if current and current not in printers:
+            printers = printers + [current]
         return printers
     
-    def _refresh_printers(self, combo):
+    def _load_printers(self, force=False):
+        """Discover printers in the background (cached for a few minutes)"""
+        self.loader.submit(
+            'printers',
+            lambda: printer_discovery.get_printers(force=force),
+            lambda printers: self._show_printers(printers, force),
+            overlay=False
+        )
+    
+    def _show_printers(self, printers, announce):
+        self.printer_combo['values'] = self._printer_choices(printers)
+        if announce:
+            messagebox.showinfo("Info", f"Ditemukan {len(printers)} printer")
+    
+    def _refresh_printers(self):
         """Refresh printer list"""
-        printers = self._get_printers()
-        combo['values'] = printers
-        messagebox.showinfo("Info", f"Ditemukan {len(printers)} printer")
+        self._load_printers(force=True)
     
     def _save_printer_settings(self):
         """Save printer settings"""
@@ -444,6 +461,20 @@ class Settings(tk.Frame):
         )
         restore_btn.pack(fill='x', pady=5, ipady=8)
         
+        close_month_btn = tk.Button(
+            inner,
+            text="🗜️ Tutup Bulan",
+            font=FONTS['body'],
+            fg=COLORS['white'],
+            bg=COLORS['primary'],
+            relief='flat',
+            cursor='hand2',
+            command=self._close_month
+        )
+        close_month_btn.pack(fill='x', pady=5, ipady=8)
+        
+        self._create_auto_backup(inner)
+        
         # Danger zone
         sep = tk.Frame(inner, bg=COLORS['border'], height=1)
         sep.pack(fill='x', pady=20)
@@ -480,6 +511,111 @@ class Settings(tk.Frame):
         )
         clear_products_btn.pack(fill='x', pady=5, ipady=8)
     
+    def _create_auto_backup(self, parent):
+        """Scheduled backup settings"""
+        frame = tk.Frame(parent, bg=COLORS['background'])
+        frame.pack(fill='x', pady=(10, 0))
+        
+        self.backup_auto_var = tk.BooleanVar(value=bool(self.config.get('backup_auto')))
+        tk.Checkbutton(
+            frame,
+            text="Backup otomatis di latar belakang",
+            variable=self.backup_auto_var,
+            font=FONTS['body'],
+            fg=COLORS['text'],
+            bg=COLORS['background'],
+            activebackground=COLORS['background']
+        ).pack(anchor='w', padx=15, pady=(10, 5))
+        
+        row = tk.Frame(frame, bg=COLORS['background'])
+        row.pack(fill='x', padx=15, pady=5)
+        tk.Label(row, text="Setiap (jam):", font=FONTS['body'], fg=COLORS['text'], bg=COLORS['background']).pack(side='left')
+        self.backup_interval_var = tk.StringVar(value=str(self.config.get('backup_interval_hours', DEFAULT_INTERVAL_HOURS)))
+        tk.Spinbox(row, from_=1, to=168, textvariable=self.backup_interval_var, width=5, font=FONTS['body']).pack(side='left', padx=5)
+        tk.Label(row, text="Simpan:", font=FONTS['body'], fg=COLORS['text'], bg=COLORS['background']).pack(side='left', padx=(10, 0))
+        self.backup_keep_var = tk.StringVar(value=str(self.config.get('backup_keep', DEFAULT_KEEP)))
+        tk.Spinbox(row, from_=1, to=365, textvariable=self.backup_keep_var, width=5, font=FONTS['body']).pack(side='left', padx=5)
+        tk.Label(row, text="backup", font=FONTS['body'], fg=COLORS['text'], bg=COLORS['background']).pack(side='left')
+        
+        tk.Button(
+            frame,
+            text="💾 Simpan Jadwal Backup",
+            font=FONTS['small'],
+            fg=COLORS['white'],
+            bg=COLORS['success'],
+            relief='flat',
+            cursor='hand2',
+            command=self._save_auto_backup
+        ).pack(anchor='e', padx=15, pady=5, ipadx=10, ipady=3)
+        
+        self.backup_status = tk.Label(
+            frame,
+            text="",
+            font=FONTS['small'],
+            fg=COLORS['text_light'],
+            bg=COLORS['background'],
+            justify='left'
+        )
+        self.backup_status.pack(anchor='w', padx=15, pady=(0, 10))
+        self._update_backup_status()
+    
+    def _save_auto_backup(self):
+        """Save the backup schedule (the scheduler picks it up at once)"""
+        try:
+            interval = int(self.backup_interval_var.get())
+            keep = int(self.backup_keep_var.get())
+        except ValueError:
+            messagebox.showerror("Error", "Jam dan jumlah backup harus berupa angka")
+            return
+        if interval < 1 or keep < 1:
+            messagebox.showerror("Error", "Jam dan jumlah backup minimal 1")
+            return
+        
+        enabled = self.backup_auto_var.get()
+        folder = self.config.get('backup_dir')
+        if enabled and not folder:
+            folder = filedialog.askdirectory(title="Pilih folder backup")
+            if not folder:
+                return
+        
+        self.config.update(backup_auto=enabled, backup_dir=folder or '',
+                           backup_interval_hours=interval, backup_keep=keep)
+        if self._save_config():
+            self._update_backup_status()
+            messagebox.showinfo("Sukses", "Jadwal backup disimpan!")
+    
+    def _update_backup_status(self):
+        """Show the backup schedule; next_due() reads the backup folder, so off the Tk thread"""
+        scheduler = get_backup_scheduler()
+        if not scheduler.enabled():
+            self.loader.cancel('backup_status')
+            self._show_backup_status(None)
+            return
+        self.loader.submit(
+            'backup_status',
+            scheduler.next_due,
+            self._show_backup_status,
+            on_error=lambda e: print(f"Error checking backups: {e}"),
+            overlay=False
+        )
+    
+    def _show_backup_status(self, due):
+        scheduler = get_backup_scheduler()
+        if due is None:
+            self.backup_status.configure(text="Backup otomatis mati", fg=COLORS['text_light'])
+            return
+        
+        lines = [f"Folder: {self.config.get('backup_dir')}"]
+        if scheduler.running:
+            lines.append("⏳ Backup sedang berjalan...")
+        else:
+            lines.append(f"Berikutnya: {datetime.fromtimestamp(max(due, time.time())).strftime('%d/%m/%Y %H:%M')}")
+        if scheduler.last_error:
+            lines.append(f"⚠️ Backup terakhir gagal: {scheduler.last_error}")
+            self.backup_status.configure(text="\n".join(lines), fg=COLORS['danger'])
+        else:
+            self.backup_status.configure(text="\n".join(lines), fg=COLORS['success'])
+    
     def _save_store_settings(self):
         """Save store settings"""
         self.config['name'] = self.name_var.get()
@@ -502,64 +638,150 @@ class Settings(tk.Frame):
         
         if filepath:
             try:
-                # Copy to assets folder
+                # Resize once and store as PNG in assets folder
                 dest = os.path.join(ASSETS_DIR, "logo.png")
-                shutil.copy2(filepath, dest)
+                save_logo(filepath, dest)
+                # Dither once for printing on receipts
+                build_raster(dest)
                 self.logo_status.configure(text="✅ Logo berhasil diupload! Restart aplikasi.", fg=COLORS['success'])
             except Exception as e:
                 messagebox.showerror("Error", f"Gagal upload logo: {e}")
     
     def _backup_database(self):
-        """Backup database files"""
-        folder = filedialog.askdirectory(title="Pilih folder backup")
+        """Incremental backup into a backup repository (only changed data is stored)"""
+        folder = filedialog.askdirectory(
+            title="Pilih folder backup",
+            initialdir=self.config.get('backup_dir') or None
+        )
         
         if folder:
-            try:
-                from datetime import datetime
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                backup_folder = os.path.join(folder, f"backup_{timestamp}")
-                os.makedirs(backup_folder, exist_ok=True)
-                
-                # Copy database files
-                for filename in os.listdir(DATABASE_DIR):
-                    if filename.endswith('.csv'):
-                        src = os.path.join(DATABASE_DIR, filename)
-                        dst = os.path.join(backup_folder, filename)
-                        shutil.copy2(src, dst)
-                
-                # Copy config
-                if os.path.exists(self.CONFIG_FILE):
-                    shutil.copy2(self.CONFIG_FILE, os.path.join(backup_folder, "store_config.json"))
-                
-                messagebox.showinfo("Sukses", f"Backup berhasil disimpan ke:\n{backup_folder}")
-            except Exception as e:
-                messagebox.showerror("Error", f"Backup gagal: {e}")
+            # Write pending config changes first
+            store_config.flush()
+            store_config.update(backup_dir=folder)
+            repository = BackupRepository.locate(folder)
+            self.loader.submit(
+                'backup',
+                repository.backup,
+                lambda stats: self._on_backup_done(repository, stats),
+                on_error=lambda e: messagebox.showerror("Error", f"Backup gagal: {e}")
+            )
+    
+    def _on_backup_done(self, repository, stats):
+        stored = stats['bytes_stored'] / (1024 * 1024)
+        read = stats['bytes_read'] / (1024 * 1024)
+        messagebox.showinfo(
+            "Sukses",
+            f"Backup {stats['snapshot']} berhasil disimpan ke:\n{repository.root}\n\n"
+            f"{stats['files']} file, {read:.1f} MB dibaca, {stored:.1f} MB data baru disimpan"
+        )
     
     def _restore_database(self):
-        """Restore database from backup"""
-        folder = filedialog.askdirectory(title="Pilih folder backup")
-        
-        if folder:
-            if not messagebox.askyesno("Konfirmasi", "Data yang ada sekarang akan diganti dengan data backup. Lanjutkan?"):
-                return
-            
+        """Restore database from a backup repository or an old backup folder"""
+        folder = filedialog.askdirectory(
+            title="Pilih folder backup",
+            initialdir=self.config.get('backup_dir') or None
+        )
+        if not folder:
+            return
+        
+        repository = BackupRepository.locate(folder)
+        snapshots = repository.snapshots()
+        if not snapshots:
+            # Full copy made by older versions
+            if messagebox.askyesno("Konfirmasi", "Data yang ada sekarang akan diganti dengan data backup. Lanjutkan?"):
+                self._restore_from_folder(folder)
+            return
+        
+        recent = "\n".join(reversed(snapshots[-10:]))
+        name = simpledialog.askstring(
+            "Restore Database",
+            f"Snapshot yang direstore:\n\n{recent}",
+            initialvalue=snapshots[-1],
+            parent=self
+        )
+        if not name:
+            return
+        name = name.strip()
+        if name not in snapshots:
+            messagebox.showerror("Error", f"Snapshot {name} tidak ditemukan")
+            return
+        if not messagebox.askyesno("Konfirmasi", "Data yang ada sekarang akan diganti dengan data backup. Lanjutkan?"):
+            return
+        
+        staging = tempfile.mkdtemp(prefix="kasir_restore_")
+        
+        def restored(files):
             try:
-                # Copy database files
+                self._restore_from_folder(staging)
+            finally:
+                shutil.rmtree(staging, ignore_errors=True)
+        
+        def failed(e):
+            shutil.rmtree(staging, ignore_errors=True)
+            messagebox.showerror("Error", f"Restore gagal: {e}")
+        
+        self.loader.submit('backup', lambda: repository.restore(name, staging), restored, on_error=failed)
+    
+    def _restore_from_folder(self, folder):
+        """Replace the database with the files in a backup folder"""
+        try:
+            # Copy database files (no sale is written halfway through)
+            with write_lock:
                 for filename in os.listdir(folder):
                     if filename.endswith('.csv'):
                         src = os.path.join(folder, filename)
                         dst = os.path.join(DATABASE_DIR, filename)
                         shutil.copy2(src, dst)
-                
-                # Copy config
-                config_src = os.path.join(folder, "store_config.json")
-                if os.path.exists(config_src):
-                    shutil.copy2(config_src, self.CONFIG_FILE)
-                    self._load_config()
-                
-                messagebox.showinfo("Sukses", "Database berhasil direstore! Restart aplikasi.")
-            except Exception as e:
-                messagebox.showerror("Error", f"Restore gagal: {e}")
+            
+            # Archives of closed months are replaced as a whole
+            transaction_db = TransactionDatabase()
+            archive_src = os.path.join(folder, "archive")
+            if os.path.isdir(transaction_db.archive_dir):
+                shutil.rmtree(transaction_db.archive_dir)
+            if os.path.isdir(archive_src):
+                shutil.copytree(archive_src, transaction_db.archive_dir)
+            transaction_db.invalidate_caches()
+            
+            # Copy config
+            config_src = os.path.join(folder, "store_config.json")
+            if os.path.exists(config_src):
+                store_config.flush()
+                shutil.copy2(config_src, store_config.path)
+                store_config.reload()
+                self._load_config()
+            
+            messagebox.showinfo("Sukses", "Database berhasil direstore! Restart aplikasi.")
+        except Exception as e:
+            messagebox.showerror("Error", f"Restore gagal: {e}")
+    
+    def _close_month(self):
+        """Move a past month's transactions into a compressed archive"""
+        now = datetime.now()
+        last_month = f"{now.year - 1}-12" if now.month == 1 else f"{now.year}-{now.month - 1:02d}"
+        
+        year_month = simpledialog.askstring(
+            "Tutup Bulan",
+            "Bulan yang ditutup (YYYY-MM):\n\nTransaksi bulan ini akan dipindah ke arsip terkompresi "
+            "dan tidak bisa diedit atau dihapus lagi.",
+            initialvalue=last_month,
+            parent=self
+        )
+        if not year_month:
+            return
+        
+        try:
+            result = TransactionDatabase().close_month(year_month.strip())
+            if result['count'] == 0:
+                messagebox.showinfo("Info", f"Tidak ada transaksi aktif di bulan {year_month}.")
+                return
+            messagebox.showinfo(
+                "Sukses",
+                f"{result['count']} transaksi bulan {year_month} diarsipkan.\n\n"
+                f"CSV berkurang {result['csv_bytes'] / 1024:.0f} KB, "
+                f"arsip {result['archive_bytes'] / 1024:.0f} KB."
+            )
+        except Exception as e:
+            messagebox.showerror("Error", f"Gagal menutup bulan: {e}")
     
     def _clear_transactions(self):
         """Clear all transactions"""
@@ -568,8 +790,11 @@ class Settings(tk.Frame):
                 trans_file = os.path.join(DATABASE_DIR, "transactions.csv")
                 if os.path.exists(trans_file):
                     os.remove(trans_file)
-                    # Recreate empty file
-                    TransactionDatabase()
+                # Recreate empty file
+                transaction_db = TransactionDatabase()
+                if os.path.isdir(transaction_db.archive_dir):
+                    shutil.rmtree(transaction_db.archive_dir)
+                transaction_db.invalidate_caches()
                 messagebox.showinfo("Sukses", "Semua transaksi berhasil dihapus!")
             except Exception as e:
                 messagebox.showerror("Error", f"Gagal menghapus: {e}")
@@ -590,6 +815,8 @@ class Settings(tk.Frame):
     def refresh(self):
         """Refresh settings view"""
         self._load_config()
+        self._load_printers()
+        self._update_backup_status()
     
     def _create_theme_section(self, parent):
         """Create theme settings section"""
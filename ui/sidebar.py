@@ -3,9 +3,9 @@ Sidebar Navigation Component with Logo
 """
 import tkinter as tk
 from tkinter import ttk
-from PIL import Image, ImageTk
 import os
 from config import COLORS, FONTS, SIDEBAR_WIDTH, ASSETS_DIR
+from utils.image_cache import get_thumbnail
 
 class Sidebar(tk.Frame):
     """Sidebar navigation with logo and menu items"""
@@ -41,13 +41,10 @@ class Sidebar(tk.Frame):
         logo_frame.pack(fill='x', pady=(20, 10))
         
         # Try to load logo image
-        logo_path = os.path.join(ASSETS_DIR, "logo.png")
-        if os.path.exists(logo_path):
+        logo_path = get_thumbnail(os.path.join(ASSETS_DIR, "logo.png"), (60, 60))
+        if logo_path:
             try:
-                img = Image.open(logo_path)
-                # Resize to fit sidebar
-                img = img.resize((60, 60), Image.Resampling.LANCZOS)
-                self.logo_image = ImageTk.PhotoImage(img)
+                self.logo_image = tk.PhotoImage(file=logo_path)
                 
                 logo_label = tk.Label(logo_frame, image=self.logo_image, bg=COLORS['sidebar'])
                 logo_label.pack()
@@ -102,6 +99,8 @@ class Sidebar(tk.Frame):
             ("products", "📦", "Produk"),
             ("history", "📋", "Riwayat"),
             ("report", "📈", "Rekap Bulanan"),
+            ("top_products", "🏆", "Produk Terlaris"),
+            ("heatmap", "🕐", "Jam Ramai"),
             ("profit_loss", "💹", "Laba Rugi"),
             ("settings", "⚙️", "Pengaturan"),
             ("developer", "👨‍💻", "Developer"),
@@ -195,10 +194,23 @@ class Sidebar(tk.Frame):
             btn.text_label.configure(bg=COLORS['sidebar_active'], font=FONTS['menu_bold'])
     
     def _create_bottom_section(self):
-        """Create bottom section with version info"""
+        """Create bottom section with print queue status and version info"""
         bottom = tk.Frame(self, bg=COLORS['sidebar'])
         bottom.pack(fill='x', side='bottom', pady=15)
         
+        # Print queue status (empty while nothing is waiting)
+        self.print_status = tk.Label(
+            bottom,
+            text="",
+            font=FONTS['small'],
+            fg=COLORS['warning'],
+            bg=COLORS['sidebar'],
+            wraplength=SIDEBAR_WIDTH - 30
+        )
+        self.print_status.pack(pady=(0, 5))
+        self.on_print_status_click = None
+        self.print_status.bind('<Button-1>', lambda e: self.on_print_status_click and self.on_print_status_click())
+        
         version = tk.Label(
             bottom,
             text="v1.0.0",
@@ -207,3 +219,11 @@ class Sidebar(tk.Frame):
             bg=COLORS['sidebar']
         )
         version.pack()
+    
+    def set_print_status(self, text, color=None, clickable=False):
+        """Show print queue status at the bottom of the sidebar"""
+        self.print_status.configure(
+            text=text,
+            fg=color or COLORS['warning'],
+            cursor='hand2' if clickable else ''
+        )
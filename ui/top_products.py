@@ -0,0 +1,223 @@
+"""
+Top Products Component - Product-level sales analytics
+"""
+import tkinter as tk
+from tkinter import ttk
+from datetime import datetime, timedelta
+from config import COLORS, FONTS
+from db_manager import ProductDatabase, TransactionDatabase
+from utils.helpers import format_currency, get_current_date, parse_float
+from utils.analytics import build_product_rows, abc_classify, top_k
+from ui.loader import BackgroundLoader
+
+class TopProducts(tk.Frame):
+    """Top selling products with units, revenue, margin and ABC class"""
+    
+    LIMITS = [("Top 10", 10), ("Top 20", 20), ("Top 50", 50), ("Top 100", 100), ("Semua", None)]
+    SORT_KEYS = [("Pendapatan", 'revenue'), ("Unit Terjual", 'qty'), ("Laba", 'profit')]
+    
+    def __init__(self, parent):
+        super().__init__(parent, bg=COLORS['background'])
+        
+        self.product_db = ProductDatabase()
+        self.transaction_db = TransactionDatabase()
+        self.loader = BackgroundLoader(self)
+        
+        self._create_widgets()
+    
+    def _create_widgets(self):
+        # Header
+        self._create_header()
+        
+        # Filter section
+        self._create_filter_section()
+        
+        # Product ranking table
+        self._create_product_list()
+    
+    def _create_header(self):
+        """Create page header"""
+        header = tk.Frame(self, bg=COLORS['background'])
+        header.pack(fill='x', padx=30, pady=(30, 20))
+        
+        tk.Label(
+            header,
+            text="🏆 Produk Terlaris",
+            font=FONTS['heading'],
+            fg=COLORS['text'],
+            bg=COLORS['background']
+        ).pack(side='left')
+        
+        # Summary
+        self.summary_label = tk.Label(
+            header,
+            text="",
+            font=FONTS['body'],
+            fg=COLORS['text_light'],
+            bg=COLORS['background']
+        )
+        self.summary_label.pack(side='right')
+    
+    def _create_filter_section(self):
+        """Create date range and ranking options"""
+        filter_frame = tk.Frame(self, bg=COLORS['card'])
+        filter_frame.configure(highlightbackground=COLORS['border'], highlightthickness=1)
+        filter_frame.pack(fill='x', padx=30, pady=(0, 10))
+        
+        inner = tk.Frame(filter_frame, bg=COLORS['card'])
+        inner.pack(fill='x', padx=20, pady=15)
+        
+        # Date from (default: first day of this month)
+        tk.Label(inner, text="Dari:", font=FONTS['body'], bg=COLORS['card']).pack(side='left', padx=(0, 5))
+        self.date_from_var = tk.StringVar(value=datetime.now().strftime("%Y-%m-01"))
+        tk.Entry(inner, textvariable=self.date_from_var, width=12, font=FONTS['body']).pack(side='left', padx=5)
+        
+        # Date to
+        tk.Label(inner, text="Sampai:", font=FONTS['body'], bg=COLORS['card']).pack(side='left', padx=(20, 5))
+        self.date_to_var = tk.StringVar(value=get_current_date())
+        tk.Entry(inner, textvariable=self.date_to_var, width=12, font=FONTS['body']).pack(side='left', padx=5)
+        
+        # Sort by
+        self.sort_var = tk.StringVar(value=self.SORT_KEYS[0][0])
+        sort_combo = ttk.Combobox(
+            inner,
+            textvariable=self.sort_var,
+            values=[name for name, _ in self.SORT_KEYS],
+            font=FONTS['body'],
+            state='readonly',
+            width=12
+        )
+        sort_combo.pack(side='left', padx=(20, 5))
+        sort_combo.bind('<<ComboboxSelected>>', lambda e: self._load_data())
+        
+        # Limit
+        self.limit_var = tk.StringVar(value=self.LIMITS[0][0])
+        limit_combo = ttk.Combobox(
+            inner,
+            textvariable=self.limit_var,
+            values=[name for name, _ in self.LIMITS],
+            font=FONTS['body'],
+            state='readonly',
+            width=8
+        )
+        limit_combo.pack(side='left', padx=5)
+        limit_combo.bind('<<ComboboxSelected>>', lambda e: self._load_data())
+        
+        # Filter button
+        tk.Button(
+            inner,
+            text="🔍 Tampilkan",
+            font=FONTS['body'],
+            fg=COLORS['white'],
+            bg=COLORS['primary'],
+            relief='flat',
+            cursor='hand2',
+            command=self._load_data
+        ).pack(side='left', padx=20)
+        
+        # Quick filters
+        for text, days in [("7 Hari", 7), ("30 Hari", 30), ("1 Tahun", 365)]:
+            tk.Button(
+                inner,
+                text=text,
+                font=FONTS['small'],
+                fg=COLORS['text'],
+                bg=COLORS['background'],
+                relief='flat',
+                cursor='hand2',
+                command=lambda d=days: self._filter_days(d)
+            ).pack(side='left', padx=5)
+    
+    def _create_product_list(self):
+        """Create product ranking table"""
+        list_frame = tk.Frame(self, bg=COLORS['card'])
+        list_frame.configure(highlightbackground=COLORS['border'], highlightthickness=1)
+        list_frame.pack(fill='both', expand=True, padx=30, pady=(10, 20))
+        
+        columns = ('rank', 'name', 'qty', 'revenue', 'cost', 'profit', 'margin', 'abc')
+        self.product_tree = ttk.Treeview(list_frame, columns=columns, show='headings')
+        
+        self.product_tree.heading('rank', text='#')
+        self.product_tree.heading('name', text='Nama Produk')
+        self.product_tree.heading('qty', text='Unit')
+        self.product_tree.heading('revenue', text='Pendapatan')
+        self.product_tree.heading('cost', text='Modal')
+        self.product_tree.heading('profit', text='Laba')
+        self.product_tree.heading('margin', text='Margin')
+        self.product_tree.heading('abc', text='Kelas')
+        
+        self.product_tree.column('rank', width=40, anchor='center')
+        self.product_tree.column('name', width=220)
+        self.product_tree.column('qty', width=70, anchor='e')
+        self.product_tree.column('revenue', width=120, anchor='e')
+        self.product_tree.column('cost', width=120, anchor='e')
+        self.product_tree.column('profit', width=120, anchor='e')
+        self.product_tree.column('margin', width=70, anchor='e')
+        self.product_tree.column('abc', width=60, anchor='center')
+        
+        self.product_tree.tag_configure('A', foreground=COLORS['success_dark'])
+        self.product_tree.tag_configure('C', foreground=COLORS['text_light'])
+        
+        scrollbar = ttk.Scrollbar(list_frame, orient='vertical', command=self.product_tree.yview)
+        self.product_tree.configure(yscrollcommand=scrollbar.set)
+        
+        self.product_tree.pack(side='left', fill='both', expand=True, padx=10, pady=10)
+        scrollbar.pack(side='right', fill='y', pady=10)
+    
+    def _filter_days(self, days):
+        """Show the last N days"""
+        self.date_from_var.set((datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d"))
+        self.date_to_var.set(get_current_date())
+        self._load_data()
+    
+    def _get_buy_prices(self):
+        """Get current buy price of every product"""
+        return {p['id']: parse_float(p.get('buy_price', 0)) for p in self.product_db.get_all()}
+    
+    def _load_data(self):
+        """Load product ranking for the selected range"""
+        date_from = self.date_from_var.get()
+        date_to = self.date_to_var.get()
+        sort_key = dict(self.SORT_KEYS).get(self.sort_var.get(), 'revenue')
+        limit = dict(self.LIMITS).get(self.limit_var.get(), 10)
+        
+        self.loader.submit(
+            'data',
+            lambda: self._fetch_rows(date_from, date_to),
+            lambda rows: self._show_rows(rows, sort_key, limit)
+        )
+    
+    def _fetch_rows(self, date_from, date_to):
+        """Build classified product rows (runs on a worker thread)"""
+        product_sales = self.transaction_db.get_product_sales(date_from, date_to)
+        rows = build_product_rows(product_sales, self._get_buy_prices())
+        abc_classify(rows)
+        return rows
+    
+    def _show_rows(self, rows, sort_key, limit):
+        """Show ranked product rows"""
+        for item in self.product_tree.get_children():
+            self.product_tree.delete(item)
+        
+        for rank, row in enumerate(top_k(rows, limit, key=sort_key), start=1):
+            self.product_tree.insert('', 'end', values=(
+                rank,
+                row['name'],
+                row['qty'],
+                format_currency(row['revenue']),
+                format_currency(row['cost']),
+                format_currency(row['profit']),
+                f"{row['margin']:.1f}%",
+                row['abc']
+            ), tags=(row['abc'],))
+        
+        total_revenue = sum(row['revenue'] for row in rows)
+        class_counts = {c: sum(1 for row in rows if row['abc'] == c) for c in 'ABC'}
+        self.summary_label.configure(
+            text=f"{len(rows)} produk | Total: {format_currency(total_revenue)} | "
+                 f"A: {class_counts['A']}  B: {class_counts['B']}  C: {class_counts['C']}"
+        )
+    
+    def refresh(self):
+        """Refresh product ranking"""
+        self._load_data()
@@ -0,0 +1,56 @@
+"""
+Sales analytics helpers (product ranking, ABC classification)
+"""
+import heapq
+
+def build_product_rows(product_sales, buy_prices):
+    """Combine per-product sales with buy prices into report rows
+    
+    Args:
+        product_sales: dict product_id -> {product_id, name, qty, revenue}
+        buy_prices: dict product_id -> buy price
+    
+    Returns:
+        List of dicts with cost, profit and margin added
+    """
+    rows = []
+    for product_id, entry in product_sales.items():
+        if entry['qty'] == 0 and entry['revenue'] == 0:
+            continue
+        cost = buy_prices.get(product_id, 0) * entry['qty']
+        profit = entry['revenue'] - cost
+        rows.append({
+            'product_id': product_id,
+            'name': entry['name'],
+            'qty': entry['qty'],
+            'revenue': entry['revenue'],
+            'cost': cost,
+            'profit': profit,
+            'margin': (profit / entry['revenue'] * 100) if entry['revenue'] > 0 else 0
+        })
+    return rows
+
+def abc_classify(rows, key='revenue', a_share=0.80, b_share=0.95):
+    """Set row['abc'] to A, B or C by cumulative share of key
+    
+    Products are ranked by key; those making up the first 80% of the
+    total are class A, up to 95% class B, and the rest class C.
+    """
+    total = sum(max(row[key], 0) for row in rows)
+    cumulative = 0
+    for row in sorted(rows, key=lambda r: r[key], reverse=True):
+        share = cumulative / total if total > 0 else 1
+        if share < a_share:
+            row['abc'] = 'A'
+        elif share < b_share:
+            row['abc'] = 'B'
+        else:
+            row['abc'] = 'C'
+        cumulative += max(row[key], 0)
+    return rows
+
+def top_k(rows, k, key='revenue'):
+    """Get the k rows with the largest key (all rows sorted if k is None)"""
+    if k is None or k >= len(rows):
+        return sorted(rows, key=lambda r: r[key], reverse=True)
+    return heapq.nlargest(k, rows, key=lambda r: r[key])
@@ -0,0 +1,288 @@
+"""
+Compressed columnar archive for closed months of transactions
+
+Layout of an archive file:
+    b'TRXA' | version (1 byte) | codec (1 byte: b'z' zlib, b'x' lzma) | payload
+
+The decompressed payload is a uint32 length + JSON header describing the
+columns, followed by the raw column blobs in header order:
+    - 'date' as uint8 day of month
+    - 'time' as uint32 seconds since midnight
+    - numeric fields as float64 when every value round-trips through float
+    - 'items' split into per-transaction counts and line item columns
+      (dictionary-encoded product_id/barcode/name, float64 price/subtotal,
+      int32 qty) when every items JSON round-trips exactly
+    - everything else dictionary-encoded (id, cashier, ...)
+Reading returns rows as CSV-style string dicts, identical to the originals.
+"""
+import json
+import lzma
+import os
+import struct
+import sys
+import threading
+import zlib
+from array import array
+from collections import OrderedDict
+
+MAGIC = b'TRXA'
+VERSION = 1
+CODECS = {
+    'lzma': (b'x', lambda data: lzma.compress(data, preset=6), lzma.decompress),
+    'zlib': (b'z', lambda data: zlib.compress(data, 9), zlib.decompress),
+}
+NUMERIC_FIELDS = ('subtotal', 'discount', 'total', 'payment', 'change')
+ITEM_KEYS = ('product_id', 'barcode', 'name', 'price', 'qty', 'subtotal')
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()  # read from loader, export, reprint and backup threads
+_CACHE_SIZE = 4
+
+
+def _to_bytes(values, typecode):
+    """Pack values into little-endian bytes"""
+    arr = array(typecode, values)
+    if sys.byteorder == 'big':
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _from_bytes(data, typecode):
+    """Unpack little-endian bytes into an array"""
+    arr = array(typecode)
+    arr.frombytes(data)
+    if sys.byteorder == 'big':
+        arr.byteswap()
+    return arr
+
+
+def _index_typecode(size):
+    """Smallest unsigned typecode that can index size entries"""
+    if size <= 0xFF:
+        return 'B'
+    if size <= 0xFFFF:
+        return 'H'
+    return 'I'
+
+
+class _ColumnWriter:
+    """Collects encoded column blobs and their header descriptions"""
+    
+    def __init__(self):
+        self.columns = []
+        self.blobs = []
+    
+    def add(self, name, kind, blob, **extra):
+        column = {'name': name, 'type': kind, 'length': len(blob)}
+        column.update(extra)
+        self.columns.append(column)
+        self.blobs.append(blob)
+    
+    def add_fixed(self, name, values, typecode):
+        self.add(name, 'fixed', _to_bytes(values, typecode), typecode=typecode)
+    
+    def add_dict(self, name, values):
+        """Dictionary-encode a string column"""
+        lookup = {}
+        indexes = []
+        for value in values:
+            if '\x00' in value:
+                raise ValueError(f"Nilai kolom {name} mengandung karakter NUL")
+            index = lookup.get(value)
+            if index is None:
+                index = lookup[value] = len(lookup)
+            indexes.append(index)
+        words = '\x00'.join(lookup).encode('utf-8')
+        typecode = _index_typecode(len(lookup))
+        self.add(name + '.dict', 'words', words, count=len(lookup))
+        self.add_fixed(name, indexes, typecode)
+
+
+def _is_float_column(values):
+    """True if every value survives str -> float -> str unchanged"""
+    for value in values:
+        try:
+            if repr(float(value)) != value:
+                return False
+        except ValueError:
+            return False
+    return True
+
+
+def _split_time(value):
+    """Convert HH:MM:SS to seconds, or None if it would not round-trip"""
+    try:
+        h, m, s = (int(part) for part in value.split(':'))
+    except ValueError:
+        return None
+    seconds = h * 3600 + m * 60 + s
+    if f"{h:02d}:{m:02d}:{s:02d}" != value or not 0 <= seconds < 86400:
+        return None
+    return seconds
+
+
+def _encode_items(rows):
+    """Split items JSON into columns, or None if any row won't round-trip"""
+    counts = []
+    columns = {key: [] for key in ITEM_KEYS}
+    for row in rows:
+        try:
+            items = json.loads(row['items'])
+        except ValueError:
+            return None
+        if not isinstance(items, list):
+            return None
+        for item in items:
+            if not isinstance(item, dict) or tuple(item) != ITEM_KEYS:
+                return None
+            if not (isinstance(item['price'], float) and isinstance(item['subtotal'], float)
+                    and isinstance(item['qty'], int)
+                    and all(isinstance(item[k], str) for k in ('product_id', 'barcode', 'name'))):
+                return None
+            for key in ITEM_KEYS:
+                columns[key].append(item[key])
+        if json.dumps(items, ensure_ascii=False) != row['items']:
+            return None
+        counts.append(len(items))
+    return counts, columns
+
+
+def write_archive(path, month, fieldnames, rows, codec='lzma'):
+    """Write rows of one month to a compressed columnar archive
+    
+    Returns:
+        Size of the written file in bytes
+    """
+    writer = _ColumnWriter()
+    for field in fieldnames:
+        values = [row.get(field, '') or '' for row in rows]
+        
+        if field == 'date' and all(v[:8] == month + '-' and v[8:].isdigit() and len(v) == 10 for v in values):
+            writer.add_fixed(field, [int(v[8:]) for v in values], 'B')
+            continue
+        
+        if field == 'time':
+            seconds = [_split_time(v) for v in values]
+            if None not in seconds:
+                writer.add_fixed(field, seconds, 'I')
+                continue
+        
+        if field in NUMERIC_FIELDS and _is_float_column(values):
+            writer.add_fixed(field, [float(v) for v in values], 'd')
+            continue
+        
+        if field == 'items':
+            encoded = _encode_items(rows)
+            if encoded is not None:
+                counts, columns = encoded
+                writer.add_fixed('items.count', counts, 'I')
+                for key in ('product_id', 'barcode', 'name'):
+                    writer.add_dict('items.' + key, columns[key])
+                writer.add_fixed('items.price', columns['price'], 'd')
+                writer.add_fixed('items.qty', columns['qty'], 'i')
+                writer.add_fixed('items.subtotal', columns['subtotal'], 'd')
+                continue
+        
+        writer.add_dict(field, values)
+    
+    header = json.dumps({
+        'month': month,
+        'fields': list(fieldnames),
+        'count': len(rows),
+        'columns': writer.columns
+    }).encode('utf-8')
+    payload = struct.pack('<I', len(header)) + header + b''.join(writer.blobs)
+    
+    codec_id, compress, _ = CODECS[codec]
+    data = MAGIC + bytes([VERSION]) + codec_id + compress(payload)
+    with open(path, 'wb') as f:
+        f.write(data)
+    return len(data)
+
+
+def _decode(path):
+    """Decode an archive file into a list of row dicts"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if data[:4] != MAGIC or data[4] != VERSION:
+        raise ValueError(f"Bukan file arsip transaksi: {path}")
+    
+    decompress = None
+    for codec_id, _, decompress_fn in CODECS.values():
+        if data[5:6] == codec_id:
+            decompress = decompress_fn
+    if decompress is None:
+        raise ValueError(f"Kompresi arsip tidak dikenal: {path}")
+    
+    payload = decompress(data[6:])
+    header_length = struct.unpack_from('<I', payload)[0]
+    header = json.loads(payload[4:4 + header_length].decode('utf-8'))
+    
+    # Slice column blobs
+    columns = {}
+    position = 4 + header_length
+    for column in header['columns']:
+        blob = payload[position:position + column['length']]
+        position += column['length']
+        if column['type'] == 'words':
+            columns[column['name']] = blob.decode('utf-8').split('\x00') if column['count'] else []
+        else:
+            columns[column['name']] = _from_bytes(blob, column['typecode'])
+    
+    def values_of(name):
+        if name + '.dict' in columns:
+            words = columns[name + '.dict']
+            return [words[i] for i in columns[name]]
+        return columns[name]
+    
+    month = header['month']
+    count = header['count']
+    rows = [{} for _ in range(count)]
+    for field in header['fields']:
+        if field == 'items' and 'items.count' in columns:
+            item_values = {key: values_of('items.' + key) for key in ITEM_KEYS}
+            position = 0
+            for row, n in zip(rows, columns['items.count']):
+                items = []
+                for i in range(position, position + n):
+                    items.append({key: item_values[key][i] for key in ITEM_KEYS})
+                position += n
+                row['items'] = json.dumps(items, ensure_ascii=False)
+            continue
+        
+        values = values_of(field)
+        column = next(c for c in header['columns'] if c['name'] == field)
+        if field == 'date' and column.get('typecode') == 'B':
+            values = [f"{month}-{day:02d}" for day in values]
+        elif field == 'time' and column.get('typecode') == 'I':
+            values = [f"{s // 3600:02d}:{s % 3600 // 60:02d}:{s % 60:02d}" for s in values]
+        elif column.get('typecode') == 'd':
+            values = [repr(v) for v in values]
+        for row, value in zip(rows, values):
+            row[field] = value
+    return rows
+
+
+def read_archive(path, copy=True):
+    """Read archived rows (cached for the most recently used months)
+    
+    With copy=False the cached row dicts are returned; callers must not
+    modify them.
+    """
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    with _cache_lock:
+        rows = _cache.get(key)
+        if rows is not None:
+            _cache.move_to_end(key)
+    if rows is None:
+        # Decoded without the lock; two threads may decode the same month once
+        rows = _decode(path)
+        with _cache_lock:
+            _cache[key] = rows
+            while len(_cache) > _CACHE_SIZE:
+                _cache.popitem(last=False)
+    if not copy:
+        return rows
+    # Callers may annotate rows; hand out copies
+    return [dict(row) for row in rows]
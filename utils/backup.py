@@ -0,0 +1,305 @@
+"""
+Backup - Incremental, deduplicated backups of the database folder
+
+A backup repository holds compressed chunks named by their SHA-256 and one
+manifest per snapshot listing, for every file, its chunks in order. A
+chunk already in the repository is never stored again.
+
+Files are cut into CHUNK_SIZE pieces. Files in APPEND_ONLY are only ever
+appended to in place (every other change replaces the file). Like the
+rollups, such a file that is still the same file (device and inode),
+grew, and whose bytes just before the previous end are unchanged is taken
+as appended to: the full chunks of the previous snapshot are reused
+without reading them and only the tail is read. Files with the same
+identity, size and mtime are not read at all. Anything else is hashed
+again in full, and only the chunks that differ are stored.
+
+Backups run while the till keeps selling. Every database write holds
+utils.locks.write_lock, so capture() takes the size and identity of all
+files at one point between writes, holding the lock only for a few stat()
+calls. The files are then read up to the captured sizes without the lock: appends
+after that point are simply not part of the snapshot. Only
+transactions.csv is append-only; products.csv and edited transactions are
+rewritten into a new file. A file replaced in the meantime (edit, delete,
+month close) is detected by its inode and the snapshot is taken again.
+Changes spanning files (a month close replaces its archive and rewrites
+the CSV) happen under one hold of the lock. Each read opens the file only
+briefly, so it never stands in the way of such a replace on Windows.
+
+Layout:
+    <repo>/chunks/ab/abcdef....z     zlib-compressed chunk
+    <repo>/snapshots/<name>.json     manifest (written last)
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from config import DATABASE_DIR, store_config
+from utils.locks import write_lock
+
+REPO_NAME = "kasir_backup"
+CHUNK_SIZE = 1024 * 1024
+TAIL_BYTES = 32  # bytes before the previous end compared to detect appends
+# Files changed in place only by appends; an edit of any other file may
+# keep its size and the bytes at its end
+APPEND_ONLY = {'transactions.csv'}
+COMPRESS_LEVEL = 6
+CAPTURE_ATTEMPTS = 3  # snapshots tried when files are replaced while reading
+
+# One backup, restore or prune on a repository at a time
+_repository_lock = threading.Lock()
+
+
+class FileChanged(Exception):
+    """A file was replaced or shrank after its snapshot was captured"""
+
+
+def backup_sources():
+    """Get (name in backup, path) of every file that is backed up"""
+    sources = []
+    for filename in sorted(os.listdir(DATABASE_DIR)):
+        if filename.endswith('.csv'):
+            sources.append((filename, os.path.join(DATABASE_DIR, filename)))
+    
+    # Archives of closed months
+    archive_dir = os.path.join(DATABASE_DIR, "archive")
+    if os.path.isdir(archive_dir):
+        for filename in sorted(os.listdir(archive_dir)):
+            if filename.endswith('.trxa'):
+                sources.append((f"archive/{filename}", os.path.join(archive_dir, filename)))
+    
+    if os.path.exists(store_config.path):
+        sources.append(("store_config.json", store_config.path))
+    return sources
+
+
+def capture(sources=None):
+    """Get (name, path, os.stat_result) of every source at one point between writes"""
+    with write_lock:
+        sources = backup_sources() if sources is None else sources
+        captured = []
+        for name, path in sources:
+            try:
+                captured.append((name, path, os.stat(path)))
+            except FileNotFoundError:
+                continue
+    return captured
+
+
+def _read_at(path, stat, offset, length):
+    """Read bytes of the captured file, opening it only for this read"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_ino != stat.st_ino:
+            raise FileChanged(path)
+        f.seek(offset)
+        data = f.read(length)
+    if len(data) != length:
+        raise FileChanged(path)
+    return data
+
+
+def _tail(path, stat, offset):
+    """Hex of the TAIL_BYTES before offset"""
+    start = max(0, offset - TAIL_BYTES)
+    return _read_at(path, stat, start, offset - start).hex()
+
+
+class BackupRepository:
+    """Chunk store plus snapshot manifests in one folder"""
+    
+    def __init__(self, root):
+        self.root = root
+        self.chunks_dir = os.path.join(root, "chunks")
+        self.snapshots_dir = os.path.join(root, "snapshots")
+    
+    @staticmethod
+    def is_repository(folder):
+        return os.path.isdir(os.path.join(folder, "snapshots"))
+    
+    @classmethod
+    def locate(cls, folder):
+        """Get the repository for a chosen folder (the folder itself, or REPO_NAME inside it)"""
+        if cls.is_repository(folder):
+            return cls(folder)
+        return cls(os.path.join(folder, REPO_NAME))
+    
+    # Snapshots
+    
+    def snapshots(self):
+        """Get snapshot names, oldest first"""
+        try:
+            names = os.listdir(self.snapshots_dir)
+        except OSError:
+            return []
+        return sorted(name[:-5] for name in names if name.endswith('.json'))
+    
+    def load_manifest(self, name):
+        with open(os.path.join(self.snapshots_dir, f"{name}.json"), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    def _save_manifest(self, name, manifest):
+        os.makedirs(self.snapshots_dir, exist_ok=True)
+        path = os.path.join(self.snapshots_dir, f"{name}.json")
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, path)
+    
+    # Chunks
+    
+    def _chunk_path(self, digest):
+        return os.path.join(self.chunks_dir, digest[:2], f"{digest}.z")
+    
+    def _put_chunk(self, data):
+        """Store data unless a chunk with the same hash exists
+        
+        Returns:
+            (digest, bytes written)
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._chunk_path(digest)
+        if os.path.exists(path):
+            return digest, 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        packed = zlib.compress(data, COMPRESS_LEVEL)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(packed)
+        os.replace(tmp_path, path)
+        return digest, len(packed)
+    
+    def _get_chunk(self, digest):
+        with open(self._chunk_path(digest), 'rb') as f:
+            data = zlib.decompress(f.read())
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise ValueError(f"Chunk backup rusak: {digest[:12]}")
+        return data
+    
+    # Backup / restore
+    
+    def _backup_file(self, name, path, stat, previous, stats, throttle=None):
+        """Chunk one captured file, reusing what the previous snapshot already has"""
+        identity = [stat.st_dev, stat.st_ino]
+        same_file = previous is not None and previous.get('identity') == identity
+        if same_file and previous['size'] == stat.st_size and previous['mtime_ns'] == stat.st_mtime_ns:
+            return previous
+        
+        size = stat.st_size
+        chunks = []
+        position = 0
+        if (same_file and name in APPEND_ONLY and size >= previous['size']
+                and _tail(path, stat, previous['size']) == previous['tail']):
+            # Appended since the previous snapshot: keep its full chunks
+            for digest, length in previous['chunks']:
+                if length != CHUNK_SIZE:
+                    break
+                chunks.append([digest, length])
+                position += length
+        
+        while position < size:
+            data = _read_at(path, stat, position, min(CHUNK_SIZE, size - position))
+            digest, written = self._put_chunk(data)
+            chunks.append([digest, len(data)])
+            position += len(data)
+            stats['bytes_read'] += len(data)
+            stats['bytes_stored'] += written
+            if throttle:
+                throttle(len(data))
+        
+        return {
+            'size': size,
+            'mtime_ns': stat.st_mtime_ns,
+            'identity': identity,
+            'tail': _tail(path, stat, size),
+            'chunks': chunks
+        }
+    
+    def backup(self, sources=None, on_progress=None, throttle=None):
+        """Take a consistent snapshot of the sources
+        
+        Args:
+            sources: List of (name, path); defaults to backup_sources()
+            on_progress: Optional callback(files_done, files_total)
+            throttle: Optional callback(bytes) after every chunk read, e.g.
+                to sleep between chunks
+        
+        Returns:
+            dict with snapshot, files, bytes_total, bytes_read, bytes_stored
+        """
+        with _repository_lock:
+            names = self.snapshots()
+            known = self.load_manifest(names[-1])['files'] if names else {}
+            
+            name = time.strftime("%Y%m%d_%H%M%S")
+            if names and name <= names[-1]:
+                name = f"{names[-1]}_1"
+            stats = {'snapshot': name, 'files': 0, 'bytes_total': 0, 'bytes_read': 0, 'bytes_stored': 0}
+            
+            for attempt in range(CAPTURE_ATTEMPTS):
+                captured = capture(sources)
+                files = {}
+                try:
+                    for done, (file_name, path, stat) in enumerate(captured, start=1):
+                        files[file_name] = self._backup_file(file_name, path, stat, known.get(file_name), stats, throttle)
+                        if on_progress:
+                            on_progress(done, len(captured))
+                    break
+                except FileChanged:
+                    if attempt == CAPTURE_ATTEMPTS - 1:
+                        raise
+                    # Again from a new capture; files read so far are reused
+                    known = {**known, **files}
+            
+            stats['files'] = len(files)
+            stats['bytes_total'] = sum(entry['size'] for entry in files.values())
+            # The manifest goes last: an interrupted backup leaves no snapshot
+            self._save_manifest(name, {'created': time.time(), 'files': files})
+        return stats
+    
+    def prune(self, keep):
+        """Delete all but the newest keep snapshots, and the chunks only they used
+        
+        Returns:
+            (snapshots deleted, bytes freed)
+        """
+        keep = max(1, keep)
+        with _repository_lock:
+            names = self.snapshots()
+            old = names[:-keep]
+            if not old:
+                return 0, 0
+            # Manifests first: an interrupted prune only leaves unused chunks
+            for name in old:
+                os.remove(os.path.join(self.snapshots_dir, f"{name}.json"))
+            
+            used = set()
+            for name in names[len(old):]:
+                for entry in self.load_manifest(name)['files'].values():
+                    used.update(digest for digest, length in entry['chunks'])
+            
+            freed = 0
+            for dirpath, dirnames, filenames in os.walk(self.chunks_dir):
+                for filename in filenames:
+                    if filename.endswith('.z') and filename[:-2] in used:
+                        continue
+                    # Unused chunk, or a .tmp left by an interrupted backup
+                    path = os.path.join(dirpath, filename)
+                    freed += os.path.getsize(path)
+                    os.remove(path)
+        return len(old), freed
+    
+    def restore(self, name, dest_dir):
+        """Rebuild the files of a snapshot under dest_dir (same layout as a folder backup)"""
+        with _repository_lock:
+            manifest = self.load_manifest(name)
+            for file_name, entry in manifest['files'].items():
+                path = os.path.join(dest_dir, *file_name.split('/'))
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = path + '.tmp'
+                with open(tmp_path, 'wb') as f:
+                    for digest, length in entry['chunks']:
+                        f.write(self._get_chunk(digest))
+                os.replace(tmp_path, path)
+        return list(manifest['files'])
@@ -0,0 +1,170 @@
+"""
+Backup Scheduler - Automatic snapshots of the database in the background
+
+With "backup_auto" on, a daemon thread takes a snapshot into the
+repository in "backup_dir" every "backup_interval_hours" and then keeps
+only the newest "backup_keep" snapshots. The next run is counted from the
+newest snapshot in the repository, so a manual backup postpones it.
+
+The thread runs at background priority (lower CPU and disk I/O priority
+on Windows and Linux) and sleeps between chunks to read at most
+MAX_READ_RATE bytes per second. Writes never wait for it: the snapshot is
+captured between writes (see utils.backup) in a few stat() calls.
+"""
+import os
+import sys
+import threading
+import time
+from config import store_config
+from utils.backup import BackupRepository
+
+DEFAULT_INTERVAL_HOURS = 24
+DEFAULT_KEEP = 14
+MAX_READ_RATE = 4 * 1024 * 1024  # bytes per second
+RETRY_DELAY = 15 * 60  # seconds before trying again after a failed backup
+START_DELAY = 60  # seconds after startup before the first check
+CONFIG_KEYS = {'backup_auto', 'backup_dir', 'backup_interval_hours', 'backup_keep'}
+
+THREAD_MODE_BACKGROUND_BEGIN = 0x00010000
+LOWEST_NICE = 19
+
+
+class BackupCancelled(Exception):
+    """Raised inside a running backup when the scheduler stops"""
+
+
+def _lower_thread_priority():
+    """Run the calling thread at background CPU and I/O priority (best effort)"""
+    try:
+        if os.name == 'nt':
+            import ctypes
+            kernel32 = ctypes.windll.kernel32
+            kernel32.SetThreadPriority(kernel32.GetCurrentThread(), THREAD_MODE_BACKGROUND_BEGIN)
+        elif sys.platform.startswith('linux'):
+            # Per-thread nice; the I/O scheduler follows it unless an I/O class is set
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), LOWEST_NICE)
+    except (OSError, AttributeError) as e:
+        print(f"Error lowering backup priority: {e}")
+
+
+def _setting(key, default):
+    """Positive int setting, or default if missing or invalid"""
+    try:
+        value = int(store_config.get(key, default))
+    except (TypeError, ValueError):
+        return default
+    return value if value > 0 else default
+
+
+class BackupScheduler:
+    """Daemon thread taking scheduled backups"""
+    
+    def __init__(self):
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._failed_at = 0.0
+        self.running = False
+        self.last_result = None  # stats of the last scheduled backup
+        self.last_error = ''
+    
+    # Settings
+    
+    def enabled(self):
+        return bool(store_config.get('backup_auto')) and bool(store_config.get('backup_dir'))
+    
+    def interval(self):
+        return _setting('backup_interval_hours', DEFAULT_INTERVAL_HOURS) * 3600
+    
+    def keep(self):
+        return _setting('backup_keep', DEFAULT_KEEP)
+    
+    def repository(self):
+        return BackupRepository.locate(store_config.get('backup_dir'))
+    
+    def next_due(self):
+        """Get the time of the next backup, or None when automatic backup is off"""
+        if not self.enabled():
+            return None
+        repository = self.repository()
+        names = repository.snapshots()
+        try:
+            last = repository.load_manifest(names[-1])['created'] if names else 0.0
+        except (OSError, ValueError, KeyError):
+            last = 0.0
+        return max(last + self.interval(), self._failed_at + RETRY_DELAY)
+    
+    # Thread
+    
+    def start(self):
+        """Start the thread (once); it sleeps while automatic backup is off"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        store_config.add_listener(self._on_config_changed)
+        self._thread = threading.Thread(target=self._run, name="backup-scheduler", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Stop the thread, cancelling a backup in progress (no snapshot is left)"""
+        store_config.remove_listener(self._on_config_changed)
+        self._stopped.set()
+        self._wakeup.set()
+    
+    def _on_config_changed(self, config, changed):
+        if changed & CONFIG_KEYS:
+            self._failed_at = 0.0
+            self._wakeup.set()
+    
+    def _run(self):
+        _lower_thread_priority()
+        if self._stopped.wait(START_DELAY):
+            return
+        while not self._stopped.is_set():
+            # Clear before looking, so a settings change after this point is not missed
+            self._wakeup.clear()
+            try:
+                due = self.next_due()
+            except OSError as e:
+                print(f"Error checking backups: {e}")
+                due = time.time() + RETRY_DELAY
+            if due is None or due > time.time():
+                self._wakeup.wait(timeout=None if due is None else due - time.time())
+                continue
+            self._backup()
+    
+    def _backup(self):
+        repository = self.repository()
+        self.running = True
+        try:
+            stats = repository.backup(throttle=self._throttle)
+            stats['pruned'], stats['bytes_freed'] = repository.prune(self.keep())
+        except BackupCancelled:
+            return
+        except Exception as e:
+            print(f"Error in scheduled backup: {e}")
+            self.last_error = str(e)
+            self._failed_at = time.time()
+            return
+        finally:
+            self.running = False
+        self.last_result = stats
+        self.last_error = ''
+    
+    def _throttle(self, nbytes):
+        """Sleep after a chunk so reading stays under MAX_READ_RATE"""
+        if self._stopped.wait(nbytes / MAX_READ_RATE):
+            raise BackupCancelled()
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_backup_scheduler():
+    """Get the scheduler shared by the whole app (not started until start())"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = BackupScheduler()
+        return _scheduler
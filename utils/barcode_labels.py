@@ -0,0 +1,464 @@
+"""
+Barcode Labels - Code128 / EAN-13 label sheets as PNG or PDF
+
+Labels are laid out on sheets (A4 grids or single roll labels) and drawn
+as 1-bit pages with PIL. Pages are independent, so they are rendered on a
+process pool; every worker keeps its fonts and a cache of rendered
+characters, so text is drawn by pasting cached glyph bitmaps. PNG pages
+are written by the workers; PDF pages come back zlib-compressed and are
+streamed into one file in page order, so memory use does not grow with
+the number of products.
+
+This module must not import config or Tk: pool workers import it on
+their own.
+"""
+import multiprocessing
+import os
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+MIN_PARALLEL_PAGES = 3  # smaller jobs render in-process (no pool start-up)
+
+# Code 128 bar/space widths for values 0..106 (106 = stop)
+CODE128_PATTERNS = [
+    "212222", "222122", "222221", "121223", "121322", "131222", "122213", "122312", "132212", "221213",
+    "221312", "231212", "112232", "122132", "122231", "113222", "123122", "123221", "223211", "221132",
+    "221231", "213212", "223112", "312131", "311222", "321122", "321221", "312212", "322112", "322211",
+    "212123", "212321", "232121", "111323", "131123", "131321", "112313", "132113", "132311", "211313",
+    "231113", "231311", "112133", "112331", "132131", "113123", "113321", "133121", "313121", "211331",
+    "231131", "213113", "213311", "213131", "311123", "311321", "331121", "312113", "312311", "332111",
+    "314111", "221411", "431111", "111224", "111422", "121124", "121421", "141122", "141221", "112214",
+    "112412", "122114", "122411", "142112", "142211", "241211", "221114", "413111", "241112", "134111",
+    "111242", "121142", "121241", "114212", "124112", "124211", "411212", "421112", "421211", "212141",
+    "214121", "412121", "111143", "111341", "131141", "114113", "114311", "411113", "411311", "113141",
+    "114131", "311141", "411131", "211412", "211214", "211232", "2331112",
+]
+CODE_B, CODE_C = 100, 99
+START_B, START_C, STOP = 104, 105, 106
+
+# EAN-13 digit codes (R codes are the L codes inverted)
+EAN_L = ["0001101", "0011001", "0010011", "0111101", "0100011", "0110001", "0101111", "0111011", "0110111", "0001011"]
+EAN_G = ["0100111", "0110011", "0011011", "0100001", "0011101", "0111001", "0000101", "0010001", "0001001", "0010111"]
+EAN_PARITY = ["LLLLLL", "LLGLGG", "LLGGLG", "LLGGGL", "LGLLGG", "LGGLLG", "LGGGLL", "LGLGLG", "LGLGGL", "LGGLGL"]
+
+QUIET_MODULES = 10
+
+
+class LabelsCancelled(Exception):
+    """Raised when label rendering was cancelled"""
+
+
+# Barcode encoding
+
+def _code128_values(text):
+    """Symbol values for text (code B, code C for runs of digits), without check/stop"""
+    values = []
+    mode = None
+    i = 0
+    while i < len(text):
+        run = 0
+        while i + run < len(text) and text[i + run].isdigit():
+            run += 1
+        # Digit pairs pay off for 4+ digits at either end, 6+ in the middle
+        use_c = run >= 4 and (i == 0 or i + run == len(text) or run >= 6)
+        
+        if use_c and run % 2:
+            use_c = False
+            run = 1  # one digit in code B, the even rest in code C next round
+        if use_c:
+            if mode != 'C':
+                values.append(START_C if mode is None else CODE_C)
+                mode = 'C'
+            for j in range(i, i + run, 2):
+                values.append(int(text[j:j + 2]))
+            i += run
+        else:
+            ch = text[i]
+            if not 32 <= ord(ch) <= 127:
+                raise ValueError(f"Karakter tidak didukung Code128: {ch!r}")
+            if mode != 'B':
+                values.append(START_B if mode is None else CODE_B)
+                mode = 'B'
+            values.append(ord(ch) - 32)
+            i += 1
+    return values
+
+
+def encode_code128(text):
+    """Get the module string ('1' = bar) of a Code 128 symbol"""
+    if not text:
+        raise ValueError("Barcode kosong")
+    values = _code128_values(text)
+    check = (values[0] + sum(weight * value for weight, value in enumerate(values[1:], start=1))) % 103
+    modules = []
+    for value in values + [check, STOP]:
+        for k, width in enumerate(CODE128_PATTERNS[value]):
+            modules.append(('1' if k % 2 == 0 else '0') * int(width))
+    return "".join(modules)
+
+
+def ean13_check_digit(digits12):
+    total = sum(int(d) * (3 if k % 2 else 1) for k, d in enumerate(digits12))
+    return str((10 - total % 10) % 10)
+
+
+def encode_ean13(code):
+    """Get the module string of an EAN-13 symbol (12 digits get a check digit)"""
+    if len(code) == 12:
+        code += ean13_check_digit(code)
+    if len(code) != 13 or not code.isdigit() or ean13_check_digit(code[:12]) != code[12]:
+        raise ValueError(f"Bukan EAN-13 yang valid: {code}")
+    parity = EAN_PARITY[int(code[0])]
+    left = "".join((EAN_L if p == 'L' else EAN_G)[int(d)] for p, d in zip(parity, code[1:7]))
+    right = "".join(EAN_L[int(d)].translate(str.maketrans('01', '10')) for d in code[7:])
+    return "101" + left + "01010" + right + "101"
+
+
+def barcode_modules(code):
+    """Pick the symbology for a product barcode
+    
+    Returns:
+        (module string, symbology) - EAN-13 for valid 13-digit codes, else Code128
+    """
+    if len(code) == 13 and code.isdigit() and ean13_check_digit(code[:12]) == code[12]:
+        return encode_ean13(code), 'ean13'
+    return encode_code128(code), 'code128'
+
+
+# Sheets
+
+class LabelSheet:
+    """Page size and label grid (millimetres), rendered at dpi"""
+    
+    def __init__(self, title, page_mm, columns, rows, margin_mm=(0, 0), gap_mm=(0, 0), dpi=300):
+        self.title = title
+        self.page_mm = page_mm
+        self.columns = columns
+        self.rows = rows
+        self.margin_mm = margin_mm
+        self.gap_mm = gap_mm
+        self.dpi = dpi
+    
+    @property
+    def per_page(self):
+        return self.columns * self.rows
+    
+    def px(self, mm):
+        return int(round(mm * self.dpi / 25.4))
+    
+    @property
+    def page_px(self):
+        return self.px(self.page_mm[0]), self.px(self.page_mm[1])
+    
+    @property
+    def label_mm(self):
+        width = (self.page_mm[0] - 2 * self.margin_mm[0] - (self.columns - 1) * self.gap_mm[0]) / self.columns
+        height = (self.page_mm[1] - 2 * self.margin_mm[1] - (self.rows - 1) * self.gap_mm[1]) / self.rows
+        return width, height
+    
+    def label_box(self, slot):
+        """Pixel box (left, top, right, bottom) of a label slot on the page"""
+        column, row = slot % self.columns, slot // self.columns
+        width, height = self.label_mm
+        left = self.margin_mm[0] + column * (width + self.gap_mm[0])
+        top = self.margin_mm[1] + row * (height + self.gap_mm[1])
+        return self.px(left), self.px(top), self.px(left + width), self.px(top + height)
+
+
+SHEETS = {
+    'a4_3x8': LabelSheet("A4 - 24 label (70 x 36 mm)", (210, 297), 3, 8, margin_mm=(0, 4.5)),
+    'a4_4x10': LabelSheet("A4 - 40 label (48 x 27 mm)", (210, 297), 4, 10, margin_mm=(8, 13.5), gap_mm=(0, 0)),
+    'roll_50x30': LabelSheet("Roll - 1 label (50 x 30 mm)", (50, 30), 1, 1, dpi=203),
+}
+DEFAULT_SHEET = 'a4_3x8'
+
+
+# Drawing (runs in pool workers)
+
+FONT_FILES = {
+    False: ["arial.ttf", "DejaVuSans.ttf", "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"],
+    True: ["arialbd.ttf", "DejaVuSans-Bold.ttf", "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"],
+}
+
+_fonts = {}  # (size, bold) -> FreeTypeFont
+_glyphs = {}  # (size, bold, char) -> (mask, left, top, advance)
+
+
+def _font(size, bold=False):
+    font = _fonts.get((size, bold))
+    if font is None:
+        from PIL import ImageFont
+        for name in FONT_FILES[bold]:
+            try:
+                font = ImageFont.truetype(name, size)
+                break
+            except OSError:
+                continue
+        else:
+            try:
+                font = ImageFont.load_default(size)
+            except TypeError:
+                # Pillow < 10.1: only the fixed-size bitmap font
+                font = ImageFont.load_default()
+        _fonts[(size, bold)] = font
+    return font
+
+
+def _glyph(size, bold, ch):
+    """Rendered character bitmap, drawn once per process"""
+    key = (size, bold, ch)
+    glyph = _glyphs.get(key)
+    if glyph is None:
+        from PIL import Image, ImageDraw
+        font = _font(size, bold)
+        left, top, right, bottom = font.getbbox(ch)
+        mask = Image.new('1', (max(1, right - left), max(1, bottom - top)), 0)
+        ImageDraw.Draw(mask).text((-left, -top), ch, font=font, fill=1)
+        glyph = _glyphs[key] = (mask, left, top, font.getlength(ch))
+    return glyph
+
+
+def _text_width(text, size, bold=False):
+    return sum(_glyph(size, bold, ch)[3] for ch in text)
+
+
+def _fit(text, width, size, bold=False):
+    """Cut text with an ellipsis to fit width"""
+    if _text_width(text, size, bold) <= width:
+        return text
+    while text and _text_width(text + "…", size, bold) > width:
+        text = text[:-1]
+    return text + "…"
+
+
+def _draw_text(page, x, y, text, size, bold=False):
+    """Paste cached glyphs (black) with the text's top-left at (x, y)"""
+    for ch in text:
+        mask, left, top, advance = _glyph(size, bold, ch)
+        if not ch.isspace():
+            page.paste(0, (int(x + left), int(y + top)), mask)
+        x += advance
+
+
+def _draw_centered(page, box, y, text, size, bold=False):
+    left, right = box[0], box[2]
+    text = _fit(text, right - left, size, bold)
+    x = left + (right - left - _text_width(text, size, bold)) / 2
+    _draw_text(page, x, y, text, size, bold)
+
+
+def _draw_bars(page, modules, left, top, width, height):
+    """Draw a module string centered in the box, as wide as whole pixels allow"""
+    from PIL import Image
+    module_px = width // (len(modules) + 2 * QUIET_MODULES)
+    if module_px < 1:
+        raise ValueError("Barcode terlalu panjang untuk label")
+    row = b"".join((b"\xff" if m == '1' else b"\x00") * module_px for m in modules)
+    mask = Image.frombytes('L', (len(row), 1), row).resize((len(row), height), Image.Resampling.NEAREST)
+    page.paste(0, (left + (width - len(row)) // 2, top), mask)
+
+
+def _draw_label(page, box, label, sheet):
+    """Name, price, bars and the human-readable code inside one label box"""
+    name, code, price = label
+    pad = sheet.px(2)
+    inner = (box[0] + pad, box[1] + pad, box[2] - pad, box[3] - pad)
+    height = inner[3] - inner[1]
+    name_size = max(8, height // 9)
+    price_size = max(8, height // 8)
+    code_size = max(8, height // 11)
+    
+    y = inner[1]
+    _draw_centered(page, inner, y, name, name_size)
+    y += int(name_size * 1.2)
+    if price:
+        _draw_centered(page, inner, y, price, price_size, bold=True)
+        y += int(price_size * 1.25)
+    
+    bars_height = inner[3] - y - int(code_size * 1.3)
+    if not code or bars_height <= 0:
+        return
+    try:
+        modules, symbology = barcode_modules(code)
+        _draw_bars(page, modules, inner[0], y, inner[2] - inner[0], bars_height)
+    except ValueError as e:
+        _draw_centered(page, inner, y, str(e), code_size)
+    _draw_centered(page, inner, inner[3] - code_size, code, code_size)
+
+
+def render_page(labels, sheet):
+    """Draw one page of labels as a 1-bit PIL image (1 = white)"""
+    from PIL import Image
+    page = Image.new('1', sheet.page_px, 1)
+    for slot, label in enumerate(labels):
+        _draw_label(page, sheet.label_box(slot), label, sheet)
+    return page
+
+
+def _render_job(job):
+    """Worker: render one page, then save the PNG or return compressed PDF data"""
+    labels, sheet, png_path = job
+    page = render_page(labels, sheet)
+    if png_path:
+        tmp_path = png_path + '.tmp'
+        page.save(tmp_path, format='PNG', dpi=(sheet.dpi, sheet.dpi))
+        os.replace(tmp_path, png_path)
+        return png_path
+    # PDF DeviceGray 1-bit uses 1 = white as well, so the bytes go in as they are
+    return zlib.compress(page.tobytes(), 6)
+
+
+# PDF output
+
+class _PdfWriter:
+    """Minimal PDF: one full-page 1-bit image per page, written as pages arrive"""
+    
+    def __init__(self, path, sheet):
+        self.path = path
+        self.tmp_path = path + '.tmp'
+        self.width_px, self.height_px = sheet.page_px
+        self.width_pt = sheet.page_mm[0] * 72 / 25.4
+        self.height_pt = sheet.page_mm[1] * 72 / 25.4
+        self.offsets = {}
+        self.kids = []
+        self.next_id = 3  # 1 = catalog, 2 = page tree
+        self.f = open(self.tmp_path, 'wb')
+        self.f.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    
+    def _object(self, body, number=None):
+        if number is None:
+            number = self.next_id
+            self.next_id += 1
+        self.offsets[number] = self.f.tell()
+        self.f.write(f"{number} 0 obj\n".encode() + body + b"\nendobj\n")
+        return number
+    
+    def _stream(self, header, data):
+        return self._object(f"<< {header} /Length {len(data)} >>\nstream\n".encode() + data + b"\nendstream")
+    
+    def add_page(self, compressed):
+        image = self._stream(
+            f"/Type /XObject /Subtype /Image /Width {self.width_px} /Height {self.height_px} "
+            f"/ColorSpace /DeviceGray /BitsPerComponent 1 /Filter /FlateDecode",
+            compressed
+        )
+        content = self._stream("", f"q {self.width_pt:.2f} 0 0 {self.height_pt:.2f} 0 0 cm /Im0 Do Q".encode())
+        page = self._object((
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {self.width_pt:.2f} {self.height_pt:.2f}] "
+            f"/Resources << /XObject << /Im0 {image} 0 R >> >> /Contents {content} 0 R >>"
+        ).encode())
+        self.kids.append(page)
+    
+    def close(self):
+        kids = " ".join(f"{kid} 0 R" for kid in self.kids)
+        self._object(f"<< /Type /Pages /Kids [{kids}] /Count {len(self.kids)} >>".encode(), 2)
+        self._object(b"<< /Type /Catalog /Pages 2 0 R >>", 1)
+        
+        xref = self.f.tell()
+        count = self.next_id
+        lines = [f"xref\n0 {count}\n", "0000000000 65535 f \n"]
+        lines += [f"{self.offsets[n]:010d} 00000 n \n" for n in range(1, count)]
+        lines.append(f"trailer\n<< /Size {count} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n")
+        self.f.write("".join(lines).encode())
+        self.f.close()
+        os.replace(self.tmp_path, self.path)
+    
+    def abort(self):
+        self.f.close()
+        try:
+            os.remove(self.tmp_path)
+        except OSError:
+            pass
+
+
+# Jobs
+
+def default_workers():
+    """Leave one core for the UI"""
+    return max(1, (os.cpu_count() or 1) - 1)
+
+
+def _run_jobs(jobs, workers):
+    """Yield job results in order, on a process pool when it is worth it"""
+    if workers <= 1 or len(jobs) < MIN_PARALLEL_PAGES:
+        for job in jobs:
+            yield _render_job(job)
+        return
+    
+    # Spawned, not forked: the app is a multithreaded Tk process
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        pending = deque()
+        remaining = iter(jobs)
+        try:
+            # A few pages in flight per worker keeps memory flat
+            for job in remaining:
+                pending.append(executor.submit(_render_job, job))
+                if len(pending) >= workers * 2:
+                    break
+            while pending:
+                result = pending.popleft().result()
+                for job in remaining:
+                    pending.append(executor.submit(_render_job, job))
+                    break
+                yield result
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def page_paths(path, pages):
+    """PNG file names: path itself for one page, else path_001.png, path_002.png, ..."""
+    if pages == 1:
+        return [path]
+    base, ext = os.path.splitext(path)
+    return [f"{base}_{n:03d}{ext}" for n in range(1, pages + 1)]
+
+
+def render_labels(labels, path, sheet=None, workers=None, on_progress=None, cancel_event=None):
+    """Render labels to a PDF (one file) or PNG pages
+    
+    Args:
+        labels: List of (name, barcode, price text), one per label
+        path: .pdf for one multi-page file, anything else for PNG pages
+        on_progress: Optional callback(pages_done, pages_total)
+        cancel_event: Optional threading.Event to stop early
+    
+    Returns:
+        List of files written
+    """
+    sheet = sheet or SHEETS[DEFAULT_SHEET]
+    workers = default_workers() if workers is None else workers
+    pages = [labels[i:i + sheet.per_page] for i in range(0, len(labels), sheet.per_page)]
+    if not pages:
+        raise ValueError("Tidak ada label untuk dicetak")
+    
+    is_pdf = path.lower().endswith('.pdf')
+    paths = [path] if is_pdf else page_paths(path, len(pages))
+    jobs = [(page, sheet, None if is_pdf else paths[n]) for n, page in enumerate(pages)]
+    
+    writer = _PdfWriter(path, sheet) if is_pdf else None
+    results = _run_jobs(jobs, workers)
+    try:
+        for done, result in enumerate(results, start=1):
+            if writer is not None:
+                writer.add_page(result)
+            if on_progress:
+                on_progress(done, len(pages))
+            if cancel_event is not None and cancel_event.is_set():
+                raise LabelsCancelled()
+    except BaseException:
+        results.close()
+        if writer is not None:
+            writer.abort()
+        else:
+            for png_path in paths:
+                try:
+                    os.remove(png_path)
+                except OSError:
+                    pass
+        raise
+    if writer is not None:
+        writer.close()
+    return paths
@@ -0,0 +1,251 @@
+"""
+Streaming export of transaction ranges to CSV and XLSX
+
+Rows are pulled one at a time from TransactionDatabase and written in
+chunks, so memory use does not grow with the size of the export.
+"""
+import csv
+import os
+import re
+import zipfile
+from xml.sax.saxutils import escape
+from utils.helpers import parse_float, parse_int
+
+CHUNK_ROWS = 1000
+
+DAILY_HEADERS = ['Tanggal', 'Transaksi', 'Item', 'Subtotal', 'Diskon', 'Total', 'Modal', 'Laba']
+LINE_ITEM_HEADERS = ['ID Transaksi', 'Tanggal', 'Waktu', 'Kasir', 'ID Produk', 'Barcode',
+                     'Nama Produk', 'Harga', 'Qty', 'Subtotal', 'Modal']
+
+
+class ExportCancelled(Exception):
+    """Raised when an export is cancelled by the user"""
+
+
+def iter_daily_summary(transaction_db, start_date, end_date, buy_prices, on_progress=None):
+    """Yield one summary row per day (memory grows with days, not lines)"""
+    days = {}
+    for t in transaction_db.iter_by_date_range(start_date, end_date, on_progress):
+        day = days.get(t['date'])
+        if day is None:
+            day = days[t['date']] = [0, 0, 0.0, 0.0, 0.0, 0.0]
+        day[0] += 1
+        day[2] += parse_float(t.get('subtotal'))
+        day[3] += parse_float(t.get('discount'))
+        day[4] += parse_float(t.get('total'))
+        for item in t['items_list']:
+            qty = parse_int(item.get('qty', 0))
+            day[1] += qty
+            day[5] += buy_prices.get(item.get('product_id', ''), 0) * qty
+    
+    for date in sorted(days):
+        count, items, subtotal, discount, total, cost = days[date]
+        yield [date, count, items, subtotal, discount, total, cost, total - cost]
+
+
+def iter_line_items(transaction_db, start_date, end_date, buy_prices, on_progress=None):
+    """Yield one flattened row per line item"""
+    for t in transaction_db.iter_by_date_range(start_date, end_date, on_progress):
+        for item in t['items_list']:
+            qty = parse_int(item.get('qty', 0))
+            product_id = item.get('product_id', '')
+            yield [
+                t['id'],
+                t['date'],
+                t['time'],
+                t.get('cashier', ''),
+                product_id,
+                item.get('barcode', ''),
+                item.get('name', ''),
+                parse_float(item.get('price')),
+                qty,
+                parse_float(item.get('subtotal')),
+                buy_prices.get(product_id, 0) * qty
+            ]
+
+
+class CsvExportWriter:
+    """Chunked CSV writer"""
+    
+    def __init__(self, path):
+        self.file = open(path, 'w', newline='', encoding='utf-8-sig')
+        self.writer = csv.writer(self.file)
+        self.buffer = []
+    
+    def writerow(self, row):
+        self.buffer.append(row)
+        if len(self.buffer) >= CHUNK_ROWS:
+            self.flush()
+    
+    def flush(self):
+        self.writer.writerows(self.buffer)
+        self.buffer = []
+    
+    def close(self):
+        self.flush()
+        self.file.close()
+
+
+class XlsxExportWriter:
+    """Minimal streaming XLSX writer (no external dependency)
+    
+    Sheet XML is written straight into the zip archive in chunks; a new
+    sheet is started when Excel's row limit is reached.
+    """
+    
+    MAX_ROWS = 1048576
+    _INVALID_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+    
+    def __init__(self, path, header):
+        self.zip = zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED)
+        self.header = header
+        self.sheet_count = 0
+        self.sheet = None
+        self.row_number = 0
+        self.buffer = []
+        self._start_sheet()
+    
+    def _start_sheet(self):
+        """Open the next worksheet stream and write the header row"""
+        self._end_sheet()
+        self.sheet_count += 1
+        self.sheet = self.zip.open(f"xl/worksheets/sheet{self.sheet_count}.xml", 'w', force_zip64=True)
+        self.sheet.write(
+            b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+            b'<sheetData>'
+        )
+        self.row_number = 0
+        self._append(self.header)
+    
+    def _end_sheet(self):
+        if self.sheet is None:
+            return
+        self.flush()
+        self.sheet.write(b'</sheetData></worksheet>')
+        self.sheet.close()
+        self.sheet = None
+    
+    def _cell(self, value):
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return f'<c><v>{value}</v></c>'
+        text = escape(self._INVALID_XML.sub('', str(value)))
+        return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+    
+    def _append(self, row):
+        self.row_number += 1
+        cells = ''.join(self._cell(value) for value in row)
+        self.buffer.append(f'<row r="{self.row_number}">{cells}</row>')
+        if len(self.buffer) >= CHUNK_ROWS:
+            self.flush()
+    
+    def writerow(self, row):
+        if self.row_number >= self.MAX_ROWS:
+            self._start_sheet()
+        self._append(row)
+    
+    def flush(self):
+        if self.buffer:
+            self.sheet.write(''.join(self.buffer).encode('utf-8'))
+            self.buffer = []
+    
+    def close(self):
+        self._end_sheet()
+        sheets = ''.join(
+            f'<sheet name="Data{i if i > 1 else ""}" sheetId="{i}" r:id="rId{i}"/>'
+            for i in range(1, self.sheet_count + 1)
+        )
+        sheet_rels = ''.join(
+            f'<Relationship Id="rId{i}" '
+            f'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+            f'Target="worksheets/sheet{i}.xml"/>'
+            for i in range(1, self.sheet_count + 1)
+        )
+        sheet_types = ''.join(
+            f'<Override PartName="/xl/worksheets/sheet{i}.xml" '
+            f'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            for i in range(1, self.sheet_count + 1)
+        )
+        self.zip.writestr('[Content_Types].xml', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            f'{sheet_types}</Types>'
+        ))
+        self.zip.writestr('_rels/.rels', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+            'Target="xl/workbook.xml"/></Relationships>'
+        ))
+        self.zip.writestr('xl/workbook.xml', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            f'<sheets>{sheets}</sheets></workbook>'
+        ))
+        self.zip.writestr('xl/_rels/workbook.xml.rels', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            f'{sheet_rels}</Relationships>'
+        ))
+        self.zip.close()
+
+
+def export_range(transaction_db, kind, start_date, end_date, path, buy_prices=None,
+                 on_progress=None, cancel_event=None):
+    """Stream a date range to a CSV or XLSX file
+    
+    Args:
+        kind: 'daily' for one row per day, 'items' for flattened line items
+        path: Output file; '.xlsx' extension selects XLSX, otherwise CSV
+        on_progress: Called as on_progress(bytes_done, bytes_total)
+        cancel_event: threading.Event that aborts the export when set
+    
+    Returns:
+        Number of data rows written
+    """
+    buy_prices = buy_prices or {}
+    
+    def progress(done, total):
+        if cancel_event is not None and cancel_event.is_set():
+            raise ExportCancelled()
+        if on_progress:
+            on_progress(done, total)
+    
+    if kind == 'daily':
+        header = DAILY_HEADERS
+        rows = iter_daily_summary(transaction_db, start_date, end_date, buy_prices, progress)
+    else:
+        header = LINE_ITEM_HEADERS
+        rows = iter_line_items(transaction_db, start_date, end_date, buy_prices, progress)
+    
+    # Written next to the target and renamed at the end, so a failed or
+    # cancelled export never replaces (or deletes) an earlier file
+    tmp_path = path + '.tmp'
+    if path.lower().endswith('.xlsx'):
+        writer = XlsxExportWriter(tmp_path, header)
+    else:
+        writer = CsvExportWriter(tmp_path)
+        writer.writerow(header)
+    
+    count = 0
+    try:
+        try:
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+        finally:
+            writer.close()
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return count
@@ -8,11 +8,11 @@ def generate_id():
     """Generate unique ID"""
     return str(uuid.uuid4())[:8].upper()
 
-def generate_transaction_id():
-    """Generate transaction ID with date prefix"""
+def generate_transaction_id(prefix="TRX"):
+    """Generate transaction ID with date prefix (RFD for refunds)"""
     date_prefix = datetime.now().strftime("%Y%m%d")
     unique = str(uuid.uuid4())[:6].upper()
-    return f"TRX-{date_prefix}-{unique}"
+    return f"{prefix}-{date_prefix}-{unique}"
 
 def format_currency(amount):
     """Format number as Indonesian Rupiah"""
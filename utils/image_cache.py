@@ -0,0 +1,131 @@
+"""
+Image Cache - Resized images stored on disk as PNG thumbnails
+
+Thumbnails are keyed by the SHA-1 of the source file and the target size,
+so Tk can load them directly with tk.PhotoImage(file=...). PIL is only
+imported when a thumbnail has to be created (cache miss) or a logo is
+uploaded. The source hash is remembered per path with its mtime and size,
+so a cache hit does not re-read the source file.
+"""
+import hashlib
+import json
+import os
+from config import CACHE_DIR
+
+IMAGE_CACHE_DIR = os.path.join(CACHE_DIR, "images")
+INDEX_FILE = os.path.join(IMAGE_CACHE_DIR, "index.json")
+LOGO_MAX_SIZE = (512, 512)  # Uploaded logos are scaled down to fit this box
+
+_index = None
+
+
+def _load_index():
+    """Load {source path: [mtime_ns, size, sha1, [thumbnail names]]}"""
+    global _index
+    if _index is None:
+        try:
+            with open(INDEX_FILE, 'r', encoding='utf-8') as f:
+                _index = json.load(f)
+        except (OSError, ValueError):
+            _index = {}
+    return _index
+
+
+def _save_index():
+    os.makedirs(IMAGE_CACHE_DIR, exist_ok=True)
+    tmp_path = INDEX_FILE + '.tmp'
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(_index, f)
+        os.replace(tmp_path, INDEX_FILE)
+    except OSError as e:
+        print(f"Error saving image cache index: {e}")
+
+
+def _file_hash(path):
+    sha = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def _source_entry(path):
+    """Get the index entry for path, re-hashing only if the file changed"""
+    index = _load_index()
+    stat = os.stat(path)
+    key = os.path.abspath(path)
+    entry = index.get(key)
+    if entry is None or entry[0] != stat.st_mtime_ns or entry[1] != stat.st_size:
+        digest = _file_hash(path)
+        if entry is not None and entry[2] != digest:
+            # Source replaced: drop thumbnails of the old content
+            for name in entry[3]:
+                try:
+                    os.remove(os.path.join(IMAGE_CACHE_DIR, name))
+                except OSError:
+                    pass
+        thumbnails = entry[3] if entry is not None and entry[2] == digest else []
+        entry = index[key] = [stat.st_mtime_ns, stat.st_size, digest, thumbnails]
+        _save_index()
+    return entry
+
+
+def get_thumbnail(path, size):
+    """Get the path of a PNG of path resized to size (width, height)
+    
+    Returns:
+        Thumbnail path, or None if the source is missing or cannot be resized
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        entry = _source_entry(path)
+    except OSError as e:
+        print(f"Error reading image {path}: {e}")
+        return None
+    
+    width, height = size
+    name = f"{entry[2][:16]}_{width}x{height}.png"
+    thumb_path = os.path.join(IMAGE_CACHE_DIR, name)
+    if os.path.exists(thumb_path):
+        return thumb_path
+    
+    # Cache miss: resize with PIL
+    try:
+        from PIL import Image
+    except ImportError:
+        print("Note: PIL not installed. Logo display will use text fallback.")
+        print("Install with: pip install Pillow")
+        return None
+    try:
+        os.makedirs(IMAGE_CACHE_DIR, exist_ok=True)
+        with Image.open(path) as img:
+            thumb = img.convert('RGBA').resize((width, height), Image.Resampling.LANCZOS)
+        tmp_path = thumb_path + '.tmp'
+        thumb.save(tmp_path, format='PNG')
+        os.replace(tmp_path, thumb_path)
+    except Exception as e:
+        print(f"Error resizing image {path}: {e}")
+        return None
+    
+    if name not in entry[3]:
+        entry[3].append(name)
+        _save_index()
+    return thumb_path
+
+
+def save_logo(source, dest):
+    """Store an uploaded logo as PNG, scaled down once to LOGO_MAX_SIZE
+    
+    Raises:
+        ImportError if PIL is not installed, OSError/ValueError for bad images
+    """
+    from PIL import Image
+    
+    with Image.open(source) as img:
+        logo = img.convert('RGBA')
+    logo.thumbnail(LOGO_MAX_SIZE, Image.Resampling.LANCZOS)
+    tmp_path = dest + '.tmp'
+    logo.save(tmp_path, format='PNG')
+    os.replace(tmp_path, dest)
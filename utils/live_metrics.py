@@ -0,0 +1,144 @@
+"""
+Live Metrics - In-memory counters for the Dashboard
+
+Holds today's sales and transaction count, the product count and a ring
+buffer of the latest transactions. The databases fold their own appends in
+as they write, so reading the counters does not depend on data size. Each
+counter group remembers the (size, mtime) of its file after the last write
+it knows about; any other change to the file (delete, update, restore,
+close month) leaves the stat different and the group is re-seeded from
+the databases on the next read.
+"""
+import os
+import threading
+from collections import deque
+from datetime import datetime
+
+RECENT_SIZE = 10
+
+
+def file_stat(path):
+    """Get (size, mtime_ns) of path, or None if it is missing"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+class LiveMetrics:
+    """Process-wide counters shared by every database instance"""
+    
+    def __init__(self, recent_size=RECENT_SIZE):
+        self._lock = threading.Lock()
+        self.recent_size = recent_size
+        
+        # Transactions group
+        self.date = None
+        self.total_sales = 0.0
+        self.total_transactions = 0
+        self.recent = deque(maxlen=recent_size)  # newest first
+        self._transactions_stat = None
+        
+        # Products group
+        self.product_count = 0
+        self._products_stat = None
+    
+    def transaction_added(self, path, before, transaction):
+        """Fold a transaction appended to path (before is the stat prior to the append)"""
+        with self._lock:
+            if self._transactions_stat is None or self._transactions_stat != before:
+                self._transactions_stat = None
+                return
+            if transaction['date'] != self.date:
+                # Day rolled over since seeding
+                self._transactions_stat = None
+                return
+            self.total_sales += float(transaction['total'])
+            if not transaction.get('ref_id'):
+                # Refunds lower the sales total but are not new transactions
+                self.total_transactions += 1
+            self.recent.appendleft(transaction)
+            self._transactions_stat = file_stat(path)
+    
+    def products_changed(self, path, before, delta):
+        """Adjust the product count after a write to path"""
+        with self._lock:
+            if self._products_stat is None or self._products_stat != before:
+                self._products_stat = None
+                return
+            self.product_count += delta
+            self._products_stat = file_stat(path)
+    
+    def is_current(self, transaction_db, product_db):
+        """True if snapshot() can answer without reading the databases"""
+        with self._lock:
+            return (
+                self._transactions_stat is not None
+                and self._transactions_stat == file_stat(transaction_db.file_path)
+                and self.date == datetime.now().strftime("%Y-%m-%d")
+                and self._products_stat is not None
+                and self._products_stat == file_stat(product_db.file_path)
+            )
+    
+    def snapshot(self, transaction_db, product_db):
+        """Get current counters, re-seeding stale groups from the databases
+        
+        Returns:
+            dict with date, total_sales, total_transactions, product_count, recent
+        """
+        today = datetime.now().strftime("%Y-%m-%d")
+        with self._lock:
+            transactions_ok = (
+                self._transactions_stat is not None
+                and self._transactions_stat == file_stat(transaction_db.file_path)
+                and self.date == today
+            )
+            products_ok = (
+                self._products_stat is not None
+                and self._products_stat == file_stat(product_db.file_path)
+            )
+        
+        if not transactions_ok:
+            self._seed_transactions(transaction_db, today)
+        if not products_ok:
+            self._seed_products(product_db)
+        
+        with self._lock:
+            return {
+                'date': self.date,
+                'total_sales': self.total_sales,
+                'total_transactions': self.total_transactions,
+                'product_count': self.product_count,
+                'recent': list(self.recent)
+            }
+    
+    def _seed_transactions(self, transaction_db, today):
+        """Read today's totals and the latest transactions (outside the lock)"""
+        path = transaction_db.file_path
+        stat = file_stat(path)
+        summary = transaction_db.get_today_summary()
+        recent, _ = transaction_db.get_page('0000-00-00', '9999-99-99', limit=self.recent_size)
+        with self._lock:
+            # Keep the result only if nothing was written while reading
+            if file_stat(path) != stat:
+                stat = None
+            self.date = today
+            self.total_sales = summary['total_sales']
+            self.total_transactions = summary['total_transactions']
+            self.recent = deque(recent, maxlen=self.recent_size)
+            self._transactions_stat = stat
+    
+    def _seed_products(self, product_db):
+        """Count products (outside the lock)"""
+        path = product_db.file_path
+        stat = file_stat(path)
+        count = len(product_db.get_all())
+        with self._lock:
+            if file_stat(path) != stat:
+                stat = None
+            self.product_count = count
+            self._products_stat = stat
+
+
+live_metrics = LiveMetrics()
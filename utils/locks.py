@@ -0,0 +1,11 @@
+"""
+Locks - Locks shared between the data layer and background features
+
+write_lock is held by every write to the database files (db_manager), so
+readers that need a consistent view of several files, such as backups,
+can wait for a point between writes. It is reentrant: a write that calls
+another write keeps holding it.
+"""
+import threading
+
+write_lock = threading.RLock()
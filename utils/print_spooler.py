@@ -0,0 +1,314 @@
+"""
+Print Spooler - Persistent print queue with one worker thread per printer
+
+Jobs are stored in PRINT_QUEUE_DIR as <id>.prn (raw bytes) plus <id>.json
+(printer, title, attempts, status, ...) before submit() returns, so
+receipts survive a crash or restart. Each printer gets its own worker, so
+a jammed or offline printer never blocks the Tk thread or other printers.
+Jobs for one printer print in order; a failing job is retried with
+exponential backoff and later jobs wait behind it. After MAX_ATTEMPTS the
+job is marked failed and kept on disk until retried or discarded. The
+worker keeps its backend open while idle for backend.keep_alive seconds,
+so consecutive receipts reuse one printer connection.
+
+Status listeners are called on the worker thread as callback(job); UI code
+must hand the update over to the Tk thread (e.g. through widget.after).
+"""
+import itertools
+import json
+import os
+import threading
+import time
+import uuid
+from config import PRINT_QUEUE_DIR
+from utils.printer_backends import PrinterError, open_printer
+
+MAX_ATTEMPTS = 8
+BACKOFF_BASE = 2.0  # seconds before the first retry, doubled each attempt
+BACKOFF_MAX = 60.0
+
+STATUS_QUEUED = 'queued'
+STATUS_PRINTING = 'printing'
+STATUS_RETRYING = 'retrying'
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+
+
+class PrintJob:
+    """One queued print job (metadata only; data lives in the .prn file)"""
+    
+    FIELDS = ('id', 'printer', 'title', 'created', 'seq', 'attempts', 'status', 'next_attempt', 'error')
+    
+    def __init__(self, id, printer, title, created, seq, attempts=0, status=STATUS_QUEUED,
+                 next_attempt=0.0, error=''):
+        self.id = id
+        self.printer = printer
+        self.title = title
+        self.created = created
+        self.seq = seq
+        self.attempts = attempts
+        self.status = status
+        self.next_attempt = next_attempt
+        self.error = error
+    
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+
+class PrintSpooler:
+    """Persistent queue feeding a worker thread per printer"""
+    
+    def __init__(self, queue_dir=PRINT_QUEUE_DIR, opener=open_printer):
+        self.queue_dir = queue_dir
+        self.opener = opener
+        self._lock = threading.Lock()
+        self._jobs = {}  # id -> PrintJob (pending, retrying or failed)
+        self._wakeups = {}  # printer -> threading.Event
+        self._workers = {}  # printer -> Thread
+        self._listeners = []
+        self._seq = itertools.count(int(time.time() * 1000))
+        
+        os.makedirs(self.queue_dir, exist_ok=True)
+        self._load_pending()
+    
+    # Persistence
+    
+    def _data_path(self, job_id):
+        return os.path.join(self.queue_dir, f"{job_id}.prn")
+    
+    def _meta_path(self, job_id):
+        return os.path.join(self.queue_dir, f"{job_id}.json")
+    
+    def _save_meta(self, job):
+        tmp_path = self._meta_path(job.id) + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(job.to_dict(), f)
+        os.replace(tmp_path, self._meta_path(job.id))
+    
+    def _remove_files(self, job_id):
+        for path in (self._meta_path(job_id), self._data_path(job_id)):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+    
+    def _load_pending(self):
+        """Pick up jobs left over from a previous run"""
+        for filename in os.listdir(self.queue_dir):
+            if not filename.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.queue_dir, filename), 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+                job = PrintJob(**{field: meta[field] for field in PrintJob.FIELDS})
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                print(f"Error loading print job {filename}: {e}")
+                continue
+            if not os.path.exists(self._data_path(job.id)):
+                self._remove_files(job.id)
+                continue
+            if job.status != STATUS_FAILED:
+                # Interrupted while printing: print again
+                job.status = STATUS_QUEUED
+                job.next_attempt = 0.0
+            self._jobs[job.id] = job
+        for printer in {job.printer for job in self._jobs.values()}:
+            self._ensure_worker(printer)
+    
+    # Public API
+    
+    def submit(self, printer, data, title="Receipt", on_status=None):
+        """Queue raw bytes for a printer and return the PrintJob at once
+        
+        Args:
+            on_status: Optional callback(job) for this job only (worker thread)
+        """
+        job = PrintJob(
+            id=f"{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:6]}",
+            printer=printer,
+            title=title,
+            created=time.time(),
+            seq=next(self._seq)
+        )
+        with open(self._data_path(job.id), 'wb') as f:
+            f.write(data)
+        self._save_meta(job)
+        
+        if on_status is not None:
+            self._add_job_listener(job.id, on_status)
+        with self._lock:
+            self._jobs[job.id] = job
+        self._notify(job)
+        self._wake(printer)
+        return job
+    
+    def jobs(self, printer=None):
+        """Get queued, retrying and failed jobs (oldest first)"""
+        with self._lock:
+            jobs = [job for job in self._jobs.values() if printer is None or job.printer == printer]
+        return sorted(jobs, key=lambda job: job.seq)
+    
+    def retry(self, job_id=None):
+        """Queue failed jobs again (one job, or all of them)"""
+        woken = set()
+        with self._lock:
+            for job in self._jobs.values():
+                if job.status == STATUS_FAILED and job_id in (None, job.id):
+                    job.status = STATUS_QUEUED
+                    job.attempts = 0
+                    job.next_attempt = 0.0
+                    job.error = ''
+                    self._save_meta(job)
+                    woken.add(job.printer)
+        for printer in woken:
+            self._wake(printer)
+    
+    def discard(self, job_id):
+        """Drop a job that has not printed (only failed or waiting ones)"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status == STATUS_PRINTING:
+                return False
+            del self._jobs[job_id]
+        self._remove_files(job_id)
+        return True
+    
+    # Listeners
+    
+    def add_listener(self, callback):
+        """Call callback(job) on every status change of any job (worker thread)"""
+        with self._lock:
+            self._listeners.append((None, callback))
+    
+    def remove_listener(self, callback):
+        with self._lock:
+            self._listeners = [(job_id, cb) for job_id, cb in self._listeners if cb is not callback]
+    
+    def _add_job_listener(self, job_id, callback):
+        with self._lock:
+            self._listeners.append((job_id, callback))
+    
+    def _notify(self, job):
+        with self._lock:
+            listeners = [cb for job_id, cb in self._listeners if job_id in (None, job.id)]
+            if job.status in (STATUS_DONE, STATUS_FAILED):
+                # Per-job listeners are finished after a final status
+                self._listeners = [(job_id, cb) for job_id, cb in self._listeners if job_id != job.id]
+        for callback in listeners:
+            try:
+                callback(job)
+            except Exception as e:
+                print(f"Error in print status listener: {e}")
+    
+    # Workers
+    
+    def _wake(self, printer):
+        self._ensure_worker(printer).set()
+    
+    def _ensure_worker(self, printer):
+        with self._lock:
+            wakeup = self._wakeups.get(printer)
+            if wakeup is None:
+                wakeup = self._wakeups[printer] = threading.Event()
+            worker = self._workers.get(printer)
+            if worker is None or not worker.is_alive():
+                worker = threading.Thread(
+                    target=self._run_worker,
+                    args=(printer, wakeup),
+                    name=f"print-{printer}",
+                    daemon=True
+                )
+                self._workers[printer] = worker
+                worker.start()
+        return wakeup
+    
+    def _next_job(self, printer):
+        """Get (job, seconds to wait) for the oldest job that is not failed"""
+        with self._lock:
+            pending = [job for job in self._jobs.values()
+                       if job.printer == printer and job.status != STATUS_FAILED]
+        if not pending:
+            return None, None
+        job = min(pending, key=lambda j: j.seq)
+        return job, max(0.0, job.next_attempt - time.time())
+    
+    def _run_worker(self, printer, wakeup):
+        backend = None
+        idle_since = None
+        while True:
+            # Clear before looking, so a submit() after this point is not missed
+            wakeup.clear()
+            job, wait = self._next_job(printer)
+            if job is None or wait > 0:
+                if backend is not None:
+                    # Idle: keep the connection for the next job, up to backend.keep_alive
+                    if idle_since is None:
+                        idle_since = time.monotonic()
+                    left = getattr(backend, 'keep_alive', 0) - (time.monotonic() - idle_since)
+                    if left <= 0:
+                        backend.close()
+                        backend = None
+                        idle_since = None
+                    else:
+                        wait = left if wait is None else min(wait, left)
+                wakeup.wait(timeout=wait)
+                continue
+            idle_since = None
+            
+            try:
+                with open(self._data_path(job.id), 'rb') as f:
+                    data = f.read()
+            except OSError as e:
+                print(f"Error reading print job {job.id}: {e}")
+                with self._lock:
+                    self._jobs.pop(job.id, None)
+                self._remove_files(job.id)
+                continue
+            
+            job.status = STATUS_PRINTING
+            job.attempts += 1
+            self._notify(job)
+            try:
+                if backend is None:
+                    backend = self.opener(printer)
+                backend.write(data, title=job.title)
+            except Exception as e:
+                if backend is not None:
+                    backend.close()
+                    backend = None
+                self._job_failed(job, e)
+                continue
+            
+            with self._lock:
+                self._jobs.pop(job.id, None)
+            self._remove_files(job.id)
+            job.status = STATUS_DONE
+            job.error = ''
+            self._notify(job)
+    
+    def _job_failed(self, job, error):
+        """Schedule a retry with backoff, or give up after MAX_ATTEMPTS"""
+        job.error = str(error) if isinstance(error, PrinterError) else f"{type(error).__name__}: {error}"
+        if job.attempts >= MAX_ATTEMPTS:
+            job.status = STATUS_FAILED
+        else:
+            job.status = STATUS_RETRYING
+            job.next_attempt = time.time() + min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (job.attempts - 1))
+        try:
+            self._save_meta(job)
+        except OSError as e:
+            print(f"Error saving print job {job.id}: {e}")
+        self._notify(job)
+
+
+_spooler = None
+_spooler_lock = threading.Lock()
+
+
+def get_spooler():
+    """Get the spooler shared by the whole app (started on first use)"""
+    global _spooler
+    with _spooler_lock:
+        if _spooler is None:
+            _spooler = PrintSpooler()
+        return _spooler
@@ -0,0 +1,281 @@
+"""
+Printer Backends - Deliver raw ESC/POS bytes to a printer
+
+A backend is opened for one printer name and accepts write(data) and
+close(). Backends raise PrinterError when a job could not be delivered,
+so the spooler can retry it later.
+
+The printer name picks the backend:
+    tcp://192.168.1.50:9100   Network printer, raw socket (JetDirect, port 9100 by default)
+    file:///dev/usb/lp0       Device file (USB/parallel printer on Linux)
+    spool:///var/spool/kasir  Directory; every job becomes one .prn file
+    anything else             Installed printer (Windows spooler, or CUPS elsewhere)
+
+Backends with a connection (tcp, file) keep it open for keep_alive seconds
+after a job, so a burst of receipts reuses one connection.
+"""
+import os
+import re
+import select
+import socket
+import subprocess
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+
+class PrinterError(Exception):
+    """Raised when data could not be sent to the printer"""
+
+
+class PrinterBackend:
+    """Base class: write() one job, close() the connection"""
+    
+    keep_alive = 0  # seconds the spooler keeps an idle backend open
+    
+    def write(self, data, title="Receipt"):
+        raise NotImplementedError
+    
+    def close(self):
+        pass
+
+
+class WindowsPrinter(PrinterBackend):
+    """Installed Windows printer: RAW job via win32print, or `copy /b` to the share"""
+    
+    COPY_TIMEOUT = 30
+    
+    def __init__(self, printer_name):
+        self.printer_name = printer_name
+    
+    def write(self, data, title="Receipt"):
+        try:
+            import win32print
+        except ImportError:
+            win32print = None
+        
+        if win32print is not None:
+            try:
+                self._write_win32(win32print, data, title)
+                return
+            except Exception as e:
+                print(f"win32print error: {e}")
+        self._write_copy(data)
+    
+    def _write_win32(self, win32print, data, title):
+        handle = win32print.OpenPrinter(self.printer_name)
+        try:
+            win32print.StartDocPrinter(handle, 1, (title, None, "RAW"))
+            try:
+                win32print.StartPagePrinter(handle)
+                win32print.WritePrinter(handle, data)
+                win32print.EndPagePrinter(handle)
+            finally:
+                win32print.EndDocPrinter(handle)
+        finally:
+            win32print.ClosePrinter(handle)
+    
+    def _write_copy(self, data):
+        """Copy a temp file to the printer share name (e.g. \\\\PC\\Printer or LPT1)"""
+        with tempfile.NamedTemporaryFile(mode='wb', suffix='.prn', delete=False) as f:
+            f.write(data)
+            temp_file = f.name
+        try:
+            result = subprocess.run(
+                ['cmd', '/c', f'copy /b "{temp_file}" "{self.printer_name}"'],
+                capture_output=True,
+                text=True,
+                timeout=self.COPY_TIMEOUT
+            )
+        except (OSError, subprocess.SubprocessError) as e:
+            raise PrinterError(f"Printer {self.printer_name} tidak bisa dihubungi: {e}")
+        finally:
+            try:
+                os.remove(temp_file)
+            except OSError:
+                pass
+        if result.returncode != 0 and 'copied' not in result.stdout.lower():
+            raise PrinterError(f"Printer {self.printer_name} menolak job: {result.stdout.strip() or result.stderr.strip()}")
+
+
+class CupsPrinter(PrinterBackend):
+    """Installed CUPS printer (Linux/macOS): raw job through `lp`"""
+    
+    LP_TIMEOUT = 30
+    
+    def __init__(self, printer_name):
+        self.printer_name = printer_name
+    
+    def write(self, data, title="Receipt"):
+        try:
+            result = subprocess.run(
+                ['lp', '-d', self.printer_name, '-o', 'raw', '-t', title],
+                input=data,
+                capture_output=True,
+                timeout=self.LP_TIMEOUT
+            )
+        except (OSError, subprocess.SubprocessError) as e:
+            raise PrinterError(f"Printer {self.printer_name} tidak bisa dihubungi: {e}")
+        if result.returncode != 0:
+            message = result.stderr.decode(errors='replace').strip()
+            raise PrinterError(f"Printer {self.printer_name} menolak job: {message}")
+
+
+class TcpPrinter(PrinterBackend):
+    """Network printer on a raw socket (JetDirect / AppSocket)
+    
+    The socket stays open between jobs. Each job is written as one buffer,
+    so the whole receipt leaves in as few packets as possible. A job is
+    only sent again on a new connection when the kept one failed before
+    any of it was sent; otherwise the printer could print half a receipt
+    followed by the full one.
+    """
+    
+    DEFAULT_PORT = 9100
+    CONNECT_TIMEOUT = 5
+    SEND_TIMEOUT = 15
+    keep_alive = 30
+    
+    def __init__(self, address):
+        try:
+            parts = urlsplit(f"//{address}")
+            self.host = parts.hostname
+            self.port = parts.port or self.DEFAULT_PORT
+        except ValueError as e:
+            raise PrinterError(f"Alamat printer tidak valid: {address} ({e})")
+        if not self.host:
+            raise PrinterError(f"Alamat printer tidak valid: {address}")
+        self._sock = None
+    
+    def write(self, data, title="Receipt"):
+        reused = self._sock is not None
+        if reused and not self._is_alive():
+            self.close()
+            reused = False
+        try:
+            self._send(data)
+        except OSError as e:
+            self.close()
+            if not reused or getattr(e, 'bytes_sent', 0):
+                raise PrinterError(f"Printer {self.host}:{self.port} tidak bisa dihubungi: {e}")
+            # The printer dropped the kept connection before taking anything: send on a new one
+            try:
+                self._send(data)
+            except OSError as e:
+                self.close()
+                raise PrinterError(f"Printer {self.host}:{self.port} tidak bisa dihubungi: {e}")
+    
+    def _send(self, data):
+        if self._sock is None:
+            sock = socket.create_connection((self.host, self.port), timeout=self.CONNECT_TIMEOUT)
+            sock.settimeout(self.SEND_TIMEOUT)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            self._sock = sock
+        # sendall(), but an error records how much was already sent
+        view = memoryview(data)
+        sent = 0
+        try:
+            while sent < len(view):
+                sent += self._sock.send(view[sent:])
+        except OSError as e:
+            e.bytes_sent = sent
+            raise
+    
+    def _is_alive(self):
+        """Check a kept socket before reuse (a closed peer reads as EOF)"""
+        try:
+            readable, _, _ = select.select([self._sock], [], [], 0)
+            if readable:
+                # Status bytes from the printer are dropped; EOF means it hung up
+                return bool(self._sock.recv(1024))
+            return True
+        except (OSError, ValueError):
+            return False
+    
+    def close(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = None
+
+
+class FilePrinter(PrinterBackend):
+    """Printer device file (e.g. /dev/usb/lp0), kept open between jobs"""
+    
+    keep_alive = 30
+    
+    def __init__(self, path):
+        if not path:
+            raise PrinterError("Path printer kosong")
+        self.path = path
+        self._file = None
+    
+    def write(self, data, title="Receipt"):
+        try:
+            if self._file is None:
+                self._file = open(self.path, 'ab')
+            self._file.write(data)
+            self._file.flush()
+        except OSError as e:
+            self.close()
+            raise PrinterError(f"Printer {self.path} tidak bisa ditulis: {e}")
+    
+    def close(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._file = None
+
+
+class SpoolDirPrinter(PrinterBackend):
+    """Drop every job as a .prn file into a directory watched by another program"""
+    
+    def __init__(self, path):
+        if not path:
+            raise PrinterError("Folder spool kosong")
+        self.path = path
+    
+    def write(self, data, title="Receipt"):
+        name = re.sub(r'[^A-Za-z0-9_-]+', '_', title).strip('_') or 'job'
+        filename = f"{time.strftime('%Y%m%d%H%M%S')}-{time.time_ns() % 1000000:06d}-{name}.prn"
+        tmp_path = os.path.join(self.path, f".{filename}.tmp")
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            # Rename last, so the watcher never picks up half a job
+            os.replace(tmp_path, os.path.join(self.path, filename))
+        except OSError as e:
+            raise PrinterError(f"Folder spool {self.path} tidak bisa ditulis: {e}")
+
+
+# scheme -> backend class, called with the part after "scheme://"
+BACKENDS = {
+    'tcp': TcpPrinter,
+    'file': FilePrinter,
+    'spool': SpoolDirPrinter,
+}
+
+
+def register_backend(scheme, backend):
+    """Add a backend for printer names starting with scheme://"""
+    BACKENDS[scheme.lower()] = backend
+
+
+def open_printer(printer_name):
+    """Get a backend for a configured printer name"""
+    if not printer_name:
+        raise PrinterError("Printer belum dipilih")
+    scheme, sep, target = printer_name.partition('://')
+    if sep:
+        backend = BACKENDS.get(scheme.lower())
+        if backend is None:
+            raise PrinterError(f"Jenis printer tidak dikenal: {scheme}://")
+        return backend(target)
+    if os.name == 'nt':
+        return WindowsPrinter(printer_name)
+    return CupsPrinter(printer_name)
@@ -0,0 +1,158 @@
+"""
+Printer Discovery - Cached list of printers from pluggable providers
+
+A provider has a name and a discover() method returning printer names
+that open_printer() accepts. Providers:
+    WmicProvider    Installed Windows printers (wmic)
+    LpstatProvider  CUPS destinations (lpstat), Linux/macOS
+    StaticProvider  Printers listed in store_config.json under "printers",
+                    e.g. ["tcp://192.168.1.50:9100"]
+
+Discovery shells out and can take seconds, so callers run get_printers()
+off the Tk thread; the result is cached for DISCOVERY_TTL and concurrent
+callers share one run.
+"""
+import os
+import subprocess
+import threading
+import time
+from config import store_config
+
+DISCOVERY_TTL = 300.0  # seconds a discovered list stays valid
+COMMAND_TIMEOUT = 10
+
+
+class PrinterProvider:
+    """Base class: discover() returns a list of printer names"""
+    
+    name = 'provider'
+    
+    def discover(self):
+        raise NotImplementedError
+
+
+class WmicProvider(PrinterProvider):
+    """Installed Windows printers"""
+    
+    name = 'wmic'
+    # Shown when wmic is missing or fails (Windows always has these)
+    FALLBACK = ["Microsoft Print to PDF", "Microsoft XPS Document Writer"]
+    
+    def discover(self):
+        try:
+            result = subprocess.run(
+                ['wmic', 'printer', 'get', 'name'],
+                capture_output=True,
+                text=True,
+                timeout=COMMAND_TIMEOUT
+            )
+        except (OSError, subprocess.SubprocessError) as e:
+            print(f"Error getting printers: {e}")
+            return list(self.FALLBACK)
+        lines = result.stdout.strip().split('\n')
+        return [line.strip() for line in lines[1:] if line.strip()]  # Skip header
+
+
+class LpstatProvider(PrinterProvider):
+    """CUPS printer queues"""
+    
+    name = 'lpstat'
+    
+    def discover(self):
+        try:
+            result = subprocess.run(
+                ['lpstat', '-a'],
+                capture_output=True,
+                text=True,
+                timeout=COMMAND_TIMEOUT
+            )
+        except (OSError, subprocess.SubprocessError) as e:
+            print(f"Error getting printers: {e}")
+            return []
+        # "<queue> accepting requests since ..."
+        return [line.split()[0] for line in result.stdout.splitlines() if line.strip()]
+
+
+class StaticProvider(PrinterProvider):
+    """Printers configured by hand (network/device addresses)"""
+    
+    name = 'static'
+    
+    def __init__(self, key='printers'):
+        self.key = key
+    
+    def discover(self):
+        printers = store_config.get(self.key) or []
+        if isinstance(printers, str):
+            printers = [printers]
+        return [str(p) for p in printers if p]
+
+
+class PrinterDiscovery:
+    """Runs every provider and caches the merged list for ttl seconds"""
+    
+    def __init__(self, providers, ttl=DISCOVERY_TTL):
+        self.providers = list(providers)
+        self.ttl = ttl
+        self._lock = threading.Lock()  # held while discovering: one run at a time
+        self._printers = None
+        self._found_at = 0.0
+    
+    def add_provider(self, provider):
+        self.providers.append(provider)
+        self.invalidate()
+    
+    def invalidate(self):
+        self._printers = None
+    
+    def cached(self):
+        """Get the cached list without discovering (None if missing or expired)"""
+        printers = self._printers
+        if printers is None or time.monotonic() - self._found_at > self.ttl:
+            return None
+        return list(printers)
+    
+    def get_printers(self, force=False):
+        """Get printer names, discovering if the cache is stale (blocking)
+        
+        A caller that waited for another caller's run gets that result,
+        even with force=True.
+        """
+        requested_at = time.monotonic()
+        with self._lock:
+            printers = self._printers
+            if printers is not None:
+                fresh = time.monotonic() - self._found_at <= self.ttl
+                shared = self._found_at >= requested_at  # finished while we waited
+                if shared or (fresh and not force):
+                    return list(printers)
+            
+            printers = []
+            for provider in self.providers:
+                try:
+                    found = provider.discover()
+                except Exception as e:
+                    print(f"Error in printer provider {provider.name}: {e}")
+                    continue
+                printers.extend(p for p in found if p not in printers)
+            self._printers = printers
+            self._found_at = time.monotonic()
+            return list(printers)
+
+
+def default_providers():
+    """Providers for this platform"""
+    if os.name == 'nt':
+        return [WmicProvider(), StaticProvider()]
+    return [LpstatProvider(), StaticProvider()]
+
+
+printer_discovery = PrinterDiscovery(default_providers())
+
+
+def _on_config_changed(config, changed):
+    if 'printers' in changed:
+        printer_discovery.invalidate()
+
+
+store_config.add_listener(_on_config_changed)
@@ -0,0 +1,78 @@
+"""
+Receipt Batch - Reprint many receipts as one printer job or one file
+
+All receipts go through the same ReceiptLayout pipeline as single
+receipts, share one store block, and are encoded once. The result is one
+spooler job (or one file), so a bundle of hundreds of receipts costs one
+job and one printer connection instead of one dialog and job each.
+"""
+import os
+import re
+from utils.print_spooler import get_spooler
+from utils.receipt_layout import ReceiptLayout, get_store_block, render_text, render_escpos
+from utils.receipt_logo import get_logo_raster
+
+# ESC/POS commands used by render_text (stripped for plain text files)
+ESCPOS_COMMAND = re.compile('\x1b@|\x1b[Ea!].|\x1dV.', re.DOTALL)
+COMMAND_LINE = re.compile('(?:\x1b@|\x1b[Ea!].|\x1dV.)+', re.DOTALL)
+
+
+def load_transactions(transaction_db, ids=None, date=None):
+    """Get the transactions of a batch in print order (oldest first)
+    
+    Args:
+        ids: Transaction IDs to reprint
+        date: Or every transaction of one day (YYYY-MM-DD)
+    """
+    if ids is not None:
+        transactions = list(transaction_db.get_many(ids).values())
+    else:
+        transactions = transaction_db.get_by_date(date)
+    transactions.sort(key=lambda t: (t['date'], t['time'], t['id']))
+    return transactions
+
+
+def render_batch(transactions, cut=True):
+    """Render receipts back to back as raw printer bytes (cut after each)"""
+    store = get_store_block()
+    logo = get_logo_raster()
+    return b"".join(render_escpos(ReceiptLayout(t, store), cut, logo) for t in transactions)
+
+
+def render_plain_batch(transactions):
+    """Render receipts as readable text, without printer commands"""
+    store = get_store_block()
+    parts = []
+    for t in transactions:
+        # Lines holding only commands are dropped instead of left blank
+        lines = render_text(ReceiptLayout(t, store)).split("\n")
+        parts.extend(ESCPOS_COMMAND.sub('', line) for line in lines if not COMMAND_LINE.fullmatch(line))
+    return "\n".join(parts)
+
+
+def print_batch(printer_name, transactions, title=None, on_status=None):
+    """Queue all receipts as a single spooler job
+    
+    Returns:
+        PrintJob
+    """
+    data = render_batch(transactions)
+    return get_spooler().submit(
+        printer_name,
+        data,
+        title=title or f"Cetak ulang {len(transactions)} struk",
+        on_status=on_status
+    )
+
+
+def save_batch(path, transactions):
+    """Write all receipts to one file: plain text for .txt, raw printer bytes otherwise"""
+    if path.lower().endswith('.txt'):
+        data = render_plain_batch(transactions).encode('utf-8')
+    else:
+        data = render_batch(transactions)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return len(data)
@@ -0,0 +1,224 @@
+"""
+Receipt Layout - One model of a receipt shared by every renderer
+
+ReceiptLayout is built once per transaction (items parsed once, numbers
+converted once). Renderers (ESC/POS text/bytes here, the Tk preview in
+ui/receipt.py) only walk the model. The store header/footer blocks depend
+only on the store config, so they are rendered once per config version
+and reused for every receipt until the config changes. Raw printer output
+starts with the store logo, pre-rasterized by utils.receipt_logo.
+"""
+import json
+import textwrap
+from config import store_config
+from utils.helpers import format_date
+from utils.receipt_logo import get_logo_raster
+
+TEXT_WIDTH = 32  # Characters per line on a 48mm thermal printer
+HEADER_WIDTH = 16  # Double-width header characters per line
+
+# ESC/POS commands
+ESC = "\x1b"
+GS = "\x1d"
+INIT = ESC + "@"           # Initialize printer
+BOLD_ON = ESC + "E\x01"    # Bold on
+BOLD_OFF = ESC + "E\x00"   # Bold off
+CENTER_ON = ESC + "a\x01"  # Center align
+LEFT_ON = ESC + "a\x00"    # Left align
+# ESC ! n = Master Print Mode Select
+# n = 0x38 (56) = Emphasized (8) + Double Height (16) + Double Width (32)
+HEADER_STYLE = ESC + "!\x38"
+NORMAL_STYLE = ESC + "!\x00"
+# Feed 3 lines then full cut (GS V m: m=0 full cut, m=1 partial cut)
+CUT = "\n\n\n" + GS + "V\x00"
+ENCODING = 'cp437'
+
+
+class StoreBlock:
+    """Store details used on every receipt"""
+    
+    def __init__(self, config):
+        self.name = config.get('name', 'TOKO')
+        self.address = config.get('address', '')
+        self.phone = config.get('phone', '')
+        self.footer = config.get('footer', 'Terima kasih!')
+        self._rendered = {}
+    
+    def rendered(self, key, build):
+        """Render a block from the store details once (cached on this block)"""
+        text = self._rendered.get(key)
+        if text is None:
+            text = self._rendered[key] = build(self)
+        return text
+
+
+class ReceiptItem:
+    """One line item with parsed numbers"""
+    
+    __slots__ = ('name', 'qty', 'price', 'subtotal')
+    
+    def __init__(self, item):
+        self.name = item['name']
+        self.qty = item['qty']
+        self.price = float(item['price'])
+        self.subtotal = float(item['subtotal'])
+
+
+class ReceiptLayout:
+    """Everything printed on one receipt, in print order"""
+    
+    def __init__(self, transaction, store=None):
+        t = transaction
+        self.store = store or get_store_block()
+        self.id = t['id']
+        self.ref_id = t.get('ref_id') or ''
+        self.date = t['date']
+        self.time = t['time']
+        self.cashier = t.get('cashier', 'Kasir')
+        
+        items = t.get('items_list', [])
+        if not items and 'items' in t:
+            try:
+                items = json.loads(t['items'])
+            except ValueError:
+                items = []
+        self.items = [ReceiptItem(item) for item in items]
+        
+        self.subtotal = float(t.get('subtotal', 0))
+        self.discount = float(t.get('discount', 0))
+        self.total = float(t.get('total', 0))
+        self.payment = float(t.get('payment', 0))
+        self.change = float(t.get('change', 0))
+
+
+_store = None  # (config version, StoreBlock)
+
+
+def get_store_block():
+    """Get the store block, rebuilt only when the config version changes"""
+    global _store
+    config = store_config.snapshot()  # also notices an edited config file
+    version = store_config.version
+    if _store is None or _store[0] != version:
+        _store = (version, StoreBlock(config))
+    return _store[1]
+
+
+# Plain text / ESC/POS rendering
+
+def fmt_num(n):
+    """Format number with thousand separator (Indonesian style: 1.000)"""
+    return "{:,.0f}".format(float(n)).replace(",", ".")
+
+
+def center(text, width=TEXT_WIDTH):
+    """Center text with wrapping"""
+    wrapped = textwrap.wrap(str(text), width)
+    return "\n".join(line.center(width) for line in wrapped)
+
+
+def rule(char="-", width=TEXT_WIDTH):
+    return char * width
+
+
+def left_right(left, right, width=TEXT_WIDTH):
+    """Left and right aligned text on one line, wrapping the left part if needed"""
+    # If combining them fits
+    if len(left) + len(right) + 1 <= width:
+        space = width - len(left) - len(right)
+        return f"{left}{' ' * space}{right}"
+    
+    # If left is too long, wrap it
+    wrapped = textwrap.wrap(left, width)
+    # If the last line of wrapped text + right fits
+    if len(wrapped[-1]) + len(right) + 1 <= width:
+        result = wrapped[:-1]
+        last_line = wrapped[-1]
+        space = width - len(last_line) - len(right)
+        result.append(f"{last_line}{' ' * space}{right}")
+        return "\n".join(result)
+    # Print wrapped text then right aligned on next line
+    wrapped.append(right.rjust(width))
+    return "\n".join(wrapped)
+
+
+def _header_text(store):
+    """Store name (double size), address and phone, centered"""
+    wrapped_header = textwrap.wrap(store.name.upper(), HEADER_WIDTH)
+    lines = [
+        CENTER_ON + HEADER_STYLE,
+        "\n".join(line.center(HEADER_WIDTH) for line in wrapped_header),
+        NORMAL_STYLE
+    ]
+    if store.address:
+        lines.append(center(store.address))
+    if store.phone:
+        lines.append(center(store.phone))
+    lines.append(LEFT_ON)
+    return "\n".join(lines)
+
+
+def _footer_text(store):
+    return "\n".join([CENTER_ON, center(store.footer), LEFT_ON])
+
+
+def render_text(layout):
+    """Render a receipt as text with ESC/POS formatting commands"""
+    lines = [INIT, layout.store.rendered('header', _header_text), rule("=")]
+    
+    # Transaction info
+    lines.append(left_right("No:", layout.id[-12:]))
+    if layout.ref_id:
+        lines.append(left_right("Refund:", layout.ref_id[-12:]))
+    lines.append(left_right("Tgl:", format_date(layout.date)))
+    lines.append(left_right("Jam:", layout.time))
+    lines.append(rule("-"))
+    
+    # Items
+    lines.append(BOLD_ON)
+    lines.append(left_right("Item", "Harga"))
+    lines.append(BOLD_OFF)
+    lines.append(rule("-"))
+    for item in layout.items:
+        lines.append(item.name)
+        # Indent qty_price slightly to visually separate from name
+        lines.append(left_right(f" {item.qty} x {fmt_num(item.price)}", fmt_num(item.subtotal)))
+    lines.append(rule("-"))
+    
+    # Totals
+    lines.append(left_right("Subtotal", fmt_num(layout.subtotal)))
+    if layout.discount:
+        # Refunds store a negative discount: the refunded total exceeds the subtotal
+        sign = '-' if layout.discount > 0 else '+'
+        lines.append(left_right("Diskon", f"{sign}{fmt_num(abs(layout.discount))}"))
+    lines.append(BOLD_ON)
+    lines.append(left_right("TOTAL", fmt_num(layout.total)))
+    lines.append(BOLD_OFF)
+    lines.append(left_right("Bayar", fmt_num(layout.payment)))
+    lines.append(left_right("Kembali", fmt_num(layout.change)))
+    lines.append(rule("="))
+    
+    lines.append(layout.store.rendered('footer', _footer_text))
+    # Feed lines for manual tear-off if cutter command fails/not present
+    lines.append("\n\n")
+    return "\n".join(lines)
+
+
+def render_escpos(layout, cut=True, logo=None):
+    """Render a receipt as raw printer bytes
+    
+    Args:
+        logo: Raster bytes to print above the header; None for the store
+            logo, b'' for none
+    """
+    text = render_text(layout)
+    if cut:
+        text += CUT
+    data = text.encode(ENCODING, errors='replace')
+    if logo is None:
+        logo = get_logo_raster()
+    if logo:
+        # Right after INIT; the bitmap is already centered on a full-width row
+        init = INIT.encode(ENCODING)
+        data = init + logo + data[len(init):]
+    return data
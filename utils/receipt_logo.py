@@ -0,0 +1,97 @@
+"""
+Receipt Logo - Store logo as a ready-to-send ESC/POS raster bitmap
+
+The logo is dithered to 1 bit and packed into a GS v 0 command once, when
+it is uploaded in Settings, and the bytes are kept in CACHE_DIR. Printing
+a receipt then only prepends those bytes; no image work happens per print
+and PIL is not needed to print. Without a stored raster (no logo uploaded
+yet) receipts print without a logo.
+"""
+import os
+from config import ASSETS_DIR, CACHE_DIR
+
+LOGO_FILE = os.path.join(ASSETS_DIR, "logo.png")
+RASTER_FILE = os.path.join(CACHE_DIR, "logo_raster.bin")
+
+PRINT_WIDTH_DOTS = 384  # 58mm paper at 203 dpi (32 characters of 12 dots)
+LOGO_MAX_HEIGHT = 160  # dots; keeps the header short
+
+RASTER_COMMAND = b"\x1dv0"  # GS v 0: print raster bit image
+
+_raster = None  # (raster stat, bytes)
+
+
+def _stat(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def rasterize(image, width=PRINT_WIDTH_DOTS, max_height=LOGO_MAX_HEIGHT):
+    """Convert a PIL image into a GS v 0 command, centered on a full-width row"""
+    from PIL import Image
+    
+    # Transparent areas print as paper
+    rgba = image.convert('RGBA')
+    gray = Image.new('RGBA', rgba.size, (255, 255, 255, 255))
+    gray.alpha_composite(rgba)
+    gray = gray.convert('L')
+    gray.thumbnail((width, max_height), Image.Resampling.LANCZOS)
+    
+    # Floyd-Steinberg dither onto a white canvas as wide as the paper
+    canvas = Image.new('L', (width, gray.height), 255)
+    canvas.paste(gray, ((width - gray.width) // 2, 0))
+    bitmap = canvas.convert('1', dither=Image.Dither.FLOYDSTEINBERG)
+    
+    # Mode '1' packs 1 = white; ESC/POS wants 1 = black
+    data = bytes(b ^ 0xFF for b in bitmap.tobytes())
+    row_bytes = width // 8
+    height = bitmap.height
+    header = RASTER_COMMAND + bytes([0, row_bytes & 0xFF, row_bytes >> 8, height & 0xFF, height >> 8])
+    return header + data
+
+
+def build_raster(source=LOGO_FILE, dest=RASTER_FILE):
+    """Rasterize the logo file and store the command bytes
+    
+    Raises:
+        ImportError if PIL is not installed, OSError/ValueError for bad images
+    """
+    global _raster
+    from PIL import Image
+    
+    with Image.open(source) as img:
+        data = rasterize(img)
+    tmp_path = dest + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, dest)
+    _raster = None
+    return data
+
+
+def get_logo_raster():
+    """Get the stored GS v 0 bytes of the logo, or b'' if none was uploaded
+    
+    Only reads the raster file (one stat per call while it is unchanged);
+    it is built by build_raster() when a logo is uploaded.
+    """
+    global _raster
+    raster_stat = _stat(RASTER_FILE)
+    if raster_stat is None:
+        return b''
+    if _raster is not None and _raster[0] == raster_stat:
+        return _raster[1]
+    
+    try:
+        with open(RASTER_FILE, 'rb') as f:
+            data = f.read()
+    except OSError as e:
+        print(f"Error reading logo raster: {e}")
+        return b''
+    if not data.startswith(RASTER_COMMAND):
+        return b''
+    _raster = (raster_stat, data)
+    return data
@@ -0,0 +1,545 @@
+"""
+Incremental rollups over the transactions CSV
+
+A rollup is an aggregate that is built once with a full pass over the
+closed-month archives and the transactions file, and then kept up to
+date by folding only the rows that were appended since the last sync.
+State is persisted in the cache folder together with the byte offset it
+covers, so restarts only read the tail.
+"""
+import bisect
+import json
+import os
+import re
+import threading
+from datetime import datetime
+from config import CACHE_DIR
+from utils.helpers import parse_float, parse_int
+
+
+class TransactionRollup:
+    """Base class for aggregates maintained incrementally over transactions"""
+    
+    NAME = ''
+    VERSION = 1
+    SAVE_EVERY = 500  # Rows folded before the cache file is rewritten
+    FINGERPRINT_BYTES = 32
+    
+    _registry = []
+    _instances = {}
+    _instances_lock = threading.Lock()
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.NAME:
+            TransactionRollup._registry.append(cls)
+    
+    @classmethod
+    def for_database(cls, transaction_db):
+        """Get the shared rollup instance for a transaction database"""
+        key = (cls.NAME, transaction_db.file_path)
+        with TransactionRollup._instances_lock:
+            rollup = TransactionRollup._instances.get(key)
+            if rollup is None:
+                rollup = cls(transaction_db.file_path)
+                TransactionRollup._instances[key] = rollup
+            return rollup
+    
+    @classmethod
+    def invalidate_all(cls, source_path):
+        """Drop every rollup built from source_path (after a full rewrite)"""
+        with TransactionRollup._instances_lock:
+            instances = [r for (name, path), r in TransactionRollup._instances.items()
+                         if path == source_path]
+        for rollup in instances:
+            rollup.reset()
+        for rollup_cls in TransactionRollup._registry:
+            try:
+                os.remove(rollup_cls.cache_path_for(source_path))
+            except OSError:
+                pass
+    
+    @classmethod
+    def cache_path_for(cls, source_path):
+        """Get cache file path of this rollup for a source file"""
+        base = os.path.splitext(os.path.basename(source_path))[0]
+        return os.path.join(CACHE_DIR, f"rollup_{base}_{cls.NAME}.json")
+    
+    def __init__(self, source_path):
+        self.source_path = source_path
+        self.cache_path = self.cache_path_for(source_path)
+        self.lock = threading.RLock()
+        self.data = self._empty()
+        self.offset = 0
+        self.fingerprint = ''
+        self._loaded = False
+        self._stale = True  # No usable state yet: next sync does a full rebuild
+        self._pending = 0
+    
+    def _empty(self):
+        """Return empty rollup state"""
+        return {}
+    
+    def apply(self, row, sign=1):
+        """Fold one transaction row into the state (sign=-1 removes it)"""
+        raise NotImplementedError
+    
+    def apply_record(self, offset, row):
+        """Fold a newly read row; offset is its byte position (-1 if archived)"""
+        self.apply(row, 1)
+    
+    def reset(self):
+        """Forget current state so the next sync rebuilds it"""
+        with self.lock:
+            self.data = self._empty()
+            self.offset = 0
+            self.fingerprint = ''
+            self._loaded = True
+            self._stale = True
+            self._pending = 0
+    
+    def sync(self, transaction_db):
+        """Bring the state up to date with the transactions file"""
+        with self.lock:
+            if not self._loaded:
+                self._load()
+                self._loaded = True
+            
+            size = transaction_db.file_size()
+            if (self._stale or size < self.offset or
+                    transaction_db.fingerprint(self.offset, self.FINGERPRINT_BYTES) != self.fingerprint):
+                self._rebuild(transaction_db, size)
+                return self.data
+            
+            if size > self.offset:
+                for start, stop, row in transaction_db.iter_records(self.offset, size):
+                    self.apply_record(start, row)
+                    self.offset = stop
+                    self._pending += 1
+                self.fingerprint = transaction_db.fingerprint(self.offset, self.FINGERPRINT_BYTES)
+                if self._pending >= self.SAVE_EVERY:
+                    self.save()
+            return self.data
+    
+    def relocate(self, relocate_offset):
+        """Shift stored byte offsets after a rewrite (for offset-keeping rollups)
+        
+        relocate_offset maps an old offset to the new one, or -1 if the row
+        left the CSV.
+        """
+    
+    def rebase(self, transaction_db):
+        """Keep the state but point it at the end of a rewritten file
+        
+        Used after rows were removed from the CSV and the state was already
+        adjusted (apply with sign=-1, relocate), or after rows only moved into
+        a month archive so the totals are still correct.
+        """
+        with self.lock:
+            self.offset = transaction_db.file_size()
+            self.fingerprint = transaction_db.fingerprint(self.offset, self.FINGERPRINT_BYTES)
+            self.save()
+    
+    def _rebuild(self, transaction_db, size):
+        """Rebuild the state with one full pass over the transactions"""
+        self.data = self._empty()
+        self.offset = 0
+        for row in transaction_db.iter_archived_rows():
+            self.apply_record(-1, row)
+        for start, stop, row in transaction_db.iter_records(0, size):
+            self.apply_record(start, row)
+            self.offset = stop
+        self.fingerprint = transaction_db.fingerprint(self.offset, self.FINGERPRINT_BYTES)
+        self._stale = False
+        self.save()
+    
+    def _load(self):
+        """Load persisted state from the cache folder"""
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            if saved.get('version') == self.VERSION:
+                self.data = saved['data']
+                self.offset = saved['offset']
+                self.fingerprint = saved['fingerprint']
+                self._stale = False
+        except (OSError, ValueError, KeyError):
+            pass
+    
+    def save(self):
+        """Persist state atomically to the cache folder"""
+        with self.lock:
+            payload = {
+                'version': self.VERSION,
+                'offset': self.offset,
+                'fingerprint': self.fingerprint,
+                'data': self.data
+            }
+            tmp_path = self.cache_path + '.tmp'
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(payload, f, ensure_ascii=False, separators=(',', ':'))
+                os.replace(tmp_path, self.cache_path)
+                self._pending = 0
+            except OSError as e:
+                print(f"Error saving rollup {self.NAME}: {e}")
+
+
+def _parse_items(row):
+    """Decode the items JSON of a raw transaction row"""
+    try:
+        return json.loads(row.get('items') or '[]')
+    except ValueError:
+        return []
+
+
+class ProductDailyRollup(TransactionRollup):
+    """Units and revenue per product per day"""
+    
+    NAME = 'product_daily'
+    
+    def _empty(self):
+        return {'days': {}, 'names': {}}
+    
+    def apply(self, row, sign=1):
+        date = row.get('date', '')
+        day = self.data['days'].setdefault(date, {})
+        names = self.data['names']
+        
+        for item in _parse_items(row):
+            product_id = str(item.get('product_id') or item.get('barcode') or item.get('name', ''))
+            entry = day.setdefault(product_id, [0, 0.0])
+            entry[0] += sign * parse_int(item.get('qty', 0))
+            entry[1] += sign * parse_float(item.get('subtotal', 0))
+            if sign > 0:
+                names[product_id] = item.get('name', '')
+            elif entry[0] == 0 and abs(entry[1]) < 0.005:
+                del day[product_id]
+        
+        if not day:
+            del self.data['days'][date]
+    
+    def product_totals(self, transaction_db, start_date, end_date):
+        """Sum units and revenue per product over a date range"""
+        with self.lock:
+            data = self.sync(transaction_db)
+            names = data['names']
+            totals = {}
+            for date, day in data['days'].items():
+                if not (start_date <= date <= end_date):
+                    continue
+                for product_id, (qty, revenue) in day.items():
+                    entry = totals.get(product_id)
+                    if entry is None:
+                        entry = totals[product_id] = {
+                            'product_id': product_id,
+                            'name': names.get(product_id, ''),
+                            'qty': 0,
+                            'revenue': 0.0
+                        }
+                    entry['qty'] += qty
+                    entry['revenue'] += revenue
+            return totals
+
+
+class HourlyRollup(TransactionRollup):
+    """Revenue and transaction count per hour of each day"""
+    
+    NAME = 'hourly'
+    VERSION = 2  # refunds no longer counted as transactions
+    
+    def apply(self, row, sign=1):
+        date = row.get('date', '')
+        try:
+            hour = str(int(row.get('time', '')[:2]))
+        except ValueError:
+            return
+        
+        day = self.data.setdefault(date, {})
+        entry = day.setdefault(hour, [0.0, 0])
+        entry[0] += sign * parse_float(row.get('total', 0))
+        if not row.get('ref_id'):
+            # A refund lowers revenue but is not another transaction
+            entry[1] += sign
+        
+        if entry[1] <= 0 and abs(entry[0]) < 0.005:
+            del day[hour]
+            if not day:
+                del self.data[date]
+    
+    def weekday_hour_matrix(self, transaction_db, start_date, end_date):
+        """Sum revenue and count into 7x24 matrices (Monday first)"""
+        revenue = [[0.0] * 24 for _ in range(7)]
+        count = [[0] * 24 for _ in range(7)]
+        
+        with self.lock:
+            data = self.sync(transaction_db)
+            for date, day in data.items():
+                if not (start_date <= date <= end_date):
+                    continue
+                try:
+                    weekday = datetime.strptime(date, "%Y-%m-%d").weekday()
+                except ValueError:
+                    continue
+                for hour, (hour_revenue, hour_count) in day.items():
+                    revenue[weekday][int(hour)] += hour_revenue
+                    count[weekday][int(hour)] += hour_count
+        
+        return revenue, count
+
+
+class DailyRollup(TransactionRollup):
+    """Transaction count and total sales per day"""
+    
+    NAME = 'daily'
+    VERSION = 2  # refunds no longer counted as transactions
+    
+    def apply(self, row, sign=1):
+        date = row.get('date', '')
+        entry = self.data.setdefault(date, [0, 0.0])
+        if not row.get('ref_id'):
+            # A refund lowers the total but is not another transaction
+            entry[0] += sign
+        entry[1] += sign * parse_float(row.get('total', 0))
+        if entry[0] <= 0 and abs(entry[1]) < 0.005:
+            del self.data[date]
+    
+    def range_totals(self, transaction_db, start_date, end_date):
+        """Sum (count, total) over a date range"""
+        count = 0
+        total = 0.0
+        with self.lock:
+            data = self.sync(transaction_db)
+            for date, (day_count, day_total) in data.items():
+                if start_date <= date <= end_date:
+                    count += day_count
+                    total += day_total
+        return count, total
+
+
+class KeyIndex(TransactionRollup):
+    """Sort keys (date, time, id) of every transaction with its byte offset
+    
+    State is {date: [[time, id, offset], ...]}; offset is -1 for rows that
+    live in a month archive. Used for keyset pagination.
+    """
+    
+    NAME = 'key_index'
+    
+    def apply_record(self, offset, row):
+        self.data.setdefault(row.get('date', ''), []).append(
+            [row.get('time', ''), row.get('id', ''), offset]
+        )
+    
+    def apply(self, row, sign=1):
+        if sign > 0:
+            self.apply_record(-1, row)
+            return
+        date = row.get('date', '')
+        entries = self.data.get(date, [])
+        for i, (time, transaction_id, offset) in enumerate(entries):
+            if transaction_id == row.get('id'):
+                del entries[i]
+                break
+        if not entries:
+            self.data.pop(date, None)
+    
+    def locate(self, transaction_db, keys):
+        """Get byte offsets for (date, time, id) keys (-1 archived, None unknown)"""
+        offsets = []
+        with self.lock:
+            data = self.sync(transaction_db)
+            for date, time, transaction_id in keys:
+                offsets.append(next(
+                    (offset for t, i, offset in data.get(date, []) if i == transaction_id),
+                    None
+                ))
+        return offsets
+    
+    def relocate(self, relocate_offset):
+        with self.lock:
+            for entries in self.data.values():
+                for entry in entries:
+                    if entry[2] >= 0:
+                        entry[2] = relocate_offset(entry[2])
+    
+    def page(self, transaction_db, start_date, end_date, before=None, limit=100):
+        """Get up to limit keys within a date range, newest first
+        
+        Args:
+            before: (date, time, id) cursor; only keys strictly older are returned
+        
+        Returns:
+            List of (date, time, id, offset)
+        """
+        keys = []
+        with self.lock:
+            data = self.sync(transaction_db)
+            last_date = end_date if before is None else min(end_date, before[0])
+            dates = sorted((d for d in data if start_date <= d <= last_date), reverse=True)
+            for date in dates:
+                entries = sorted(data[date], reverse=True)
+                for time, transaction_id, offset in entries:
+                    if before is not None and (date, time, transaction_id) >= tuple(before):
+                        continue
+                    keys.append((date, time, transaction_id, offset))
+                    if len(keys) >= limit:
+                        return keys
+        return keys
+
+
+_TOKEN_RE = re.compile(r'\w+')
+
+
+def _tokenize(text):
+    """Split text into lowercase word tokens"""
+    return _TOKEN_RE.findall(str(text).lower())
+
+
+class SearchIndex(TransactionRollup):
+    """Inverted index for searching transactions by line items and ID
+    
+    Persisted state:
+        docs   - [[id, date, time, total], ...]; None for removed rows
+        tokens - {token: [doc number, ...]} from product ids, barcodes and
+                 name words of every line item, and the ref_id of refunds
+    Sorted token, ID and ID-suffix lists for prefix lookups are derived in
+    memory from that state.
+    """
+    
+    NAME = 'search'
+    VERSION = 2
+    
+    def _empty(self):
+        return {'docs': [], 'tokens': {}}
+    
+    @staticmethod
+    def _row_tokens(row):
+        tokens = set()
+        for item in _parse_items(row):
+            for key in ('product_id', 'barcode'):
+                value = str(item.get(key, '')).strip().lower()
+                if value:
+                    tokens.add(value)
+            tokens.update(_tokenize(item.get('name', '')))
+        # Refunds are found by the ID of the sale they reverse
+        tokens.update(_tokenize(row.get('ref_id') or ''))
+        return tokens
+    
+    @staticmethod
+    def _suffix(transaction_id):
+        return transaction_id.rsplit('-', 1)[-1]
+    
+    def _derived(self):
+        """Build (or reuse) in-memory lookup structures for the current state"""
+        if getattr(self, '_derived_for', None) is not self.data:
+            docs = self.data['docs']
+            doc_of = {}
+            for n, doc in enumerate(docs):
+                if doc is not None:
+                    doc_of[doc[0]] = n
+            ids = sorted(doc_of)
+            self._lookup = {
+                'doc_of': doc_of,
+                'vocabulary': sorted(self.data['tokens']),
+                'ids': ids,
+                'suffixes': sorted((self._suffix(i), i) for i in ids)
+            }
+            self._derived_for = self.data
+        return self._lookup
+    
+    def apply(self, row, sign=1):
+        transaction_id = row.get('id', '')
+        derived = self._derived() if getattr(self, '_derived_for', None) is self.data else None
+        
+        if sign < 0:
+            # Leave postings in place; a tombstoned doc never matches
+            derived = self._derived()
+            n = derived['doc_of'].pop(transaction_id, None)
+            if n is not None:
+                self._remove_sorted(derived['ids'], transaction_id)
+                self._remove_sorted(derived['suffixes'], (self._suffix(transaction_id), transaction_id))
+                self.data['docs'][n] = None
+            return
+        
+        docs = self.data['docs']
+        n = len(docs)
+        docs.append([transaction_id, row.get('date', ''), row.get('time', ''),
+                     parse_float(row.get('total', 0))])
+        tokens = self.data['tokens']
+        for token in self._row_tokens(row):
+            postings = tokens.get(token)
+            if postings is None:
+                postings = tokens[token] = []
+                if derived is not None:
+                    bisect.insort(derived['vocabulary'], token)
+            postings.append(n)
+        
+        if derived is not None:
+            derived['doc_of'][transaction_id] = n
+            bisect.insort(derived['ids'], transaction_id)
+            bisect.insort(derived['suffixes'], (self._suffix(transaction_id), transaction_id))
+    
+    @staticmethod
+    def _remove_sorted(items, value):
+        i = bisect.bisect_left(items, value)
+        if i < len(items) and items[i] == value:
+            del items[i]
+    
+    @staticmethod
+    def _prefixed(items, prefix):
+        """Yield items of a sorted list that start with prefix"""
+        i = bisect.bisect_left(items, prefix)
+        while i < len(items) and items[i].startswith(prefix):
+            yield items[i]
+            i += 1
+    
+    def _match_ids(self, query):
+        """Doc numbers matching every word of the query (item tokens or ID prefix)"""
+        derived = self._derived()
+        docs = self.data['docs']
+        tokens = self.data['tokens']
+        doc_of = derived['doc_of']
+        
+        result = None
+        for word in query.split():
+            matches = set()
+            
+            # Transaction ID: full ID, without the TRX- prefix, or the random suffix
+            upper = word.upper()
+            for candidate in (upper, 'TRX-' + upper):
+                matches.update(doc_of[i] for i in self._prefixed(derived['ids'], candidate))
+            i = bisect.bisect_left(derived['suffixes'], (upper,))
+            suffixes = derived['suffixes']
+            while i < len(suffixes) and suffixes[i][0].startswith(upper):
+                matches.add(doc_of[suffixes[i][1]])
+                i += 1
+            
+            # Line item tokens; a word with punctuation must match all its parts
+            parts = _tokenize(word) or [word.lower()]
+            part_matches = None
+            for part in parts:
+                found = set()
+                for token in self._prefixed(derived['vocabulary'], part):
+                    found.update(tokens[token])
+                part_matches = found if part_matches is None else part_matches & found
+            matches |= part_matches or set()
+            
+            result = matches if result is None else result & matches
+            if not result:
+                return set()
+        
+        return {n for n in (result or ()) if docs[n] is not None}
+    
+    def search(self, transaction_db, query, start_date, end_date):
+        """Get [(date, time, id, total)] matching query within a date range, newest first"""
+        with self.lock:
+            self.sync(transaction_db)
+            docs = self.data['docs']
+            keys = []
+            for n in self._match_ids(query):
+                transaction_id, date, time, total = docs[n]
+                if start_date <= date <= end_date:
+                    keys.append((date, time, transaction_id, total))
+        keys.sort(reverse=True)
+        return keys
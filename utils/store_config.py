@@ -0,0 +1,192 @@
+"""
+Store Config Service - Single cached copy of store_config.json
+
+Every reader shares one in-memory copy. The file is only re-read when its
+mtime/size changes (checked at most once per CHECK_INTERVAL), so receipts
+and pages do not hit the disk for configuration. Updates are applied in
+memory at once and written to disk atomically after WRITE_DELAY, so
+several quick saves become one write. Listeners are called after every
+change with (config copy, changed keys).
+
+This module does not import config; config.py creates the shared instance.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+
+CHECK_INTERVAL = 1.0  # seconds between mtime checks
+WRITE_DELAY = 0.5  # seconds to wait for more changes before writing
+RETRY_DELAY = 5.0  # seconds before writing again after a failed write
+
+
+class StoreConfigService:
+    """Cached, change-notifying store configuration"""
+    
+    def __init__(self, path, defaults):
+        self.path = path
+        self.defaults = dict(defaults)
+        self.version = 0  # bumped on every change, for caches derived from the config
+        
+        self._lock = threading.RLock()
+        self._data = None
+        self._stat = None
+        self._checked_at = 0.0
+        self._dirty = False
+        self._timer = None
+        self._listeners = []
+    
+    # Reading
+    
+    def _file_stat(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+    
+    def _read_file(self):
+        """Read the file merged over the defaults"""
+        data = dict(self.defaults)
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    saved = json.load(f)
+                if isinstance(saved, dict):
+                    data.update(saved)
+            except (OSError, ValueError) as e:
+                print(f"Error reading store config: {e}")
+        return data
+    
+    def _ensure_loaded(self):
+        """Load on first use, and reload when the file changed on disk"""
+        now = time.monotonic()
+        if self._data is not None and (self._dirty or now - self._checked_at < CHECK_INTERVAL):
+            return None
+        self._checked_at = now
+        stat = self._file_stat()
+        if self._data is not None and stat == self._stat:
+            return None
+        
+        old = self._data
+        self._data = self._read_file()
+        self._stat = stat
+        if old is None:
+            return None
+        changed = {key for key in set(old) | set(self._data) if old.get(key) != self._data.get(key)}
+        if changed:
+            self.version += 1
+        return changed
+    
+    def get(self, key, default=None):
+        """Get one setting"""
+        with self._lock:
+            changed = self._ensure_loaded()
+            value = self._data.get(key, default)
+        self._notify(changed)
+        return value
+    
+    def snapshot(self):
+        """Get a copy of the whole configuration"""
+        with self._lock:
+            changed = self._ensure_loaded()
+            data = dict(self._data)
+        self._notify(changed)
+        return data
+    
+    def reload(self):
+        """Re-read the file now (e.g. after a restore replaced it)"""
+        with self._lock:
+            self._checked_at = 0.0
+            self._stat = None
+            self._dirty = False
+            changed = self._ensure_loaded()
+        self._notify(changed)
+    
+    # Writing
+    
+    def update(self, values=None, **changes):
+        """Change settings in memory and schedule a coalesced write
+        
+        Returns:
+            Set of keys whose value changed
+        """
+        if values:
+            changes = dict(values, **changes)
+        with self._lock:
+            self._ensure_loaded()
+            changed = {key for key, value in changes.items() if self._data.get(key) != value}
+            if not changed:
+                return changed
+            self._data.update(changes)
+            self.version += 1
+            self._dirty = True
+            if self._timer is None:
+                self._schedule_write(WRITE_DELAY)
+        self._notify(changed)
+        return changed
+    
+    def flush(self):
+        """Write pending changes now
+        
+        Returns:
+            True if the file is up to date
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return True
+            tmp_path = self.path + '.tmp'
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(self._data, f, indent=2, ensure_ascii=False)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                print(f"Error saving store config: {e}")
+                # Still dirty: try again later instead of waiting for the next update
+                self._schedule_write(RETRY_DELAY)
+                return False
+            self._dirty = False
+            self._stat = self._file_stat()
+            self._checked_at = time.monotonic()
+            return True
+    
+    def _schedule_write(self, delay):
+        """Start the timer for a coalesced write (caller holds the lock)"""
+        self._timer = threading.Timer(delay, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+    
+    # Listeners
+    
+    def add_listener(self, callback):
+        """Call callback(config, changed_keys) after each change (on the changing thread)"""
+        with self._lock:
+            self._listeners.append(callback)
+    
+    def remove_listener(self, callback):
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+    
+    def _notify(self, changed):
+        if not changed:
+            return
+        with self._lock:
+            listeners = list(self._listeners)
+            data = dict(self._data)
+        for callback in listeners:
+            try:
+                callback(data, changed)
+            except Exception as e:
+                print(f"Error in store config listener: {e}")
+
+
+def create_service(path, defaults):
+    """Create a service that flushes pending writes at exit"""
+    service = StoreConfigService(path, defaults)
+    atexit.register(service.flush)
+    return service
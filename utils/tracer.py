@@ -0,0 +1,159 @@
+"""
+Tracer - Wall-time instrumentation for startup, page switches and database calls
+
+Spans are aggregated in memory per name (count, total, max, last) for the
+Developer page, and each finished span is written to a rotating log once
+enable_log() has been called. This module only uses the standard library
+and does not import config, so it can time the config import itself.
+"""
+import functools
+import inspect
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+
+START = time.perf_counter()  # Process start, as seen by the first import of this module
+
+LOG_FILE_NAME = "trace.log"
+LOG_MAX_BYTES = 1024 * 1024
+LOG_BACKUPS = 3
+PENDING_LIMIT = 1000  # Spans kept until the log file is set up
+
+enabled = os.environ.get('KASIR_TRACE', '1') != '0'
+
+_lock = threading.Lock()
+_stats = {}  # name -> [count, total, max, last]
+_pending = []
+_logger = logging.getLogger('aplikasir.trace')
+_logger.propagate = False
+_log_ready = False
+
+
+def record(name, seconds):
+    """Add one measurement for name"""
+    if not enabled:
+        return
+    with _lock:
+        stat = _stats.get(name)
+        if stat is None:
+            _stats[name] = [1, seconds, seconds, seconds]
+        else:
+            stat[0] += 1
+            stat[1] += seconds
+            stat[2] = max(stat[2], seconds)
+            stat[3] = seconds
+        if not _log_ready:
+            if len(_pending) < PENDING_LIMIT:
+                _pending.append((name, seconds))
+            return
+    _logger.info("%s %.2f ms", name, seconds * 1000)
+
+
+@contextmanager
+def span(name):
+    """Time the with-block under name (also when it raises)"""
+    if not enabled:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - started)
+
+
+def traced(name=None):
+    """Decorator that times each call of a function"""
+    def decorate(func):
+        span_name = name or func.__qualname__
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return func(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(span_name, time.perf_counter() - started)
+        return wrapper
+    return decorate
+
+
+def trace_methods(cls):
+    """Class decorator that times every public method
+    
+    Generator methods are left alone: their call returns immediately and
+    the work happens in whichever traced method consumes them.
+    """
+    for attr, value in list(vars(cls).items()):
+        if attr.startswith('_') or not inspect.isfunction(value) or inspect.isgeneratorfunction(value):
+            continue
+        setattr(cls, attr, traced(f"db.{cls.__name__}.{attr}")(value))
+    return cls
+
+
+def since_start(name):
+    """Record the time elapsed since the process started"""
+    record(name, time.perf_counter() - START)
+
+
+def enable_log(log_dir):
+    """Start writing spans to a rotating log in log_dir (flushes earlier spans)"""
+    global _log_ready
+    if not enabled or _log_ready:
+        return
+    try:
+        os.makedirs(log_dir, exist_ok=True)
+        handler = RotatingFileHandler(
+            os.path.join(log_dir, LOG_FILE_NAME),
+            maxBytes=LOG_MAX_BYTES,
+            backupCount=LOG_BACKUPS,
+            encoding='utf-8'
+        )
+    except OSError as e:
+        print(f"Error opening trace log: {e}")
+        return
+    handler.setFormatter(logging.Formatter('%(asctime)s %(threadName)s %(message)s'))
+    _logger.addHandler(handler)
+    _logger.setLevel(logging.INFO)
+    
+    with _lock:
+        pending = list(_pending)
+        _pending.clear()
+        _log_ready = True
+    for name, seconds in pending:
+        _logger.info("%s %.2f ms", name, seconds * 1000)
+
+
+def summary():
+    """Get aggregated spans as (name, count, total_ms, avg_ms, max_ms, last_ms), slowest total first"""
+    with _lock:
+        rows = [
+            (name, count, total * 1000, total * 1000 / count, longest * 1000, last * 1000)
+            for name, (count, total, longest, last) in _stats.items()
+        ]
+    rows.sort(key=lambda row: row[2], reverse=True)
+    return rows
+
+
+def reset():
+    """Forget aggregated spans"""
+    with _lock:
+        _stats.clear()
+
+
+def log_summary():
+    """Write the aggregated table to the log (e.g. when the app closes)"""
+    if not _log_ready:
+        return
+    rows = summary()
+    if not rows:
+        return
+    lines = [f"{'span':<48} {'count':>7} {'total ms':>10} {'avg ms':>9} {'max ms':>9}"]
+    for name, count, total, avg, longest, last in rows:
+        lines.append(f"{name:<48} {count:>7} {total:>10.1f} {avg:>9.2f} {longest:>9.2f}")
+    _logger.info("summary\n%s", '\n'.join(lines))